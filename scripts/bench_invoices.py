@@ -0,0 +1,131 @@
+"""
+請求書CSV 集計のベンチマーク (columnar vs csv)
+Usage: python scripts/bench_invoices.py [--rows N] [--repeat N] [--today YYYY-MM-DD] [--json PATH]
+
+Times the aggregations finance scripts run on an /api/invoices/export CSV
+(vendor × month totals, unpaid aging buckets, top vendors) two ways: row by
+row with the csv module, and with slidekit.columnar (cold parse, cached
+load, aggregation). Both must agree; a mismatch exits non-zero. The
+synthetic export (default 1,000,000 rows) is generated once and reused.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import tempfile
+import time
+
+from slidekit import bench, columnar, invoices
+
+import generate_slides as g
+
+ROWS = 1_000_000
+TOP_N = 10
+
+
+# ─── Baseline ─────────────────────────────────────────────────
+
+def csv_aggregate(path, today):
+    """The three aggregations with csv.reader and dicts, one row at a time."""
+    cells, vendors, aging = {}, {}, {}
+    for inv in invoices.read(path):
+        amount = inv.amount or 0
+        unpaid = 0 if inv.paid else amount
+        key = (inv.vendor, invoices.month_of(inv))
+        cell = cells.setdefault(key, [0, 0, 0])
+        cell[0] += 1
+        cell[1] += amount
+        cell[2] += unpaid
+        vendor = vendors.setdefault(inv.vendor, [0, 0, 0])
+        vendor[0] += 1
+        vendor[1] += amount
+        vendor[2] += unpaid
+        if not inv.paid:
+            if inv.due:
+                days = (today - datetime.date.fromisoformat(inv.due)).days
+                label = columnar.AGING_LABELS[sum(days >= d for d in columnar.AGING_DAYS)]
+            else:
+                label = invoices.NO_MONTH
+            bucket = aging.setdefault(label, [0, 0])
+            bucket[0] += 1
+            bucket[1] += amount
+    top = sorted(vendors.items(), key=lambda kv: (-kv[1][1], kv[0]))[:TOP_N]
+    return ({k: tuple(v) for k, v in cells.items()},
+            {k: tuple(v) for k, v in aging.items() if v[0]},
+            [(name, *v) for name, v in top])
+
+
+def columnar_aggregate(cols, today):
+    table = columnar.vendor_month_totals(cols)
+    cells = {}
+    for i, j in zip(*table.count.nonzero()):
+        cells[(table.vendors[i], table.months[j])] = (
+            int(table.count[i, j]), int(table.amount[i, j]), int(table.unpaid_amount[i, j]))
+    aging = {label: (n, s) for label, n, s in columnar.aging(cols, today) if n}
+    return cells, aging, columnar.top_vendors(cols, TOP_N)
+
+
+# ─── Main ─────────────────────────────────────────────────────
+
+def sample_path(rows):
+    path = os.path.join(g.CACHE_DIR, "bench", f"invoices-{rows}.csv")
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        invoices.write_sample(path + ".tmp", rows)
+        os.replace(path + ".tmp", path)
+    return path
+
+
+def run(path, repeat, today):
+    metrics = {"csv.file_bytes": os.path.getsize(path)}
+    metrics["csv.aggregate_s"], expected = bench.timeit(lambda: csv_aggregate(path, today), repeat)
+    metrics["columnar.parse_s"], cols = bench.timeit(lambda: columnar.parse(path), repeat)
+    metrics["columnar.aggregate_s"], result = bench.timeit(
+        lambda: columnar_aggregate(cols, today), repeat)
+    if result != expected:
+        raise SystemExit("columnar aggregations differ from the csv baseline")
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        columnar.load(path, cache_dir)
+        metrics["columnar.load_cached_s"], _ = bench.timeit(
+            lambda: columnar.load(path, cache_dir), repeat)
+        metrics["columnar.cache_bytes"] = sum(
+            os.path.getsize(os.path.join(cache_dir, f)) for f in os.listdir(cache_dir))
+    metrics["process.max_rss_bytes"] = bench.max_rss()
+    return metrics, len(cols)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="請求書CSV集計のベンチマークを実行します")
+    parser.add_argument("--rows", type=int, default=ROWS,
+                        help="rows in the synthetic export (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="runs per timing; the median is reported (default: %(default)s)")
+    parser.add_argument("--today", type=datetime.date.fromisoformat, default=datetime.date.today(),
+                        help="reference date for unpaid aging (default: today)")
+    parser.add_argument("--json", metavar="PATH", help="also write the metrics to PATH")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    t0 = time.perf_counter()
+    path = sample_path(args.rows)
+    metrics, rows = run(path, args.repeat, args.today)
+    print(bench.format_table(metrics))
+    baseline = metrics["csv.aggregate_s"]
+    cold = metrics["columnar.parse_s"] + metrics["columnar.aggregate_s"]
+    warm = metrics["columnar.load_cached_s"] + metrics["columnar.aggregate_s"]
+    print(f"{rows:,} rows:")
+    print(f"  csv                 {baseline:7.2f}s  {rows / baseline:>12,.0f} rows/s")
+    print(f"  columnar (parse)    {cold:7.2f}s  {rows / cold:>12,.0f} rows/s  {baseline / cold:5.1f}x")
+    print(f"  columnar (cached)   {warm:7.2f}s  {rows / warm:>12,.0f} rows/s  {baseline / warm:5.1f}x")
+    print(f"Benchmark took {time.perf_counter() - t0:.1f}s")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(metrics, f, indent=2, sort_keys=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+マイグレーション解析 (slidekit/schema.py) のベンチマーク
+Usage: python scripts/bench_schema.py [--migrations N] [--repeat N] [--json PATH]
+
+Writes a synthetic history of 500 migrations (tables with foreign keys,
+added columns, indexes, RLS and policies, and statements the parser skips)
+to a temporary directory and times loading the schema three ways:
+
+    cold         empty cache: every migration is parsed
+    warm         everything cached: operations are read and applied
+    incremental  one new migration since the last load, as after adding one
+
+Each way must give the same schema as parsing without a cache, and parse
+exactly 500, 0 and 1 files; a mismatch, or an incremental load not at
+least MIN_SPEEDUP times faster than a cold one, exits non-zero.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from slidekit import bench, schema
+
+MIGRATIONS = 500
+MIN_SPEEDUP = 3.0
+
+
+def table_name(t):
+    return "organizations" if t == 0 else f"table_{t:03d}"
+
+
+def migration(i):
+    """SQL of the i-th synthetic migration: every fifth creates a table."""
+    t, kind = i // 5, i % 5
+    name = table_name(t)
+    if kind == 0:
+        # A tree of foreign keys: each table references one created before it.
+        parent = "" if t == 0 else f"""
+  parent_id UUID REFERENCES {table_name((t - 1) // 2)}(id) ON DELETE CASCADE,"""
+        return f"""-- {name}
+CREATE TABLE IF NOT EXISTS {name} (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),{parent}
+  name TEXT NOT NULL,
+  status TEXT NOT NULL DEFAULT 'active' CHECK (status IN ('active', 'archived')),
+  created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+ALTER TABLE {name} ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Members can view {name}"
+  ON {name} FOR SELECT
+  USING (auth.uid() IS NOT NULL);
+"""
+    if kind == 1:
+        return f"""ALTER TABLE {name}
+  ADD COLUMN IF NOT EXISTS note_{i} TEXT,
+  ADD COLUMN IF NOT EXISTS amount_{i} INTEGER CHECK (amount_{i} >= 0);
+"""
+    if kind == 2:
+        return f"""CREATE INDEX IF NOT EXISTS idx_{name}_status_{i} ON {name}(status, created_at DESC)
+  WHERE status = 'active';
+CREATE UNIQUE INDEX IF NOT EXISTS idx_{name}_name_{i} ON {name}(name);
+"""
+    if kind == 3:
+        return f"""DROP POLICY IF EXISTS "Members can view {name}" ON {name};
+CREATE POLICY "Members can view {name}"
+  ON {name} FOR SELECT
+  USING (status = 'active' AND auth.uid() IS NOT NULL);
+
+CREATE POLICY "Members can update {name}"
+  ON {name} FOR UPDATE
+  USING (auth.uid() IS NOT NULL)
+  WITH CHECK (status IN ('active', 'archived'));
+"""
+    return f"""CREATE OR REPLACE FUNCTION touch_{i}() RETURNS trigger AS $$
+BEGIN
+  NEW.created_at = NOW();  -- not parsed: functions are skipped
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+ALTER TABLE {name} ALTER COLUMN note_{i - 3} SET DEFAULT '';
+"""
+
+
+def write_history(directory, start, count):
+    for i in range(start, start + count):
+        with open(os.path.join(directory, f"{20260101000000 + i:014d}_step_{i}.sql"), "w",
+                  encoding="utf-8") as f:
+            f.write(migration(i))
+
+
+def parsed(model):
+    return sum(1 for _, _, cached in model.migrations if not cached)
+
+
+# ─── Main ─────────────────────────────────────────────────────
+
+def run(count, repeat, work):
+    migrations = os.path.join(work, "migrations")
+    os.makedirs(migrations)
+    write_history(migrations, 0, count)
+    caches = iter(range(10**6))
+
+    def fresh_cache():
+        return os.path.join(work, f"cache-{next(caches)}")
+
+    cold_s, cold = bench.timeit(lambda cache: schema.load(migrations, cache), repeat, fresh_cache)
+    cache = fresh_cache()
+    schema.load(migrations, cache)
+    warm_s, warm = bench.timeit(lambda: schema.load(migrations, cache), repeat)
+    expected = schema.load(migrations).to_dict()
+
+    added = iter(range(count, count + repeat))
+
+    def add_migration():
+        write_history(migrations, next(added), 1)
+
+    incremental_s, incremental = bench.timeit(
+        lambda _: schema.load(migrations, cache), repeat, add_migration)
+
+    problems = []
+    for label, model, want in (("cold", cold, count), ("warm", warm, 0),
+                               ("incremental", incremental, 1)):
+        if parsed(model) != want:
+            problems.append(f"{label} load parsed {parsed(model)} migrations, expected {want}")
+    for label, model in (("cold", cold), ("warm", warm)):
+        if model.to_dict() != expected:
+            problems.append(f"{label} load differs from an uncached parse")
+    if incremental.to_dict() != schema.load(migrations).to_dict():
+        problems.append("incremental load differs from an uncached parse")
+
+    metrics = {
+        "schema.migrations": count,
+        "schema.tables": len(cold.tables),
+        "schema.cold_s": cold_s,
+        "schema.warm_s": warm_s,
+        "schema.incremental_s": incremental_s,
+        "schema.speedup": cold_s / incremental_s,
+    }
+    return metrics, problems
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="マイグレーション解析のベンチマークを実行します")
+    parser.add_argument("--migrations", type=int, default=MIGRATIONS, metavar="N",
+                        help="length of the synthetic history (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="runs per timing; the median is reported (default: %(default)s)")
+    parser.add_argument("--json", metavar="PATH", help="also write the metrics to PATH")
+    args = parser.parse_args(argv)
+    if args.migrations < 5:
+        parser.error("--migrations must be at least 5")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    t0 = time.perf_counter()
+    work = tempfile.mkdtemp(prefix="bench_schema-")
+    try:
+        metrics, problems = run(args.migrations, args.repeat, work)
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+    print(bench.format_table(metrics))
+    print(f"  cold {metrics['schema.cold_s'] * 1000:.1f} ms, warm "
+          f"{metrics['schema.warm_s'] * 1000:.1f} ms, incremental "
+          f"{metrics['schema.incremental_s'] * 1000:.1f} ms "
+          f"({metrics['schema.speedup']:.1f}x faster than cold)")
+    print(f"Benchmark took {time.perf_counter() - t0:.1f}s")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(metrics, f, indent=2, sort_keys=True)
+    if metrics["schema.speedup"] < MIN_SPEEDUP:
+        problems.append(f"incremental load only {metrics['schema.speedup']:.1f}x faster "
+                        f"than cold (expected {MIN_SPEEDUP:g}x)")
+    if problems:
+        raise SystemExit("Failed: " + "; ".join(problems))
+    print(f"OK: {args.migrations} migrations parsed once; a new one parses only itself")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""
+請求受取太郎 サービス資料 ジェネレータのベンチマーク
+Usage: python scripts/bench_slides.py [--repeat N] [--scales 50,200,1000]
+       [--rss-scales 12,1000] [--threshold PCT] [--baseline PATH] [--update-baseline] [--json PATH]
+
+Measures cold/warm import of the ReportLab modules, each slide_* function,
+canvas.save(), the full main() build (time, output bytes, peak memory), the
+deck with and without shared form XObjects (bytes, build and raster time),
+synthetic decks scaled to 50/200/1000 slides, and the peak RSS of a fresh
+process building 12/1000 slides buffered and streaming (--stream), then
+compares against the stored baseline. Exits non-zero when any metric regresses past its threshold.
+Image and plan caches are warmed first, so builds are measured steady-state.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from slidekit import bench, pdfstats
+
+import generate_slides as g
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_baseline.json")
+SCALES = (50, 200, 1000)
+RSS_SCALES = (12, 1000)
+IMPORT_MODULES = ("reportlab.pdfgen.canvas", "reportlab.pdfbase.cidfonts",
+                  "reportlab.lib.colors", "reportlab.lib.pagesizes")
+
+
+# ─── Measurements ─────────────────────────────────────────────
+
+def import_time(cold, repeat):
+    """Median time for a fresh interpreter to import the ReportLab modules.
+
+    Cold runs point the bytecode cache at an empty directory, so every module
+    is compiled from source; warm runs reuse the existing .pyc files.
+    """
+    code = ("import time; t = time.perf_counter(); "
+            + "; ".join(f"import {m}" for m in IMPORT_MODULES)
+            + "; print(time.perf_counter() - t)")
+    times = []
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ)
+            if cold:
+                env["PYTHONPYCACHEPREFIX"] = tmp
+            out = subprocess.run([sys.executable, "-c", code], env=env, check=True,
+                                 capture_output=True, text=True).stdout
+        times.append(float(out))
+    return sorted(times)[len(times) // 2]
+
+
+def scaled_slides(n):
+    """The deck's slide functions cycled to n slides."""
+    return [g.SLIDES[i % len(g.SLIDES)] for i in range(n)]
+
+
+def build_rss(n, streaming):
+    """Peak RSS of a fresh interpreter building n scaled slides to /dev/null."""
+    code = ("import os, sys; sys.path.insert(0, sys.argv[1]); "
+            "import bench_slides as b; from slidekit import bench; "
+            "b.g.build(open(os.devnull, 'wb'), b.scaled_slides(int(sys.argv[2])), "
+            "streaming=sys.argv[3] == '1'); print(bench.max_rss())")
+    out = subprocess.run([sys.executable, "-c", code, os.path.dirname(os.path.abspath(__file__)),
+                          str(n), "1" if streaming else "0"],
+                         check=True, capture_output=True, text=True).stdout
+    return int(out)
+
+
+def rasterize(data):
+    """Render every page of a PDF with PyMuPDF, as a viewer would."""
+    import pymupdf
+
+    for page in pymupdf.open(stream=data, filetype="pdf"):
+        page.get_pixmap(dpi=96)
+
+
+def forms_comparison(repeat):
+    """Output and page content-stream bytes, build time and (with PyMuPDF)
+    raster time of the deck drawn without and with shared form XObjects."""
+    try:
+        import pymupdf  # noqa: F401
+        can_raster = True
+    except ImportError:
+        can_raster = False
+    metrics = {}
+    saved = g.FORMS
+    try:
+        for forms in (False, True):
+            g.FORMS = forms
+            key = f"forms.{'on' if forms else 'off'}"
+
+            def build_deck(buf):
+                g.build(buf, g.SLIDES)
+                return buf.getvalue()
+            metrics[f"{key}.build_s"], data = bench.timeit(build_deck, repeat, setup=io.BytesIO)
+            metrics[f"{key}.output_bytes"] = len(data)
+            metrics[f"{key}.content_bytes"] = sum(
+                p["stream_bytes"] for p in pdfstats.summarize(data)["pages"])
+            if can_raster:
+                metrics[f"{key}.raster_s"], _ = bench.timeit(lambda: rasterize(data), repeat)
+    finally:
+        g.FORMS = saved
+    return metrics
+
+
+def run(repeat, scales, rss_scales=()):
+    metrics = {}
+    new_canvas = lambda: g.new_canvas(io.BytesIO())
+
+    # Warm the on-disk caches and this process's imports.
+    g.build(io.BytesIO(), g.SLIDES)
+
+    metrics["import.cold_s"] = import_time(True, repeat)
+    metrics["import.warm_s"] = import_time(False, repeat)
+
+    for fn in g.SLIDES:
+        metrics[f"slide.{fn.__name__}_s"], _ = bench.timeit(fn, repeat, setup=new_canvas)
+
+    def drawn_canvas():
+        c = new_canvas()
+        g.render_deck(c, g.SLIDES)
+        return c
+    metrics["build.save_s"], _ = bench.timeit(lambda c: c.save(), repeat, setup=drawn_canvas)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        out_path = os.path.join(tmp, "deck.pdf")
+        saved = g.OUTPUT_PATH
+        g.OUTPUT_PATH = out_path
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                metrics["build.main_s"], _ = bench.timeit(lambda: g.main([]), repeat)
+        finally:
+            g.OUTPUT_PATH = saved
+        metrics["build.output_bytes"] = os.path.getsize(out_path)
+        metrics["build.peak_mem_bytes"], _ = bench.peak_memory(
+            lambda: g.build(out_path, g.SLIDES))
+
+    for n in scales:
+        slides = scaled_slides(n)
+        def build_scaled(buf):
+            g.build(buf, slides)
+            return buf
+        metrics[f"scale.{n}.time_s"], buf = bench.timeit(
+            build_scaled, max(1, repeat * 50 // n), setup=io.BytesIO)
+        metrics[f"scale.{n}.output_bytes"] = len(buf.getvalue())
+
+    # Each build runs in its own process so RSS reflects that build alone.
+    for n in rss_scales:
+        metrics[f"stream.{n}.buffered_rss_bytes"] = build_rss(n, False)
+        metrics[f"stream.{n}.streaming_rss_bytes"] = build_rss(n, True)
+
+    metrics["process.max_rss_bytes"] = bench.max_rss()
+    # Last, so rasterizing with PyMuPDF does not count towards the peak RSS.
+    metrics.update(forms_comparison(repeat))
+    return metrics
+
+
+# ─── Main ─────────────────────────────────────────────────────
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="スライド生成のベンチマークを実行します")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="runs per timing; the median is reported (default: %(default)s)")
+    parser.add_argument("--scales", default=",".join(map(str, SCALES)),
+                        help="comma-separated synthetic deck sizes, or '' to skip "
+                             "(default: %(default)s)")
+    parser.add_argument("--rss-scales", default=",".join(map(str, RSS_SCALES)),
+                        help="comma-separated deck sizes to measure peak RSS for, buffered "
+                             "and streaming, or '' to skip (default: %(default)s)")
+    parser.add_argument("--threshold", type=float, default=bench.DEFAULT_THRESHOLD,
+                        help="allowed regression in percent (default: %(default)s)")
+    parser.add_argument("--baseline", default=BASELINE_PATH,
+                        help="baseline JSON to compare against (default: scripts/bench_baseline.json)")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="store this run as the new baseline (keeps per-metric thresholds)")
+    parser.add_argument("--json", metavar="PATH", help="also write the metrics to PATH")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    scales = [int(s) for s in args.scales.split(",") if s.strip()]
+    t0 = time.perf_counter()
+    rss_scales = [int(s) for s in args.rss_scales.split(",") if s.strip()]
+    metrics = run(args.repeat, scales, rss_scales)
+
+    baseline = bench.load_baseline(args.baseline)
+    rows = bench.compare(metrics, baseline, args.threshold) if baseline else []
+    print(bench.format_table(metrics, rows))
+    if scales:
+        print("Scaling:")
+        for n in scales:
+            t = metrics[f"scale.{n}.time_s"]
+            print(f"  {n:>5} slides: {t:.3f}s ({t / n * 1000:.2f} ms/slide, "
+                  f"{metrics[f'scale.{n}.output_bytes']:,} bytes)")
+    if rss_scales:
+        print("Peak RSS (buffered -> streaming):")
+        for n in rss_scales:
+            print(f"  {n:>5} slides: {metrics[f'stream.{n}.buffered_rss_bytes'] / 2**20:.1f} MB"
+                  f" -> {metrics[f'stream.{n}.streaming_rss_bytes'] / 2**20:.1f} MB")
+    print("Form XObjects (off -> on):")
+    for name, unit in (("output_bytes", "bytes"), ("content_bytes", "content stream bytes"),
+                       ("build_s", "s build"), ("raster_s", "s raster")):
+        off, on = metrics.get(f"forms.off.{name}"), metrics.get(f"forms.on.{name}")
+        if off is not None:
+            value = (lambda v: f"{v:.3f}") if name.endswith("_s") else (lambda v: f"{v:,}")
+            print(f"  {value(off)} -> {value(on)} {unit} ({(on - off) / off * 100:+.1f}%)")
+    print(f"Benchmark took {time.perf_counter() - t0:.1f}s")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(metrics, f, indent=2, sort_keys=True)
+    if args.update_baseline:
+        bench.save_baseline(args.baseline, metrics, (baseline or {}).get("thresholds"))
+        print(f"Baseline updated: {args.baseline}")
+        return
+    if baseline is None:
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create one.")
+        return
+    regressions = [r[0] for r in rows if r[4]]
+    if regressions:
+        raise SystemExit(f"Regressed past threshold: {', '.join(regressions)}")
+
+
+if __name__ == "__main__":
+    main()
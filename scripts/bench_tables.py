@@ -0,0 +1,135 @@
+"""
+表レイアウト (slidekit/tables.py) のベンチマーク
+Usage: python scripts/bench_tables.py [--scales 1000,10000,100000] [--repeat N] [--json PATH]
+
+Lays out invoice lists of 1,000 / 10,000 / 100,000 rows with the report's
+appendix table (text, ellipsized names and status pills), paginated with
+the header repeated on every page, onto a streaming canvas writing to
+/dev/null. For each size it reports wall time, time per row, pages, output
+bytes and the peak RSS of a fresh process doing the same, then checks that
+time and memory stay linear: per-row time at the largest size may not
+exceed LINEAR_SLACK times that at the smallest, and peak RSS may not grow
+faster than the rows do. A failed check exits non-zero.
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+from slidekit import bench, invoices
+
+import generate_slides as g
+import invoice_report
+
+SCALES = (1_000, 10_000, 100_000)
+LINEAR_SLACK = 1.5
+
+
+def sample_rows(count, seed=0):
+    """Synthetic invoices like invoices.write_sample(), generated lazily."""
+    rng = random.Random(seed)
+    vendors = [f"株式会社サンプル商事{i:03d}" for i in range(120)] + [
+        "", "合同会社テスト, 東京支店", "株式会社とても長い名前のサンプル取引先ホールディングス 本社経理部"]
+    for i in range(count):
+        year, month, day = rng.choice((2025, 2026)), rng.randint(1, 12), rng.randint(1, 28)
+        yield invoices.Invoice(
+            rng.choice(vendors), f"invoice_{year}{month:02d}_{i:06d}.pdf",
+            rng.randint(1, 2_000) * 1_000, f"{year}-{month:02d}-{day:02d}",
+            f"{year}/{month:02d}/{day:02d}", rng.random() < 0.7)
+
+
+def render(count):
+    """(pages, output bytes) of the appendix for count rows."""
+    with open(os.devnull, "wb") as f:
+        c = g.new_canvas(f, streaming=True)
+        pages = 0
+        for _ in invoice_report.appendix_pages(c, sample_rows(count), count):
+            c.showPage()
+            pages += 1
+        c.save()
+    return pages, c.bytes_written
+
+
+def render_rss(count):
+    """Peak RSS of a fresh interpreter rendering count rows."""
+    code = ("import sys; sys.path.insert(0, sys.argv[1]); "
+            "import bench_tables as b; from slidekit import bench; "
+            "b.render(int(sys.argv[2])); print(bench.max_rss())")
+    out = subprocess.run([sys.executable, "-c", code, os.path.dirname(os.path.abspath(__file__)),
+                          str(count)], check=True, capture_output=True, text=True).stdout
+    return int(out)
+
+
+# ─── Main ─────────────────────────────────────────────────────
+
+def run(scales, repeat):
+    metrics = {}
+    render(100)     # fonts, forms and imports out of the way
+    for n in scales:
+        elapsed, (pages, size) = bench.timeit(lambda: render(n), repeat)
+        peak = render_rss(n)
+        metrics[f"tables.{n}.layout_s"] = elapsed
+        metrics[f"tables.{n}.us_per_row"] = elapsed / n * 1e6
+        metrics[f"tables.{n}.pages"] = pages
+        metrics[f"tables.{n}.output_bytes"] = size
+        metrics[f"tables.{n}.max_rss_bytes"] = peak
+    return metrics
+
+
+def linearity(metrics, scales):
+    """Messages for each way the largest scale grows faster than linearly."""
+    lo, hi = min(scales), max(scales)
+    problems = []
+    per_row = metrics[f"tables.{hi}.us_per_row"] / metrics[f"tables.{lo}.us_per_row"]
+    if per_row > LINEAR_SLACK:
+        problems.append(f"time per row grows {per_row:.2f}x from {lo:,} to {hi:,} rows")
+    memory = metrics[f"tables.{hi}.max_rss_bytes"] / metrics[f"tables.{lo}.max_rss_bytes"]
+    if memory > hi / lo * LINEAR_SLACK:
+        problems.append(f"peak RSS grows {memory:.1f}x for {hi / lo:.0f}x the rows")
+    return problems
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="表レイアウトのベンチマークを実行します")
+    parser.add_argument("--scales", default=",".join(map(str, SCALES)),
+                        help="comma-separated row counts (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="runs per timing; the median is reported (default: %(default)s)")
+    parser.add_argument("--json", metavar="PATH", help="also write the metrics to PATH")
+    args = parser.parse_args(argv)
+    try:
+        args.scales = sorted({int(s) for s in args.scales.split(",")})
+    except ValueError:
+        parser.error("--scales must be comma-separated integers")
+    if len(args.scales) < 2 or args.scales[0] < 1:
+        parser.error("--scales needs at least two positive row counts")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    t0 = time.perf_counter()
+    metrics = run(args.scales, args.repeat)
+    print(bench.format_table(metrics))
+    for n in args.scales:
+        print(f"  {n:>9,} rows  {metrics[f'tables.{n}.layout_s']:7.2f}s  "
+              f"{metrics[f'tables.{n}.us_per_row']:7.1f} µs/row  "
+              f"{metrics[f'tables.{n}.pages']:>6,} pages  "
+              f"peak RSS {metrics[f'tables.{n}.max_rss_bytes'] / 2**20:6.1f} MB")
+    print(f"Benchmark took {time.perf_counter() - t0:.1f}s")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(metrics, f, indent=2, sort_keys=True)
+    problems = linearity(metrics, args.scales)
+    if problems:
+        raise SystemExit("Not linear: " + "; ".join(problems))
+    print("Linear: time per row and peak RSS hold up from "
+          f"{args.scales[0]:,} to {args.scales[-1]:,} rows")
+
+
+if __name__ == "__main__":
+    main()
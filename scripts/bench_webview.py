@@ -0,0 +1,213 @@
+"""
+サービス資料 PDF の Web 表示ベンチマーク (time to first page)
+Usage: python scripts/bench_webview.py [--pdf PATH] [--kbps N] [--latency-ms N] [--repeat N] [--json PATH]
+
+Serves the deck from a local HTTP server throttled to a slow mobile link
+(default about Chrome DevTools' "Fast 3G") and downloads it the way a
+browser's progressive viewer does, once per output variant: as built
+today, with object streams, linearized, and linearized with object
+streams. A plain PDF can only be drawn once its trailer, at the very end,
+has arrived; a linearized one as soon as the first /E bytes are in (every
+object page 1 references is checked to lie within them). Time to first
+page is that arrival time plus rendering page 1 with PyMuPDF.
+"""
+
+import argparse
+import http.server
+import io
+import json
+import logging
+import statistics
+import threading
+import time
+import urllib.request
+
+from slidekit import bench, pdfopt
+
+import generate_slides as g
+
+KBPS = 1440
+LATENCY_MS = 150
+CHUNK = 4096
+RENDER_DPI = 96
+VARIANTS = {
+    "plain": {},
+    "objstm": {"object_streams": True},
+    "linearized": {"linearize": True},
+    "linearized_objstm": {"linearize": True, "object_streams": True},
+}
+
+
+# ─── Throttled server ─────────────────────────────────────────
+
+def serve(files, kbps, latency):
+    """Start a server for files ({"/name.pdf": bytes}) limited to kbps kilobits
+    per second after `latency` seconds; returns (server, base URL)."""
+    rate = kbps * 1000 / 8
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            data = files.get(self.path)
+            if data is None:
+                self.send_error(404)
+                return
+            time.sleep(latency)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/pdf")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            start = time.perf_counter()
+            for sent in range(0, len(data), CHUNK):
+                delay = start + sent / rate - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                self.wfile.write(data[sent:sent + CHUNK])
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+# ─── Client ───────────────────────────────────────────────────
+
+def first_page_span(data):
+    """End offset of the last object page 1 needs: the page, its contents and
+    resources, and everything they reference (not the page tree above it)."""
+    from pypdf import PdfReader
+    from pypdf.generic import ArrayObject, DictionaryObject, IndirectObject
+
+    reader = PdfReader(io.BytesIO(data))
+    offsets = {}
+    for table in reader.xref.values():
+        offsets.update(table)
+
+    def offset(num):
+        if num in reader.xref_objStm:       # compressed: where its object stream is
+            return offset(reader.xref_objStm[num][0])
+        return offsets[num]
+
+    end, seen, refs = 0, set(), [reader.pages[0].indirect_reference]
+    while refs:
+        ref = refs.pop()
+        if ref.idnum in seen:
+            continue
+        seen.add(ref.idnum)
+        end = max(end, data.index(b"endobj", offset(ref.idnum)) + len(b"endobj"))
+        values = [ref.get_object()]
+        while values:
+            v = values.pop()
+            if isinstance(v, IndirectObject):
+                refs.append(v)
+            elif isinstance(v, DictionaryObject):
+                values.extend(x for k, x in v.items() if k != "/Parent")
+            elif isinstance(v, ArrayObject):
+                values.extend(v)
+    return end
+
+
+def render_first_page(data):
+    import pymupdf
+
+    with pymupdf.open(stream=data, filetype="pdf") as doc:
+        doc[0].get_pixmap(dpi=RENDER_DPI)
+
+
+def fetch(url):
+    """(seconds until page 1's bytes were in, seconds until the download finished,
+    bytes page 1 waited for, the PDF).
+
+    A linearized file announces in its first kilobyte that page 1 is complete
+    after /E bytes; any other file can only be read from its trailer, at the end.
+    """
+    t0 = time.perf_counter()
+    received, need, need_at = bytearray(), None, None
+    with urllib.request.urlopen(url) as resp:
+        total = int(resp.headers["Content-Length"])
+        while block := resp.read(CHUNK):
+            received += block
+            if need is None and len(received) >= min(1024, total):
+                need = pdfopt.first_page_end(bytes(received)) or total
+            if need_at is None and need is not None and len(received) >= need:
+                need_at = time.perf_counter() - t0
+    return need_at, time.perf_counter() - t0, need, bytes(received)
+
+
+# ─── Main ─────────────────────────────────────────────────────
+
+def variants(pdf_path=None):
+    """{name: PDF bytes}: the deck (or pdf_path) as given and rewritten per VARIANTS."""
+    if pdf_path:
+        with open(pdf_path, "rb") as f:
+            plain = f.read()
+    else:
+        buf = io.BytesIO()
+        g.build(buf, g.SLIDES)
+        plain = buf.getvalue()
+    return {name: pdfopt.rewrite_bytes(plain, **opts) if opts else plain
+            for name, opts in VARIANTS.items()}
+
+
+def run(files, kbps, latency, repeat):
+    server, base = serve({f"/{name}.pdf": data for name, data in files.items()}, kbps, latency)
+    metrics = {}
+    try:
+        for name, data in files.items():
+            runs = [fetch(f"{base}/{name}.pdf") for _ in range(repeat)]
+            need, received = runs[0][2], runs[0][3]
+            if received != data:
+                raise SystemExit(f"{name}: downloaded bytes differ from the served PDF")
+            if first_page_span(data) > need:
+                raise SystemExit(f"{name}: page 1 needs bytes past /E ({need:,})")
+            render_s, _ = bench.timeit(lambda: render_first_page(data), repeat)
+            metrics[f"webview.{name}.output_bytes"] = len(data)
+            metrics[f"webview.{name}.first_page_bytes"] = need
+            metrics[f"webview.{name}.first_page_s"] = (
+                statistics.median(r[0] for r in runs) + render_s)
+            metrics[f"webview.{name}.download_s"] = statistics.median(r[1] for r in runs)
+    finally:
+        server.shutdown()
+    return metrics
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="PDF の初回表示までの時間を計測します")
+    parser.add_argument("--pdf", metavar="PATH",
+                        help="measure this PDF instead of a fresh build of the deck")
+    parser.add_argument("--kbps", type=int, default=KBPS,
+                        help="server bandwidth in kilobits per second (default: %(default)s)")
+    parser.add_argument("--latency-ms", type=int, default=LATENCY_MS,
+                        help="delay before each response starts (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="downloads per variant; the median is reported (default: %(default)s)")
+    parser.add_argument("--json", metavar="PATH", help="also write the metrics to PATH")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        import pymupdf  # noqa: F401
+    except ImportError:
+        raise SystemExit("bench_webview.py requires PyMuPDF (pip install pymupdf)")
+    # pypdf notes every linearized file's first-page xref section as "not zero-indexed".
+    logging.getLogger("pypdf").setLevel(logging.ERROR)
+    t0 = time.perf_counter()
+    metrics = run(variants(args.pdf), args.kbps, args.latency_ms / 1000, args.repeat)
+    print(bench.format_table(metrics))
+    base = metrics["webview.plain.first_page_s"]
+    print(f"Time to first page at {args.kbps:,} kbit/s, {args.latency_ms} ms:")
+    for name in VARIANTS:
+        first = metrics[f"webview.{name}.first_page_s"]
+        print(f"  {name:<18} {first:6.2f}s  ({metrics[f'webview.{name}.first_page_bytes']:>9,} of "
+              f"{metrics[f'webview.{name}.output_bytes']:>9,} bytes)  {base / first:5.1f}x")
+    print(f"Benchmark took {time.perf_counter() - t0:.1f}s")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(metrics, f, indent=2, sort_keys=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,370 @@
+"""
+請求受取太郎 データモデル PDF 生成スクリプト
+Usage: python scripts/data_model.py [-o PATH|-] [--migrations DIR] [--json PATH] [--no-cache]
+
+Reads supabase/migrations in order into a schema model (slidekit/schema.py)
+and draws it with the deck's helpers: an ER slide of every table, its keys
+and foreign keys, with whether RLS is on and how many policies guard it,
+then an appendix of every column, index and RLS policy. Parsed migrations
+are cached per file under .cache/slides/schema, so after a new migration
+only that file is parsed.
+
+The ER slide is its own document rather than a deck slide: the deck's page
+numbers are fixed (TOTAL_PAGES) and its audience is customers, not the team.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from slidekit import bench, schema as schema_mod, tables, textlayout
+
+import generate_slides as g
+from generate_slides import (
+    PAGE_W, PAGE_H, MARGIN, WHITE, INDIGO_600, PURPLE_600, EMERALD_500, ROSE_500,
+    SLATE_50, SLATE_200, SLATE_400, SLATE_500, SLATE_600, SLATE_800,
+    accent_bar_bottom, circle, draw_text, page_bg, pill, rounded_rect, section_header,
+)
+from invoice_report import page_count, table_style
+
+DOC_TITLE = "請求受取太郎 データモデル"
+MIGRATIONS_DIR = os.path.join(g.BASE_DIR, "supabase", "migrations")
+OUTPUT_PATH = os.path.join(g.BASE_DIR, "docs", "請求受取太郎_データモデル.pdf")
+SCHEMA_CACHE_DIR = os.path.join(g.CACHE_DIR, "schema")
+
+# ─── Layout ───────────────────────────────────────────────────
+ER_TOP = PAGE_H - 122
+ER_BOTTOM = 56
+LAYER_GAP = 40
+BOX_GAP = 8
+BOX_HEADER_H = 18
+BOX_ROW_H = 10.5
+BOX_SIZE = 6.5
+# Text in a box row starts after the PK / FK marker.
+MARKER_W = 15
+
+TABLE_X = MARGIN
+TABLE_TOP = PAGE_H - 125
+TABLE_BOTTOM = 40
+ROW_H = 17
+
+COLUMN_COLUMNS = [("テーブル", 120, "left"), ("カラム", 160, "left"), ("型", 96, "left"),
+                  ("必須", 44, "center"), ("デフォルト", 140, "left"), ("制約・参照", 158, "left")]
+INDEX_COLUMNS = [("インデックス", 230, "left"), ("テーブル", 150, "left"),
+                 ("カラム", 180, "left"), ("一意", 40, "center"), ("条件", 118, "left")]
+POLICY_COLUMNS = [("テーブル", 130, "left"), ("ポリシー", 250, "left"),
+                  ("操作", 60, "left"), ("条件", 278, "left")]
+
+APPENDIX_TABLE = table_style(ROW_H, 8)
+
+
+# ─── ER slide ─────────────────────────────────────────────────
+
+def layers(model):
+    """Table names in columns by foreign-key depth: referenced tables to the left.
+
+    Tables outside the migrations (auth.users) go in the first column; a
+    table referencing only itself or nothing also starts there. Within a
+    column, tables keep their creation order.
+    """
+    depth = {name: 0 for name in model.referenced_tables()}
+
+    def visit(name, seen):
+        if name not in depth:
+            parents = [fk.table for fk in model.tables[name].foreign_keys
+                       if fk.table != name and fk.table not in seen]
+            depth[name] = 1 + max((visit(p, seen | {name}) for p in parents), default=-1)
+        return depth[name]
+
+    for name in model.tables:
+        visit(name, frozenset())
+    columns = [[] for _ in range(max(depth.values(), default=-1) + 1)]
+    for name in list(model.tables) + model.referenced_tables():
+        columns[depth[name]].append(name)
+    return columns
+
+
+def box_rows(model, name):
+    """(marker, column name, note) rows of a table's box: keys first, then the rest."""
+    table = model.tables.get(name)
+    if table is None:
+        return [("PK", "id", "uuid")]
+    refs = {}
+    for fk in table.foreign_keys:
+        for col in fk.columns:
+            refs.setdefault(col, fk.table)
+    rows = []
+    for col in table.columns.values():
+        marker = "PK" if col.name in table.primary_key else "FK" if col.name in refs else ""
+        note = f"→ {refs[col.name]}" if col.name in refs else col.type.lower()
+        rows.append((marker, col.name, note))
+    rank = {"PK": 0, "FK": 1, "": 2}
+    return sorted(rows, key=lambda r: rank[r[0]])
+
+
+def box_height(rows):
+    return BOX_HEADER_H + len(rows) * BOX_ROW_H + 4
+
+
+def fit_layer(boxes, height):
+    """Cap the rows of a column's boxes, longest first, until they fit in height.
+
+    A capped box keeps one row less than its cap for a "… 他N列" line.
+    """
+    caps = [len(rows) for rows in boxes]
+
+    def total():
+        return sum(box_height(rows[:cap]) for rows, cap in zip(boxes, caps)) \
+            + BOX_GAP * (len(boxes) - 1)
+
+    while total() > height and max(caps) > 3:
+        caps[caps.index(max(caps))] -= 1
+    return [rows if cap == len(rows) else rows[:cap - 1] + [("", f"… 他{len(rows) - cap + 1}列", "")]
+            for rows, cap in zip(boxes, caps)]
+
+
+def draw_box(c, model, name, x, top, w, rows):
+    """A table's box: name, RLS pill and rows; returns {column: y} for its rows."""
+    table = model.tables.get(name)
+    h = box_height(rows)
+    rounded_rect(c, x, top - h, w, h, 5, fill=WHITE, stroke=SLATE_200, lw=0.75)
+    header = INDIGO_600 if table is not None else SLATE_400
+    rounded_rect(c, x, top - BOX_HEADER_H, w, BOX_HEADER_H, 5, fill=header)
+    g.fill_rect(c, x, top - BOX_HEADER_H, w, 5, header)
+    if table is None:
+        label, color = "外部", SLATE_500
+    elif table.rls:
+        label, color = f"RLS {len(model.policies_on(name))}", EMERALD_500
+    else:
+        label, color = "RLSなし", ROSE_500
+    pill_w = 34
+    pill(c, x + w - pill_w - 5, top - BOX_HEADER_H + 4, pill_w, 10, color)
+    draw_text(c, x + w - pill_w / 2 - 5, top - BOX_HEADER_H + 6.5, label, 6, WHITE, "center")
+    draw_text(c, x + 7, top - BOX_HEADER_H + 5.5,
+              tables.clip(name, g.FONT, 8, w - pill_w - 18), 8, WHITE)
+
+    ys = {}
+    y = top - BOX_HEADER_H - 2
+    for marker, col, note in rows:
+        mid = y - BOX_ROW_H / 2
+        if marker:
+            draw_text(c, x + 5, mid - 2, marker, 5, INDIGO_600 if marker == "PK" else PURPLE_600)
+            ys[col] = mid
+        note_w = min(textlayout.measure(note, g.FONT, BOX_SIZE - 0.5) if note else 0, w * 0.5)
+        name_w = w - MARKER_W - note_w - 12
+        draw_text(c, x + MARKER_W, mid - 2.3, tables.clip(col, g.FONT, BOX_SIZE, name_w),
+                  BOX_SIZE, SLATE_800 if marker else SLATE_600)
+        if note:
+            draw_text(c, x + w - 5, mid - 2.3, tables.clip(note, g.FONT, BOX_SIZE - 0.5, note_w),
+                      BOX_SIZE - 0.5, PURPLE_600 if note.startswith("→") else SLATE_400, "right")
+        y -= BOX_ROW_H
+    return ys
+
+
+def draw_edge(c, x0, y0, x1, y1, elbow):
+    """Foreign key from (x0, y0) on a child's left edge to (x1, y1) on its parent's right."""
+    p = c.beginPath()
+    p.moveTo(x0, y0)
+    p.lineTo(elbow, y0)
+    p.lineTo(elbow, y1)
+    p.lineTo(x1, y1)
+    c.setStrokeColor(SLATE_400)
+    c.setLineWidth(0.75)
+    c.drawPath(p, stroke=1, fill=0)
+    circle(c, x0, y0, 1.6, PURPLE_600)
+    circle(c, x1, y1, 1.6, INDIGO_600)
+
+
+def slide_er(c, model):
+    page_bg(c, SLATE_50)
+    section_header(c, "データモデル",
+                   f"supabase/migrations {len(model.migrations)}件から生成 ・ "
+                   f"テーブル{len(model.tables)} ・ インデックス{len(model.indexes)} ・ "
+                   f"RLSポリシー{len(model.policies)}")
+    columns = layers(model)
+    if not columns:
+        draw_text(c, MARGIN, ER_TOP - 20, "テーブルがありません", 10, SLATE_500)
+        return
+    box_w = (PAGE_W - MARGIN * 2 - LAYER_GAP * (len(columns) - 1)) / len(columns)
+    # name -> (x, top, {key column: y})
+    placed = {}
+    for i, names in enumerate(columns):
+        x = MARGIN + i * (box_w + LAYER_GAP)
+        top = ER_TOP
+        boxes = fit_layer([box_rows(model, n) for n in names], ER_TOP - ER_BOTTOM)
+        for name, rows in zip(names, boxes):
+            placed[name] = (i, x, top, draw_box(c, model, name, x, top, box_w, rows))
+            top -= box_height(rows) + BOX_GAP
+
+    # Lines join adjacent columns only; longer references read from the "→" note.
+    for name, table in model.tables.items():
+        layer, x, _, ys = placed[name]
+        for fk in table.foreign_keys:
+            target = placed.get(fk.table)
+            col = fk.columns[0]
+            if target is None or target[0] != layer - 1 or col not in ys:
+                continue
+            _, tx, ttop, tys = target
+            ty = tys.get(fk.ref_columns[0] if fk.ref_columns else "id",
+                         ttop - BOX_HEADER_H - 2 - BOX_ROW_H / 2)
+            parents = columns[layer - 1]
+            elbow = x - LAYER_GAP / 2 + (parents.index(fk.table) - (len(parents) - 1) / 2) * 6
+            draw_edge(c, x, ys[col], tx + box_w, ty, elbow)
+
+    legend = [(INDIGO_600, "PK 主キー"), (PURPLE_600, "FK 外部キー（→ 参照先）"),
+              (EMERALD_500, "RLS n: 行レベルセキュリティ有効・ポリシー数"),
+              (SLATE_400, "外部: Supabase 管理のテーブル")]
+    lx = MARGIN
+    for color, text in legend:
+        circle(c, lx + 3, 40, 3, color)
+        draw_text(c, lx + 10, 37.5, text, 7.5, SLATE_600)
+        lx += 22 + textlayout.measure(text, g.FONT, 7.5)
+    draw_text(c, PAGE_W - MARGIN, 37.5, "線は隣り合う列の外部キーのみ", 7.5, SLATE_400, "right")
+
+
+# ─── Appendix ─────────────────────────────────────────────────
+
+def appendix_table(columns):
+    return g.table([tables.Column(title, w, align, "key" if i == 0 else "body", "ellipsis")
+                    for i, (title, w, align) in enumerate(columns)], APPENDIX_TABLE)
+
+
+def constraint_label(table, col, refs):
+    parts = []
+    if col.name in table.primary_key:
+        parts.append("PK")
+    if col.name in refs:
+        fk = refs[col.name]
+        parts.append(f"→ {fk.table}" + (f" ({fk.on_delete})" if fk.on_delete else ""))
+    if col.unique:
+        parts.append("UNIQUE")
+    if col.check:
+        parts.append(f"CHECK {col.check}")
+    return " ・ ".join(parts)
+
+
+def column_rows(model):
+    for table in model.tables.values():
+        refs = {col: fk for fk in table.foreign_keys for col in fk.columns}
+        dot = EMERALD_500 if table.rls else ROSE_500
+        for i, col in enumerate(table.columns.values()):
+            yield ([table.name if i == 0 else "", col.name, col.type.lower(),
+                    "" if col.nullable else "○", col.default or "",
+                    constraint_label(table, col, refs)], dot if i == 0 else None)
+
+
+def index_rows(model):
+    for ix in model.indexes.values():
+        yield ([ix.name, ix.table, ", ".join(ix.columns), "○" if ix.unique else "",
+                ix.where or ""], None)
+
+
+def policy_rows(model):
+    # Grouped by table in creation order; tables outside public (storage.objects) last.
+    order = {name: i for i, name in enumerate(model.tables)}
+    for p in sorted(model.policies.values(), key=lambda p: order.get(p.table, len(order))):
+        condition = " / ".join(f"{label}: {expr}" for label, expr in
+                               (("USING", p.using), ("WITH CHECK", p.check)) if expr)
+        yield ([p.table, p.name, p.command, condition], None)
+
+
+APPENDIX = [
+    ("テーブル定義", "マイグレーション適用後のカラム ・ 行頭の点: 緑 = RLS有効、赤 = RLSなし", COLUMN_COLUMNS,
+     column_rows, lambda m: sum(len(t.columns) for t in m.tables.values())),
+    ("インデックス", "マイグレーションで作成されたインデックス（主キー・UNIQUE制約を除く）",
+     INDEX_COLUMNS, index_rows, lambda m: len(m.indexes)),
+    ("RLSポリシー", "行レベルセキュリティのポリシー（storage.objects を含む）",
+     POLICY_COLUMNS, policy_rows, lambda m: len(m.policies)),
+]
+
+
+def appendix_pages(c, model, title, subtitle, columns, rows):
+    def begin(start, count):
+        page_bg(c, WHITE)
+        section_header(c, title if start == 0 else f"{title}（続き）", subtitle)
+
+    yield from appendix_table(columns).pages(
+        c, TABLE_X, rows(model), TABLE_TOP, TABLE_BOTTOM, begin)
+
+
+def page_footer(c, n, total):
+    accent_bar_bottom(c)
+    draw_text(c, 36, 22, DOC_TITLE, 8, SLATE_400)
+    draw_text(c, PAGE_W - 36, 22, f"{n} / {total}", 8, SLATE_400, "right")
+
+
+def render_model(c, model):
+    """Draw the ER slide and the appendix onto c; returns the page count."""
+    total_pages = 1 + sum(
+        page_count(count(model), appendix_table(columns).rows_per_page(TABLE_TOP, TABLE_BOTTOM))
+        for _, _, columns, _, count in APPENDIX)
+
+    def pages():
+        slide_er(c, model)
+        yield
+        for title, subtitle, columns, rows, _ in APPENDIX:
+            yield from appendix_pages(c, model, title, subtitle, columns, rows)
+
+    n = 0
+    for n, _ in enumerate(pages(), 1):
+        page_footer(c, n, total_pages)
+        c.showPage()
+    return n
+
+
+# ─── Main ─────────────────────────────────────────────────────
+
+def build_model(model, target):
+    """Write the document for model to a path or binary stream; returns (pages, bytes)."""
+    c = g.new_canvas(target, streaming=True)
+    c.setTitle(DOC_TITLE)
+    pages = render_model(c, model)
+    c.save()
+    return pages, c.bytes_written
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="マイグレーションからデータモデル PDF を生成します")
+    parser.add_argument("-o", "--output", default=OUTPUT_PATH,
+                        help="PDF to write, or - for stdout (default: docs/請求受取太郎_データモデル.pdf)")
+    parser.add_argument("--migrations", default=MIGRATIONS_DIR, metavar="DIR",
+                        help="directory of *.sql migrations (default: supabase/migrations)")
+    parser.add_argument("--json", metavar="PATH", help="also write the schema model to PATH")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="parse every migration instead of reusing .cache/slides/schema")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # With -o - the PDF is the only thing on stdout; status goes to stderr.
+    log = sys.stderr if args.output == "-" else sys.stdout
+    t0 = time.perf_counter()
+    try:
+        model = schema_mod.load(args.migrations, None if args.no_cache else SCHEMA_CACHE_DIR)
+    except (OSError, schema_mod.SchemaError) as e:
+        raise SystemExit(f"error: {e}")
+    if not model.migrations:
+        raise SystemExit(f"error: no migrations in {args.migrations}")
+    parsed_s = time.perf_counter() - t0
+    cached = sum(1 for _, _, hit in model.migrations if hit)
+    print(f"Schema: {len(model.migrations)} migrations ({len(model.migrations) - cached} parsed, "
+          f"{cached} cached) in {parsed_s * 1000:.1f}ms: {len(model.tables)} tables, "
+          f"{len(model.indexes)} indexes, {len(model.policies)} policies", file=log)
+    for name, line, statement in model.skipped:
+        print(f"  skipped {name}:{line}: {statement}", file=log)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(model.to_dict(), f, ensure_ascii=False, indent=2)
+
+    pages, written = build_model(model, sys.stdout.buffer if args.output == "-" else args.output)
+    target = "stdout" if args.output == "-" else os.path.abspath(args.output)
+    print(f"Done: {pages} pages, {written:,} bytes -> {target}", file=log)
+    print(f"  {time.perf_counter() - t0:.2f}s, peak RSS {bench.max_rss() / 2**20:.1f} MB",
+          file=log)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,90 @@
 """
 請求受取太郎 サービス資料 PDF スライド生成スクリプト (v2)
-Usage: python scripts/generate_slides.py
+Usage: python scripts/generate_slides.py [-o PATH|-] [--stream] [--slides 5,6 | --from N --to M]
+       [--list] [--dry-run] [--check] [--gradients shading|stripes] [--image-dpi N]
+       [--embed-font TTF] [--no-state-cache] [--no-forms] [--jobs N]
+       [--linearize] [--object-streams] [--compress-level 0-9]
+       [--reproducible] [--store DIR [--upload CMD]]
+       [--memory-profile JSON] [--memory-budget MB [--on-budget fail|stream]]
+       [--incremental [--explain]] [--watch [--port N]] [--batch RECIPIENTS --batch-out DIR_OR_ZIP]
+       [--spec scripts/deck.yaml] [--profile PROFILE.json]
+       [--thumbnails [DIR] [--thumb-widths 320,640,1280] [--thumb-formats png,webp]]
 Output: docs/請求受取太郎_サービス資料.pdf
 """
 
 from reportlab.lib.pagesizes import landscape, A4
-from reportlab.lib.units import mm
 from reportlab.lib.colors import HexColor, white, Color
-from reportlab.pdfgen import canvas
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.cidfonts import UnicodeCIDFont
+import argparse
+import io
+import json
 import os
+import sys
+import time
+
+# Only modules slides draw through are imported eagerly (incremental builds
+# fingerprint them); canvas, fonts and the build-mode modules are imported
+# where they are used so --list, --dry-run and single-slide renders start fast.
+from slidekit import forms, gradients, images, tables, textlayout
 
 # ─── Fonts ────────────────────────────────────────────────────
-pdfmetrics.registerFont(UnicodeCIDFont("HeiseiKakuGo-W5"))
-pdfmetrics.registerFont(UnicodeCIDFont("HeiseiMin-W3"))
-FONT = "HeiseiKakuGo-W5"
-FONT_MIN = "HeiseiMin-W3"
+# Registered on first use by setup_fonts().
+CID_FONT = "HeiseiKakuGo-W5"
+CID_FONT_MIN = "HeiseiMin-W3"
+# Fonts the slides draw with; setup_fonts() points both at EMBED_FONT when set.
+FONT = CID_FONT
+FONT_MIN = CID_FONT_MIN
 
 # ─── Page ─────────────────────────────────────────────────────
 PAGE_W, PAGE_H = landscape(A4)
 MARGIN = 48
 TOTAL_PAGES = 12
 
+# ─── Rendering ────────────────────────────────────────────────
+# "shading" paints gradients with shared PDF axial shadings; "stripes" is the
+# legacy 60-band fallback for viewers that mishandle shadings.
+GRADIENT_MODE = gradients.SHADING
+# Images are resampled to their placed size at this resolution.
+IMAGE_DPI = images.DEFAULT_DPI
+# Plan highlighted on the pricing slide (None for no highlight).
+RECOMMENDED_PLAN = "Pro"
+# TrueType font (glyf outlines, e.g. Noto Sans JP or IPAexGothic) to embed,
+# subsetted to the glyphs the deck uses. None keeps the non-embedded CID fonts,
+# whose look depends on the viewer.
+EMBED_FONT = None
+# Skip font/color/line-width operators that would not change the graphics state.
+STATE_CACHE = True
+# Draw repeated fixed-geometry chrome (backgrounds, accent bars, card
+# shadows) as form XObjects defined once per document.
+FORMS = True
+# Byte-reproducible output: timestamps pinned to SOURCE_DATE_EPOCH (else
+# 2000-01-01) and a document ID derived from the content, so the same inputs
+# always give the same PDF.
+REPRODUCIBLE = False
+# Rewrite the finished PDF for delivery (needs pikepdf): linearized for fast
+# web view, small objects packed into compressed object streams, and content
+# streams recompressed at this zlib level (None keeps ReportLab's, 0 stores
+# them uncompressed).
+LINEARIZE = False
+OBJECT_STREAMS = False
+COMPRESS_LEVEL = None
+# Resident-memory budget in bytes (None for none), checked after every slide,
+# and what to do once the next slide could exceed it: "fail", or "stream" to
+# write out the pages finished so far and continue page by page.
+MEMORY_BUDGET = None
+MEMORY_STRATEGY = "fail"
+# With "stream", the switch happens this fraction of the budget early:
+# writing out the buffered pages briefly needs memory of its own.
+STREAM_RESERVE = 0.15
+# Smallest size draw_text() may shrink copy to so it fits its box, as a
+# fraction of the design size.
+TEXT_MIN_SCALE = 0.8
+# --watch polls its sources this often (seconds), waits for a changed file to
+# settle before reloading, and serves the preview here.
+WATCH_INTERVAL = 0.05
+WATCH_SETTLE = 0.02
+PREVIEW_HOST = "127.0.0.1"
+PREVIEW_PORT = 8000
+
 # ─── Colors ───────────────────────────────────────────────────
 INDIGO_50 = HexColor("#EEF2FF")
 INDIGO_100 = HexColor("#E0E7FF")
@@ -56,30 +118,22 @@ LOGO_PATH = os.path.join(BASE_DIR, "docs", "images", "logo.png")
 SS_INVOICE = os.path.join(BASE_DIR, "docs", "images", "invoice-list.png")
 SS_VENDOR = os.path.join(BASE_DIR, "docs", "images", "vendor-list.png")
 OUTPUT_PATH = os.path.join(BASE_DIR, "docs", "請求受取太郎_サービス資料.pdf")
+PLAN_LIMITS_PATH = os.path.join(BASE_DIR, "src", "lib", "plan-limits.ts")
+CACHE_DIR = os.path.join(BASE_DIR, ".cache", "slides")
+THUMB_DIR = os.path.join(BASE_DIR, "public", "slides")
 
 
 # ─── Drawing Helpers ──────────────────────────────────────────
 
 def gradient_rect(c, x, y, w, h, c1, c2, steps=60):
     """Horizontal gradient fill."""
-    for i in range(steps):
-        t = i / steps
-        r = c1.red + (c2.red - c1.red) * t
-        g = c1.green + (c2.green - c1.green) * t
-        b = c1.blue + (c2.blue - c1.blue) * t
-        c.setFillColor(Color(r, g, b))
-        c.rect(x + w * i / steps, y, w / steps + 1, h, stroke=0, fill=1)
+    gradients.fill_rect(c, x, y, w, h, [c1, c2], mode=GRADIENT_MODE, steps=steps)
 
 
 def gradient_rect_v(c, x, y, w, h, c1, c2, steps=60):
     """Vertical gradient fill (bottom to top)."""
-    for i in range(steps):
-        t = i / steps
-        r = c1.red + (c2.red - c1.red) * t
-        g = c1.green + (c2.green - c1.green) * t
-        b = c1.blue + (c2.blue - c1.blue) * t
-        c.setFillColor(Color(r, g, b))
-        c.rect(x, y + h * i / steps, w, h / steps + 1, stroke=0, fill=1)
+    gradients.fill_rect(c, x, y, w, h, [c1, c2], vertical=True,
+                        mode=GRADIENT_MODE, steps=steps)
 
 
 def rounded_rect(c, x, y, w, h, r, fill=None, stroke=None, lw=1):
@@ -92,6 +146,20 @@ def rounded_rect(c, x, y, w, h, r, fill=None, stroke=None, lw=1):
     c.roundRect(x, y, w, h, r, stroke=1 if stroke else 0, fill=1 if fill else 0)
 
 
+def reuse(c, name, x, y, bbox, draw):
+    """draw(c, x, y) via a form XObject shared by every same-named use (see
+    slidekit/forms.py), or directly when FORMS is off."""
+    if FORMS:
+        forms.place(c, name, x, y, bbox, lambda c: draw(c, 0, 0))
+    else:
+        draw(c, x, y)
+
+
+def _num(v):
+    """v for a form name: ASCII, no exponent, 2 decimals at most."""
+    return f"{round(v, 2):g}"
+
+
 def pill(c, x, y, w, h, fill):
     """Draw a pill shape (fully rounded rect)."""
     rounded_rect(c, x, y, w, h, h / 2, fill=fill)
@@ -113,8 +181,8 @@ def icon_badge(c, x, y, size, color, letter):
 
 def page_bg(c, color=WHITE):
     """Fill page background."""
-    c.setFillColor(color)
-    c.rect(0, 0, PAGE_W, PAGE_H, stroke=0, fill=1)
+    reuse(c, f"bg-{color.hexvala()[2:]}", 0, 0, (0, 0, PAGE_W, PAGE_H),
+          lambda c, x, y: fill_rect(c, x, y, PAGE_W, PAGE_H, color))
 
 
 def page_num(c, n):
@@ -126,36 +194,162 @@ def page_num(c, n):
 
 def accent_bar_bottom(c):
     """Thin gradient bar at page bottom."""
-    gradient_rect(c, 0, 0, PAGE_W, 3, INDIGO_600, PURPLE_500)
+    reuse(c, "accent-bar", 0, 0, (0, 0, PAGE_W, 3),
+          lambda c, x, y: gradient_rect(c, x, y, PAGE_W, 3, INDIGO_600, PURPLE_500))
 
 
 def section_header(c, title, subtitle=None):
     """Draw a clean section header with left accent bar."""
-    gradient_rect_v(c, MARGIN, PAGE_H - 95, 4, 40, INDIGO_600, PURPLE_500)
-    c.setFont(FONT, 24)
-    c.setFillColor(SLATE_900)
-    c.drawString(MARGIN + 16, PAGE_H - 82, title)
+    reuse(c, "section-bar", MARGIN, PAGE_H - 95, (0, 0, 4, 40),
+          lambda c, x, y: gradient_rect_v(c, x, y, 4, 40, INDIGO_600, PURPLE_500))
+    width = PAGE_W - MARGIN * 2 - 16
+    draw_text(c, MARGIN + 16, PAGE_H - 82, title, 24, SLATE_900, width=width)
     if subtitle:
-        c.setFont(FONT, 11)
-        c.setFillColor(SLATE_500)
-        c.drawString(MARGIN + 16, PAGE_H - 100, subtitle)
+        draw_text(c, MARGIN + 16, PAGE_H - 100, subtitle, 11, SLATE_500, width=width)
 
 
-def bullet_list(c, x, y, items, color=INDIGO_500, font_size=12, line_h=28, text_color=SLATE_700):
-    """Draw a bulleted list with colored dots."""
+def bullet_list(c, x, y, items, color=INDIGO_500, font_size=12, line_h=28, text_color=SLATE_700,
+                width=None):
+    """Draw a bulleted list with colored dots, each item fitted to `width` if given."""
     for item in items:
         circle(c, x + 5, y + 4, 3.5, color)
-        c.setFont(FONT, font_size)
-        c.setFillColor(text_color)
-        c.drawString(x + 18, y, item)
+        draw_text(c, x + 18, y, item, font_size, text_color,
+                  width=None if width is None else width - 18)
         y -= line_h
     return y
 
 
+def draw_image(c, path, x, y, width, height):
+    """Draw an image resampled for IMAGE_DPI, via the on-disk preparation cache."""
+    images.draw_image(c, path, x, y, width, height, dpi=IMAGE_DPI,
+                      cache_dir=os.path.join(CACHE_DIR, "images"))
+
+
 def draw_shadow_card(c, x, y, w, h, radius=12):
-    """Draw a card with subtle shadow effect."""
-    rounded_rect(c, x + 2, y - 2, w, h, radius, fill=Color(0, 0, 0, 0.04))
-    rounded_rect(c, x, y, w, h, radius, fill=WHITE, stroke=SLATE_200, lw=0.5)
+    """Draw a card with subtle shadow effect; cards of one size share a form."""
+    def card(c, x, y):
+        rounded_rect(c, x + 2, y - 2, w, h, radius, fill=Color(0, 0, 0, 0.04))
+        rounded_rect(c, x, y, w, h, radius, fill=WHITE, stroke=SLATE_200, lw=0.5)
+    reuse(c, f"card-{_num(w)}x{_num(h)}-r{_num(radius)}", x, y, (-1, -3, w + 3, h + 1), card)
+
+
+def draw_text(c, x, y, text, size, color, align="left", font=None, width=None,
+              max_lines=1, line_h=None):
+    """Text anchored at x on its left, center or right, first baseline at y.
+
+    With `width`, the text is wrapped on Japanese line-breaking rules into at
+    most max_lines lines (line_h apart, default 1.5 x size) and shrunk, down
+    to TEXT_MIN_SCALE x size, until it fits; boxes that had to shrink or
+    still overflow go in the text report. Returns the size drawn at.
+    """
+    font = font or FONT
+    line_h = line_h or size * 1.5
+    lines = (text,)
+    if width is not None:
+        fitted = textlayout.place(text, font, size, width, max_lines, size * TEXT_MIN_SCALE)
+        line_h *= fitted.size / size
+        size, lines = fitted.size, fitted.lines
+    c.setFont(font, size)
+    c.setFillColor(color)
+    draw = {"center": c.drawCentredString, "right": c.drawRightString}.get(align, c.drawString)
+    for j, line in enumerate(lines):
+        draw(x, y - j * line_h, line)
+    return size
+
+
+def fill_rect(c, x, y, w, h, fill):
+    c.setFillColor(fill)
+    c.rect(x, y, w, h, stroke=0, fill=1)
+
+
+def draw_line(c, x1, y1, x2, y2, color, lw=1):
+    c.setStrokeColor(color)
+    c.setLineWidth(lw)
+    c.line(x1, y1, x2, y2)
+
+
+def screenshot_frame(c, path):
+    """Full-width screenshot in a shadowed, rounded frame below the header."""
+    if not os.path.exists(path):
+        return
+    img_w = PAGE_W - MARGIN * 2 - 40
+    img_h = img_w * 0.52
+    ix = (PAGE_W - img_w) / 2
+    iy = 32
+
+    # Shadow
+    rounded_rect(c, ix + 3, iy - 3, img_w, img_h, 10,
+                  fill=Color(0, 0, 0, 0.08))
+    # Border
+    rounded_rect(c, ix, iy, img_w, img_h, 10, fill=WHITE, stroke=SLATE_200, lw=0.5)
+    # Image
+    c.saveState()
+    clip = c.beginPath()
+    clip.roundRect(ix + 2, iy + 2, img_w - 4, img_h - 4, 8)
+    c.clipPath(clip, stroke=0)
+    draw_image(c, path, ix + 2, iy + 2, img_w - 4, img_h - 4)
+    c.restoreState()
+
+
+def callout_list(c, items, dot_color):
+    """Stack of translucent callout pills at the top right of a screenshot."""
+    cx = PAGE_W - MARGIN - 230
+    cy_pos = PAGE_H - 130
+    for txt in items:
+        pill(c, cx, cy_pos, 225, 26, Color(1, 1, 1, 0.9))
+        circle(c, cx + 14, cy_pos + 13, 4, dot_color)
+        draw_text(c, cx + 26, cy_pos + 7, txt, 10, SLATE_700, width=225 - 26 - 10)
+        cy_pos -= 34
+
+
+def arrow_right(c, x0, x1, y, color, lw=1.5):
+    """Horizontal connector from x0 to x1 with a small arrowhead at x1."""
+    c.setStrokeColor(color)
+    c.setLineWidth(lw)
+    c.line(x0, y, x1, y)
+    c.setFillColor(color)
+    p = c.beginPath()
+    p.moveTo(x1, y + 4)
+    p.lineTo(x1 + 6, y)
+    p.lineTo(x1, y - 4)
+    p.close()
+    c.drawPath(p, fill=1, stroke=0)
+
+
+def table(columns, style, draw_cell=None):
+    """Table (slidekit/tables.py) set in the deck's font and gradient mode."""
+    return tables.Table(columns, style, FONT, GRADIENT_MODE, TEXT_MIN_SCALE, draw_cell)
+
+
+TECH_TABLE = tables.TableStyle(
+    header=(INDIGO_600, PURPLE_600), header_text=WHITE, header_size=12, header_h=42,
+    header_drop=6, size=11, row_h=40, drop=4,
+    colors={"key": SLATE_800, "body": SLATE_600},
+    zebra=SLATE_50, zebra_odd=WHITE, rule=SLATE_200, dot_w=28)
+COMPARISON_TABLE = tables.TableStyle(
+    header=(INDIGO_600, PURPLE_600), header_text=WHITE, header_size=10, header_h=38,
+    header_drop=5, size=10, row_h=36, drop=3,
+    colors={"key": SLATE_800, "accent": INDIGO_600, "body": SLATE_500},
+    zebra=Color(0.97, 0.98, 0.99, 1),
+    highlight=(1, Color(0.39, 0.40, 0.95, 0.05), Color(0.39, 0.40, 0.95, 0.07)),
+    rule=SLATE_200, rule_w=0.3, grid=True)
+
+
+def tech_table(c, headers, rows, dot_colors):
+    """Three-column table: gradient header, zebra rows, a colored dot per row."""
+    columns = [tables.Column(h, w, role=role)
+               for h, w, role in zip(headers, (130, 210, 312), ("key", "key", "body"))]
+    t = table(columns, TECH_TABLE)
+    t.draw(c, (PAGE_W - t.width) / 2, PAGE_H - 135, list(zip(rows, dot_colors)))
+
+
+def comparison_table(c, headers, rows):
+    """Centered grid table with our column highlighted; returns its bottom y."""
+    columns = [tables.Column(h, w, "center", role)
+               for h, w, role in zip(headers, (128, 148, 148, 148, 148),
+                                     ("key", "accent", "body", "body", "body"))]
+    t = table(columns, COMPARISON_TABLE)
+    return t.draw(c, (PAGE_W - t.width) / 2, PAGE_H - 130, [(r, None) for r in rows])
 
 
 # ─── Slides ───────────────────────────────────────────────────
@@ -174,14 +368,11 @@ def slide_cover(c):
 
     # Logo
     if os.path.exists(LOGO_PATH):
-        c.drawImage(LOGO_PATH, PAGE_W / 2 - 155, PAGE_H / 2 + 40, width=310,
-                     height=310 * 0.4, preserveAspectRatio=True, mask="auto")
+        draw_image(c, LOGO_PATH, PAGE_W / 2 - 155, PAGE_H / 2 + 40, 310, 310 * 0.4)
 
     # Tagline
-    c.setFont(FONT, 16)
-    c.setFillColor(SLATE_700)
-    c.drawCentredString(PAGE_W / 2, PAGE_H / 2 - 10,
-                        "取引先からの請求書を専用URLで簡単に受け取り・管理")
+    draw_text(c, PAGE_W / 2, PAGE_H / 2 - 10, "取引先からの請求書を専用URLで簡単に受け取り・管理",
+              16, SLATE_700, "center", width=PAGE_W - MARGIN * 2)
 
     # Pill badges
     badges = ["アカウント不要", "シンプル", "セキュア"]
@@ -191,9 +382,8 @@ def slide_cover(c):
     bx = PAGE_W / 2 - (bw * 3 + gap * 2) / 2
     for i, (txt, col) in enumerate(zip(badges, badge_colors)):
         pill(c, bx + i * (bw + gap), PAGE_H / 2 - 60, bw, 30, col)
-        c.setFont(FONT, 11)
-        c.setFillColor(WHITE)
-        c.drawCentredString(bx + i * (bw + gap) + bw / 2, PAGE_H / 2 - 52, txt)
+        draw_text(c, bx + i * (bw + gap) + bw / 2, PAGE_H / 2 - 52, txt, 11, WHITE, "center",
+                  width=bw - 16)
 
     # Subtitle
     c.setFont(FONT, 14)
@@ -223,16 +413,13 @@ def slide_problem(c):
     for color, icon, text in problems:
         draw_shadow_card(c, MARGIN + 8, y - 8, PAGE_W - MARGIN * 2 - 16, 52, 10)
         icon_badge(c, MARGIN + 42, y + 18, 32, color, icon)
-        c.setFont(FONT, 14)
-        c.setFillColor(SLATE_800)
-        c.drawString(MARGIN + 72, y + 11, text)
+        draw_text(c, MARGIN + 72, y + 11, text, 14, SLATE_800, width=PAGE_W - MARGIN * 2 - 96)
         y -= 68
 
     # CTA box
     rounded_rect(c, PAGE_W / 2 - 200, 36, 400, 44, 22, fill=INDIGO_50)
-    c.setFont(FONT, 14)
-    c.setFillColor(INDIGO_600)
-    c.drawCentredString(PAGE_W / 2, 51, ">> 請求受取太郎がすべて解決します")
+    draw_text(c, PAGE_W / 2, 51, ">> 請求受取太郎がすべて解決します", 14, INDIGO_600, "center",
+              width=400 - 40)
 
     accent_bar_bottom(c)
     page_num(c, 2)
@@ -275,17 +462,14 @@ def slide_solution(c):
         icon_badge(c, x + col_w / 2, card_top - 30, 40, color, num)
 
         # Title
-        c.setFont(FONT, 15)
-        c.setFillColor(SLATE_900)
-        c.drawCentredString(x + col_w / 2, card_top - 68, title)
+        draw_text(c, x + col_w / 2, card_top - 68, title, 15, SLATE_900, "center",
+                  width=col_w - 24)
 
         # Items
         iy = card_top - 100
         for item in items:
             circle(c, x + 28, iy + 4, 3, color)
-            c.setFont(FONT, 11)
-            c.setFillColor(SLATE_600)
-            c.drawString(x + 40, iy, item)
+            draw_text(c, x + 40, iy, item, 11, SLATE_600, width=col_w - 56)
             iy -= 24
 
     accent_bar_bottom(c)
@@ -298,10 +482,10 @@ def slide_flow(c):
     section_header(c, "ご利用の流れ", "4ステップで請求書の受領を開始")
 
     steps = [
-        (INDIGO_600, "1", "取引先を登録", "ダッシュボードから\n取引先名を入力するだけ"),
-        (PURPLE_600, "2", "URLを共有", "自動生成された専用URLを\nコピーして取引先に送付"),
-        (PINK_500, "3", "請求書受領", "取引先がURLから\nファイルをアップロード"),
-        (EMERALD_500, "4", "管理・支払い", "ダッシュボードで確認し\nステータスを更新"),
+        (INDIGO_600, "1", "取引先を登録", "ダッシュボードから取引先名を入力するだけ"),
+        (PURPLE_600, "2", "URLを共有", "自動生成された専用URLをコピーして取引先に送付"),
+        (PINK_500, "3", "請求書受領", "取引先がURLからファイルをアップロード"),
+        (EMERALD_500, "4", "管理・支払い", "ダッシュボードで確認しステータスを更新"),
     ]
 
     step_w = 165
@@ -322,29 +506,16 @@ def slide_flow(c):
         c.drawCentredString(x + step_w / 2, cy + 53, num)
 
         # Title
-        c.setFont(FONT, 13)
-        c.setFillColor(SLATE_900)
-        c.drawCentredString(x + step_w / 2, cy + 22, title)
+        draw_text(c, x + step_w / 2, cy + 22, title, 13, SLATE_900, "center", width=step_w - 16)
 
-        # Desc lines
-        c.setFont(FONT, 10)
-        c.setFillColor(SLATE_500)
-        for j, line in enumerate(desc.split("\n")):
-            c.drawCentredString(x + step_w / 2, cy - 5 - j * 18, line)
+        # Description, wrapped to the card
+        draw_text(c, x + step_w / 2, cy - 5, desc, 10, SLATE_500, "center",
+                  width=step_w - 20, max_lines=3, line_h=18)
 
         # Arrow between steps
         if i < 3:
             ax = x + step_w + 2
-            c.setStrokeColor(SLATE_200)
-            c.setLineWidth(1.5)
-            c.line(ax, cy + 10, ax + gap - 4, cy + 10)
-            c.setFillColor(SLATE_200)
-            p = c.beginPath()
-            p.moveTo(ax + gap - 4, cy + 14)
-            p.lineTo(ax + gap + 2, cy + 10)
-            p.lineTo(ax + gap - 4, cy + 6)
-            p.close()
-            c.drawPath(p, fill=1, stroke=0)
+            arrow_right(c, ax, ax + gap - 4, cy + 10, SLATE_200)
 
     accent_bar_bottom(c)
     page_num(c, 4)
@@ -355,41 +526,14 @@ def slide_ss_invoice(c):
     page_bg(c, SLATE_50)
     section_header(c, "請求書一覧ダッシュボード", "受け取った請求書を一目で確認・管理")
 
-    if os.path.exists(SS_INVOICE):
-        img_w = PAGE_W - MARGIN * 2 - 40
-        img_h = img_w * 0.52
-        ix = (PAGE_W - img_w) / 2
-        iy = 32
-
-        # Shadow
-        rounded_rect(c, ix + 3, iy - 3, img_w, img_h, 10,
-                      fill=Color(0, 0, 0, 0.08))
-        # Border
-        rounded_rect(c, ix, iy, img_w, img_h, 10, fill=WHITE, stroke=SLATE_200, lw=0.5)
-        # Image
-        c.saveState()
-        clip = c.beginPath()
-        clip.roundRect(ix + 2, iy + 2, img_w - 4, img_h - 4, 8)
-        c.clipPath(clip, stroke=0)
-        c.drawImage(SS_INVOICE, ix + 2, iy + 2, width=img_w - 4, height=img_h - 4,
-                     preserveAspectRatio=True, mask="auto")
-        c.restoreState()
+    screenshot_frame(c, SS_INVOICE)
 
     # Feature callouts
-    callouts = [
+    callout_list(c, [
         "月別 / ステータス別フィルタ",
         "合計金額の自動集計",
         "ワンクリックでステータス切替",
-    ]
-    cx = PAGE_W - MARGIN - 230
-    cy_pos = PAGE_H - 130
-    for txt in callouts:
-        pill(c, cx, cy_pos, 225, 26, Color(1, 1, 1, 0.9))
-        circle(c, cx + 14, cy_pos + 13, 4, EMERALD_500)
-        c.setFont(FONT, 10)
-        c.setFillColor(SLATE_700)
-        c.drawString(cx + 26, cy_pos + 7, txt)
-        cy_pos -= 34
+    ], EMERALD_500)
 
     accent_bar_bottom(c)
     page_num(c, 5)
@@ -400,37 +544,13 @@ def slide_ss_vendor(c):
     page_bg(c, SLATE_50)
     section_header(c, "取引先管理", "専用アップロードURLをワンクリックで発行・共有")
 
-    if os.path.exists(SS_VENDOR):
-        img_w = PAGE_W - MARGIN * 2 - 40
-        img_h = img_w * 0.52
-        ix = (PAGE_W - img_w) / 2
-        iy = 32
-
-        rounded_rect(c, ix + 3, iy - 3, img_w, img_h, 10,
-                      fill=Color(0, 0, 0, 0.08))
-        rounded_rect(c, ix, iy, img_w, img_h, 10, fill=WHITE, stroke=SLATE_200, lw=0.5)
-        c.saveState()
-        clip = c.beginPath()
-        clip.roundRect(ix + 2, iy + 2, img_w - 4, img_h - 4, 8)
-        c.clipPath(clip, stroke=0)
-        c.drawImage(SS_VENDOR, ix + 2, iy + 2, width=img_w - 4, height=img_h - 4,
-                     preserveAspectRatio=True, mask="auto")
-        c.restoreState()
-
-    callouts = [
+    screenshot_frame(c, SS_VENDOR)
+
+    callout_list(c, [
         "取引先名を入力するだけで登録",
         "URLをコピーして取引先に送付",
         "不要になったら削除も簡単",
-    ]
-    cx = PAGE_W - MARGIN - 230
-    cy_pos = PAGE_H - 130
-    for txt in callouts:
-        pill(c, cx, cy_pos, 225, 26, Color(1, 1, 1, 0.9))
-        circle(c, cx + 14, cy_pos + 13, 4, PINK_500)
-        c.setFont(FONT, 10)
-        c.setFillColor(SLATE_700)
-        c.drawString(cx + 26, cy_pos + 7, txt)
-        cy_pos -= 34
+    ], PINK_500)
 
     accent_bar_bottom(c)
     page_num(c, 6)
@@ -449,9 +569,7 @@ def slide_security(c):
     draw_shadow_card(c, lx, 44, col_w, ly - 34, 14)
 
     icon_badge(c, lx + 28, ly - 18, 28, INDIGO_600, "S")
-    c.setFont(FONT, 15)
-    c.setFillColor(SLATE_900)
-    c.drawString(lx + 50, ly - 25, "セキュリティ")
+    draw_text(c, lx + 50, ly - 25, "セキュリティ", 15, SLATE_900, width=col_w - 66)
 
     sec_items = [
         "Row Level Security (RLS) でDBレベルの保護",
@@ -461,7 +579,8 @@ def slide_security(c):
         "ファイル形式バリデーション (PDF/PNG/JPG)",
         "Supabase Storage による安全な保管",
     ]
-    bullet_list(c, lx + 20, ly - 62, sec_items, INDIGO_500, 11, 26, SLATE_600)
+    bullet_list(c, lx + 20, ly - 62, sec_items, INDIGO_500, 11, 26, SLATE_600,
+                width=col_w - 32)
 
     # ─ Right: Multi-tenant ─
     rx = MARGIN + col_w + 30
@@ -469,9 +588,7 @@ def slide_security(c):
     draw_shadow_card(c, rx, 44, col_w, ry - 34, 14)
 
     icon_badge(c, rx + 28, ry - 18, 28, EMERALD_500, "M")
-    c.setFont(FONT, 15)
-    c.setFillColor(SLATE_900)
-    c.drawString(rx + 50, ry - 25, "マルチテナント")
+    draw_text(c, rx + 50, ry - 25, "マルチテナント", 15, SLATE_900, width=col_w - 66)
 
     mt_items = [
         "組織 (Organization) 単位のデータ完全分離",
@@ -480,7 +597,8 @@ def slide_security(c):
         "将来的なチーム招待・権限管理に対応可能",
         "BPO・経理代行での複数クライアント管理",
     ]
-    bullet_list(c, rx + 20, ry - 62, mt_items, EMERALD_500, 11, 26, SLATE_600)
+    bullet_list(c, rx + 20, ry - 62, mt_items, EMERALD_500, 11, 26, SLATE_600,
+                width=col_w - 32)
 
     accent_bar_bottom(c)
     page_num(c, 7)
@@ -500,43 +618,8 @@ def slide_tech(c):
         ("セキュリティ", "Row Level Security", "DBレベルの堅牢なアクセス制御", ROSE_500),
     ]
 
-    col_widths = [130, 210, 300]
-    table_x = (PAGE_W - sum(col_widths) - 40) / 2
-    row_h = 40
-    header_h = 42
-    ty = PAGE_H - 135
-
-    # Header
-    gradient_rect(c, table_x, ty - header_h, sum(col_widths) + 40, header_h,
-                  INDIGO_600, PURPLE_600)
-    c.setFont(FONT, 12)
-    c.setFillColor(WHITE)
-    headers = ["レイヤー", "技術", "メリット"]
-    hx = table_x + 20
-    for i, h in enumerate(headers):
-        c.drawString(hx, ty - 27, h)
-        hx += col_widths[i]
-
-    for r, (layer, tech, merit, color) in enumerate(rows):
-        ry = ty - header_h - r * row_h
-        bg = SLATE_50 if r % 2 == 0 else WHITE
-        c.setFillColor(bg)
-        c.rect(table_x, ry - row_h, sum(col_widths) + 40, row_h, stroke=0, fill=1)
-
-        circle(c, table_x + 15, ry - row_h / 2, 4, color)
-
-        cx = table_x + 28
-        cells = [layer, tech, merit]
-        for i, cell in enumerate(cells):
-            c.setFont(FONT, 11)
-            c.setFillColor(SLATE_800 if i < 2 else SLATE_600)
-            c.drawString(cx, ry - row_h / 2 - 4, cell)
-            cx += col_widths[i]
-
-    bot_y = ty - header_h - len(rows) * row_h
-    c.setStrokeColor(SLATE_200)
-    c.setLineWidth(0.5)
-    c.line(table_x, bot_y, table_x + sum(col_widths) + 40, bot_y)
+    tech_table(c, ["レイヤー", "技術", "メリット"],
+               [r[:3] for r in rows], [r[3] for r in rows])
 
     accent_bar_bottom(c)
     page_num(c, 8)
@@ -606,19 +689,16 @@ def slide_market(c):
         # Cover bottom corners of header
         c.rect(x, cy - 40, card_w, 14, stroke=0, fill=1)
 
-        c.setFont(FONT, 12)
-        c.setFillColor(WHITE)
-        c.drawCentredString(x + card_w / 2, cy - 25, comp["name"])
-        c.setFont(FONT, 9)
-        c.drawCentredString(x + card_w / 2, cy - 37, comp["stats"])
+        draw_text(c, x + card_w / 2, cy - 25, comp["name"], 12, WHITE, "center",
+                  width=card_w - 16)
+        draw_text(c, x + card_w / 2, cy - 37, comp["stats"], 9, WHITE, "center",
+                  width=card_w - 16)
 
         # Traits
         ty = cy - 58
         for trait in comp["traits"]:
             circle(c, x + 18, ty + 3, 2.5, comp["color"])
-            c.setFont(FONT, 9.5)
-            c.setFillColor(SLATE_600)
-            c.drawString(x + 28, ty - 1, trait)
+            draw_text(c, x + 28, ty - 1, trait, 9.5, SLATE_600, width=card_w - 40)
             ty -= 22
 
     # ── Our positioning box ──
@@ -628,18 +708,16 @@ def slide_market(c):
     rounded_rect(c, MARGIN, box_y, box_w, box_h, 14, fill=INDIGO_50,
                  stroke=INDIGO_500, lw=1)
 
-    c.setFont(FONT, 13)
-    c.setFillColor(INDIGO_700)
-    c.drawCentredString(PAGE_W / 2, box_y + box_h - 22,
-                        "請求受取太郎の独自ポジション : 「取引先にアカウント不要」な唯一のサービス")
-    c.setFont(FONT, 10)
-    c.setFillColor(SLATE_600)
-    c.drawCentredString(PAGE_W / 2, box_y + box_h - 44,
-                        "競合サービスは高機能・大規模向け。請求受取太郎は「いますぐ・誰でも・無料で始められる」手軽さで差別化。")
-    c.setFont(FONT, 10)
-    c.setFillColor(SLATE_500)
-    c.drawCentredString(PAGE_W / 2, box_y + box_h - 60,
-                        "中小企業・フリーランス・経理1名体制でも数分で導入でき、取引先の負担もゼロ。")
+    text_w = box_w - 32
+    draw_text(c, PAGE_W / 2, box_y + box_h - 22,
+              "請求受取太郎の独自ポジション : 「取引先にアカウント不要」な唯一のサービス",
+              13, INDIGO_700, "center", width=text_w)
+    draw_text(c, PAGE_W / 2, box_y + box_h - 44,
+              "競合サービスは高機能・大規模向け。請求受取太郎は「いますぐ・誰でも・無料で始められる」手軽さで差別化。",
+              10, SLATE_600, "center", width=text_w)
+    draw_text(c, PAGE_W / 2, box_y + box_h - 60,
+              "中小企業・フリーランス・経理1名体制でも数分で導入でき、取引先の負担もゼロ。",
+              10, SLATE_500, "center", width=text_w)
 
     accent_bar_bottom(c)
     page_num(c, 9)
@@ -651,167 +729,113 @@ def slide_comparison(c):
     section_header(c, "競合比較", "請求受取太郎 vs 主要競合サービス")
 
     # Columns: 比較軸 | 請求受取太郎 | Bill One | invox | バクラク
-    col_widths = [128, 148, 148, 148, 148]
-    table_x = (PAGE_W - sum(col_widths)) / 2
-    row_h = 36
-    header_h = 38
-    ty = PAGE_H - 130
-
-    # Header row
-    gradient_rect(c, table_x, ty - header_h, sum(col_widths), header_h,
-                  INDIGO_600, PURPLE_600)
-    c.setFont(FONT, 10)
-    c.setFillColor(WHITE)
     headers = ["比較軸", "請求受取太郎", "Bill One", "invox", "バクラク"]
-    hx = table_x
-    for i, h in enumerate(headers):
-        c.drawCentredString(hx + col_widths[i] / 2, ty - 24, h)
-        hx += col_widths[i]
-
     rows = [
         ("取引先のアカウント", "不要",       "必要",       "必要",       "不要(受領代行)"),
         ("導入までの時間",     "数分",       "数週間〜",   "数日〜",     "数日〜"),
         ("主要ターゲット",     "中小 / 個人", "大企業",     "中小〜中堅", "中小〜大企業"),
-        ("料金",             "無料〜",      "要問い合わせ", "月額980円〜", "要問い合わせ"),
+        ("料金",             price_from(),  "要問い合わせ", "月額980円〜", "要問い合わせ"),
         ("会計ソフト連携",     "CSV出力対応", "多数対応",   "50種以上",   "多数対応"),
         ("取引先の負担",       "ゼロ",       "登録必要",   "登録必要",   "送付先変更のみ"),
         ("初期費用",          "0円",        "要問い合わせ", "0円",       "要問い合わせ"),
     ]
 
-    # Highlight column for 請求受取太郎
-    ours_x = table_x + col_widths[0]
-    total_rows_h = len(rows) * row_h
-    c.setFillColor(Color(0.39, 0.40, 0.95, 0.05))
-    c.rect(ours_x, ty - header_h - total_rows_h, col_widths[1], total_rows_h,
-           stroke=0, fill=1)
-
-    for r, row_data in enumerate(rows):
-        ry = ty - header_h - r * row_h
-        # Alternate row bg
-        if r % 2 == 0:
-            c.setFillColor(Color(0.97, 0.98, 0.99, 1))
-            c.rect(table_x, ry - row_h, sum(col_widths), row_h, stroke=0, fill=1)
-            # Re-draw highlight for our column over alternating bg
-            c.setFillColor(Color(0.39, 0.40, 0.95, 0.07))
-            c.rect(ours_x, ry - row_h, col_widths[1], row_h, stroke=0, fill=1)
-
-        cx = table_x
-        for i, cell in enumerate(row_data):
-            if i == 0:
-                c.setFont(FONT, 10)
-                c.setFillColor(SLATE_800)
-            elif i == 1:
-                c.setFont(FONT, 10)
-                c.setFillColor(INDIGO_600)
-            else:
-                c.setFont(FONT, 10)
-                c.setFillColor(SLATE_500)
-            c.drawCentredString(cx + col_widths[i] / 2, ry - row_h / 2 - 3, cell)
-            cx += col_widths[i]
-
-    # Grid lines
-    bot_y = ty - header_h - len(rows) * row_h
-    c.setStrokeColor(SLATE_200)
-    c.setLineWidth(0.3)
-    # Horizontal lines
-    for r in range(len(rows) + 1):
-        ly = ty - header_h - r * row_h
-        c.line(table_x, ly, table_x + sum(col_widths), ly)
-    # Vertical lines
-    vx = table_x
-    for w in col_widths:
-        c.line(vx, ty - header_h, vx, bot_y)
-        vx += w
-    c.line(vx, ty - header_h, vx, bot_y)
+    bot_y = comparison_table(c, headers, rows)
 
     # Key takeaway
     msg_y = bot_y - 32
     rounded_rect(c, PAGE_W / 2 - 280, msg_y, 560, 28, 14, fill=INDIGO_50)
-    c.setFont(FONT, 11)
-    c.setFillColor(INDIGO_700)
-    c.drawCentredString(PAGE_W / 2, msg_y + 8,
-                        ">> 取引先の手間ゼロ x 数分で導入 x 無料スタート = 請求受取太郎だけの強み")
+    draw_text(c, PAGE_W / 2, msg_y + 8,
+              ">> 取引先の手間ゼロ x 数分で導入 x 無料スタート = 請求受取太郎だけの強み",
+              11, INDIGO_700, "center", width=560 - 28)
 
     accent_bar_bottom(c)
     page_num(c, 10)
 
 
-def slide_pricing(c):
-    """11. Pricing / Monetization Plan."""
-    page_bg(c, WHITE)
-    section_header(c, "料金プラン", "スモールスタートから本格運用まで、成長に合わせた3プラン")
-
-    plans = [
-        {
-            "name": "Free",
-            "price": "0",
-            "unit": "円 / 月",
-            "color": SLATE_600,
-            "badge_bg": SLATE_100,
-            "desc": "まずは気軽に試したい方に",
-            "features": [
-                ("取引先数", "5社まで"),
-                ("月間請求書", "30件"),
-                ("CSV出力", "-"),
-                ("AI-OCR", "-"),
-                ("チーム招待", "1人"),
-                ("メール通知", "-"),
-            ],
-        },
-        {
-            "name": "Pro",
-            "price": "980",
-            "unit": "円 / 月",
-            "color": INDIGO_600,
-            "badge_bg": INDIGO_50,
-            "desc": "成長中の中小企業に最適",
-            "popular": True,
-            "features": [
-                ("取引先数", "50社まで"),
-                ("月間請求書", "300件"),
-                ("CSV出力", "対応"),
-                ("AI-OCR", "-"),
-                ("チーム招待", "3人"),
-                ("メール通知", "対応"),
-            ],
-        },
-        {
-            "name": "Business",
-            "price": "4,980",
-            "unit": "円 / 月",
-            "color": PURPLE_600,
-            "badge_bg": Color(0.66, 0.20, 0.92, 0.08),
-            "desc": "大規模・BPO事業者向け",
-            "features": [
-                ("取引先数", "無制限"),
-                ("月間請求書", "無制限"),
-                ("CSV出力", "対応"),
-                ("AI-OCR", "対応"),
-                ("チーム招待", "無制限"),
-                ("メール通知", "対応"),
-            ],
-        },
-    ]
-
+def pricing_card_box(i):
+    """(x, y, w, h, top) of the i-th plan card on the pricing slide."""
     card_w = 215
     card_h = 310
     gap = 22
     total_w = card_w * 3 + gap * 2
     sx = (PAGE_W - total_w) / 2
     card_top = PAGE_H - 130
+    return sx + i * (card_w + gap), card_top - card_h, card_w, card_h, card_top
 
-    for i, plan in enumerate(plans):
-        x = sx + i * (card_w + gap)
-        y = card_top - card_h
+
+def recommended_badge(c, x, card_w, card_top):
+    """"おすすめ" pill above a pricing card."""
+    pill(c, x + card_w / 2 - 50, card_top + 4, 100, 22, INDIGO_600)
+    draw_text(c, x + card_w / 2, card_top + 10, "おすすめ", 9, WHITE, "center", width=100 - 16)
+
+
+# Card styling and the features plan-limits.ts does not cover, by plan tier.
+PLAN_STYLES = {
+    "free": {"color": SLATE_600, "desc": "まずは気軽に試したい方に",
+             "ocr": False, "notify": False},
+    "pro": {"color": INDIGO_600, "desc": "成長中の中小企業に最適",
+            "ocr": False, "notify": True},
+    "business": {"color": PURPLE_600, "desc": "大規模・BPO事業者向け",
+                 "ocr": True, "notify": True},
+}
+
+
+def plan_limits():
+    """PLAN_LIMITS from src/lib/plan-limits.ts, by tier (cached extraction)."""
+    from slidekit import planlimits
+
+    return planlimits.load(PLAN_LIMITS_PATH, os.path.join(CACHE_DIR, "plan-limits.json"))
+
+
+def limit_label(value, suffix):
+    return "無制限" if value is None else f"{value:,}{suffix}"
+
+
+def pricing_plans():
+    """Pricing card contents: limits and prices from plan_limits(), copy from PLAN_STYLES."""
+    plans = []
+    for tier, limits in plan_limits().items():
+        if tier not in PLAN_STYLES:
+            raise ValueError(f"plan-limits.ts: tier {tier!r} has no entry in PLAN_STYLES")
+        style = PLAN_STYLES[tier]
+        plans.append({
+            "name": limits.display_name,
+            "price": f"{limits.monthly_price:,}",
+            "unit": "円 / 月",
+            "color": style["color"],
+            "desc": style["desc"],
+            "features": [
+                ("取引先数", limit_label(limits.max_vendors, "社まで")),
+                ("月間請求書", limit_label(limits.max_invoices, "件")),
+                ("CSV出力", "対応" if limits.can_export_csv else "-"),
+                ("AI-OCR", "対応" if style["ocr"] else "-"),
+                ("チーム招待", limit_label(limits.max_members, "人")),
+                ("メール通知", "対応" if style["notify"] else "-"),
+            ],
+        })
+    return plans
+
+
+def price_from():
+    """Starting price for the comparison table, from the cheapest plan."""
+    price = min(p.monthly_price for p in plan_limits().values())
+    return "無料〜" if price == 0 else f"月額{price:,}円〜"
+
+
+def slide_pricing(c):
+    """11. Pricing / Monetization Plan."""
+    page_bg(c, WHITE)
+    section_header(c, "料金プラン", "スモールスタートから本格運用まで、成長に合わせた3プラン")
+
+    for i, plan in enumerate(pricing_plans()):
+        x, y, card_w, card_h, card_top = pricing_card_box(i)
         color = plan["color"]
-        is_popular = plan.get("popular", False)
+        is_popular = plan["name"] == RECOMMENDED_PLAN
 
         # Popular badge
         if is_popular:
-            pill(c, x + card_w / 2 - 50, card_top + 4, 100, 22, INDIGO_600)
-            c.setFont(FONT, 9)
-            c.setFillColor(WHITE)
-            c.drawCentredString(x + card_w / 2, card_top + 10, "おすすめ")
+            recommended_badge(c, x, card_w, card_top)
 
         # Card shadow & border
         if is_popular:
@@ -823,22 +847,19 @@ def slide_pricing(c):
             draw_shadow_card(c, x, y, card_w, card_h, 14)
 
         # Plan name
-        c.setFont(FONT, 16)
-        c.setFillColor(color)
-        c.drawCentredString(x + card_w / 2, card_top - 24, plan["name"])
+        text_w = card_w - 24
+        draw_text(c, x + card_w / 2, card_top - 24, plan["name"], 16, color, "center",
+                  width=text_w)
 
         # Price
-        c.setFont(FONT, 32)
-        c.setFillColor(SLATE_900)
-        c.drawCentredString(x + card_w / 2, card_top - 68, plan["price"])
-        c.setFont(FONT, 10)
-        c.setFillColor(SLATE_500)
-        c.drawCentredString(x + card_w / 2, card_top - 84, plan["unit"])
+        draw_text(c, x + card_w / 2, card_top - 68, plan["price"], 32, SLATE_900, "center",
+                  width=text_w)
+        draw_text(c, x + card_w / 2, card_top - 84, plan["unit"], 10, SLATE_500, "center",
+                  width=text_w)
 
         # Description
-        c.setFont(FONT, 9)
-        c.setFillColor(SLATE_500)
-        c.drawCentredString(x + card_w / 2, card_top - 102, plan["desc"])
+        draw_text(c, x + card_w / 2, card_top - 102, plan["desc"], 9, SLATE_500, "center",
+                  width=text_w)
 
         # Divider
         c.setStrokeColor(SLATE_200)
@@ -848,26 +869,17 @@ def slide_pricing(c):
         # Feature rows
         fy = card_top - 134
         for label, value in plan["features"]:
-            c.setFont(FONT, 9)
-            c.setFillColor(SLATE_500)
-            c.drawString(x + 18, fy, label)
-            if value == "-":
-                c.setFillColor(SLATE_400)
-                c.drawRightString(x + card_w - 18, fy, "-")
-            else:
-                c.setFillColor(color)
-                c.drawRightString(x + card_w - 18, fy, value)
+            draw_text(c, x + 18, fy, label, 9, SLATE_500)
+            value_w = card_w - 36 - 8 - textlayout.measure(label, FONT, 9)
+            draw_text(c, x + card_w - 18, fy, value, 9, SLATE_400 if value == "-" else color,
+                      "right", width=value_w)
             fy -= 24
 
     # Footer note
-    c.setFont(FONT, 9)
-    c.setFillColor(SLATE_400)
-    c.drawCentredString(PAGE_W / 2, 44,
-                        "* 全プラン初期費用0円 / 年間契約で2ヶ月分無料 / 料金は税抜表示")
-    c.setFont(FONT, 10)
-    c.setFillColor(SLATE_600)
-    c.drawCentredString(PAGE_W / 2, 26,
-                        "Freeプランはクレジットカード登録不要。今すぐお試しいただけます。")
+    draw_text(c, PAGE_W / 2, 44, "* 全プラン初期費用0円 / 年間契約で2ヶ月分無料 / 料金は税抜表示",
+              9, SLATE_400, "center", width=PAGE_W - MARGIN * 2)
+    draw_text(c, PAGE_W / 2, 26, "Freeプランはクレジットカード登録不要。今すぐお試しいただけます。",
+              10, SLATE_600, "center", width=PAGE_W - MARGIN * 2)
 
     accent_bar_bottom(c)
     page_num(c, 11)
@@ -882,58 +894,941 @@ def slide_closing(c):
     circle(c, PAGE_W / 2, PAGE_H + 80, 300, Color(1, 1, 1, 0.02))
 
     if os.path.exists(LOGO_PATH):
-        c.drawImage(LOGO_PATH, PAGE_W / 2 - 130, PAGE_H / 2 + 60, width=260,
-                     height=260 * 0.4, preserveAspectRatio=True, mask="auto")
+        draw_image(c, LOGO_PATH, PAGE_W / 2 - 130, PAGE_H / 2 + 60, 260, 260 * 0.4)
 
-    c.setFont(FONT, 28)
-    c.setFillColor(WHITE)
-    c.drawCentredString(PAGE_W / 2, PAGE_H / 2 + 10, "請求書管理を、もっとスマートに。")
+    draw_text(c, PAGE_W / 2, PAGE_H / 2 + 10, "請求書管理を、もっとスマートに。", 28, WHITE,
+              "center", width=PAGE_W - MARGIN * 2)
 
     pill(c, PAGE_W / 2 - 120, PAGE_H / 2 - 50, 240, 42, Color(1, 1, 1, 0.15))
-    c.setFont(FONT, 15)
-    c.setFillColor(WHITE)
-    c.drawCentredString(PAGE_W / 2, PAGE_H / 2 - 36, "無料でお試しいただけます")
+    draw_text(c, PAGE_W / 2, PAGE_H / 2 - 36, "無料でお試しいただけます", 15, WHITE, "center",
+              width=240 - 24)
 
-    c.setFont(FONT, 12)
-    c.setFillColor(Color(1, 1, 1, 0.6))
-    c.drawCentredString(PAGE_W / 2, PAGE_H / 2 - 100,
-                        "お問い合わせ・ご質問はお気軽にどうぞ")
+    draw_text(c, PAGE_W / 2, PAGE_H / 2 - 100, "お問い合わせ・ご質問はお気軽にどうぞ", 12,
+              Color(1, 1, 1, 0.6), "center", width=PAGE_W - MARGIN * 2)
 
     page_num(c, 12)
 
 
+# ─── Personalization ──────────────────────────────────────────
+
+def overlay_cover(c, rec):
+    """Recipient company line below the cover date."""
+    if rec["company"]:
+        draw_text(c, PAGE_W / 2, PAGE_H / 2 - 170, f"{rec['company']} 御中", 13, SLATE_700,
+                  "center", width=PAGE_W - MARGIN * 2)
+
+
+def recommended_plan(rec):
+    """Index of the recipient's plan among the pricing cards (Pro when unset)."""
+    plan = rec["plan"] or "Pro"
+    names = [p.display_name.lower() for p in plan_limits().values()]
+    if plan.lower() not in names:
+        raise ValueError(f"recipient {rec['id']}: unknown plan {plan!r}")
+    return names.index(plan.lower())
+
+
+def overlay_pricing(c, rec):
+    """Badge and border on the recipient's recommended plan card."""
+    x, y, card_w, card_h, card_top = pricing_card_box(recommended_plan(rec))
+    recommended_badge(c, x, card_w, card_top)
+    rounded_rect(c, x, y, card_w, card_h, 14, stroke=INDIGO_500, lw=1.5)
+
+
+def overlay_closing(c, rec):
+    """Contact line under the closing call to action."""
+    if rec["contact"]:
+        draw_text(c, PAGE_W / 2, PAGE_H / 2 - 124, rec["contact"], 11, Color(1, 1, 1, 0.8),
+                  "center", width=PAGE_W - MARGIN * 2)
+
+
+# (slide, overlay) pairs; the template renders the slide, the overlay is
+# stamped on top per recipient.
+OVERLAYS = [
+    (slide_cover, overlay_cover),
+    (slide_pricing, overlay_pricing),
+    (slide_closing, overlay_closing),
+]
+
+_stamper = None
+
+
+def init_batch_worker(settings, template):
+    from slidekit import batch
+
+    global _stamper
+    apply_settings(settings)
+    _stamper = batch.Stamper(template)
+
+
+def render_recipient(rec):
+    """Deck bytes for one recipient (batch worker entry point)."""
+    from slidekit import memory
+
+    buf = io.BytesIO()
+    c = new_canvas(buf)
+    for _, overlay in OVERLAYS:
+        textlayout.set_where(overlay.__name__)
+        overlay(c, rec)
+        c.showPage()
+    c.save()
+    pages = [SLIDES.index(slide) for slide, _ in OVERLAYS]
+    deck = _stamper.stamp(buf.getvalue(), pages)
+    memory.check(f"recipient {rec['id']}")
+    options = delivery_options()
+    if options:
+        from slidekit import pdfopt
+
+        deck = pdfopt.rewrite_bytes(deck, **options)
+    return deck
+
+
+def build_batch(recipients_path, out, jobs=1):
+    """Render the template once, then one personalized deck per recipient.
+
+    Returns (decks written, messages of the recipients that failed).
+    """
+    from slidekit import batch
+
+    apply_settings({"RECOMMENDED_PLAN": None})
+    template = io.BytesIO()
+    build(template, SLIDES, jobs=jobs)
+    sink = batch.open_sink(out)
+    try:
+        return batch.run(batch.read_recipients(recipients_path), render_recipient, sink,
+                         jobs=jobs, initializer=init_batch_worker,
+                         initargs=(current_settings(), template.getvalue()))
+    finally:
+        sink.close()
+
+
+# ─── Deck Spec ────────────────────────────────────────────────
+
+# Components a YAML/JSON deck spec may use, by name (see slidekit/deckspec.py).
+SPEC_COMPONENTS = {
+    "page_bg": page_bg,
+    "gradient": gradient_rect,
+    "gradient_v": gradient_rect_v,
+    "rounded_rect": rounded_rect,
+    "rect": fill_rect,
+    "line": draw_line,
+    "pill": pill,
+    "circle": circle,
+    "icon_badge": icon_badge,
+    "text": draw_text,
+    "section_header": section_header,
+    "bullet_list": bullet_list,
+    "shadow_card": draw_shadow_card,
+    "image": draw_image,
+    "screenshot_frame": screenshot_frame,
+    "callout_list": callout_list,
+    "arrow_right": arrow_right,
+    "tech_table": tech_table,
+    "comparison_table": comparison_table,
+    "recommended_badge": recommended_badge,
+    "accent_bar_bottom": accent_bar_bottom,
+    "page_num": page_num,
+}
+
+
+def spec_env():
+    """Names a deck spec's expressions can reference: geometry, colors, assets, settings
+    and the pricing data from plan-limits.ts."""
+    env = {k: v for k, v in globals().items()
+           if k.isupper() and (v is None or isinstance(v, (str, int, float, Color)))}
+    # Feature rows carry the label's width: the value is fitted to what is left.
+    env["PLANS"] = [dict(plan, features=[(label, value, textlayout.measure(label, FONT, 9))
+                                         for label, value in plan["features"]])
+                    for plan in pricing_plans()]
+    env["PRICE_FROM"] = price_from()
+    return env
+
+
+def build_spec(path, spec_path, indexes=None):
+    """Render the deck described by a YAML/JSON spec to path via its cached layout plan.
+
+    With `indexes`, only those slides (0-based) of the plan are drawn.
+    """
+    from slidekit import deckspec
+
+    setup_fonts()   # spec_env() measures text
+    plan = deckspec.cached_plan(spec_path, spec_env(), SPEC_COMPONENTS,
+                                os.path.join(CACHE_DIR, "plans"))
+    if indexes is not None:
+        plan = [plan[i] for i in indexes]
+    c = new_canvas(path)
+    for i, slide in enumerate(plan):
+        textlayout.set_where(f"spec {slide['name']}")
+        deckspec.render_page(c, slide["ops"], SPEC_COMPONENTS, Color)
+        if i < len(plan) - 1:
+            c.showPage()
+        check_memory(c, f"spec slide {i + 1}")
+    c.save()
+
+
 # ─── Main ─────────────────────────────────────────────────────
 
-def main():
-    os.makedirs(os.path.dirname(OUTPUT_PATH), exist_ok=True)
-
-    c = canvas.Canvas(OUTPUT_PATH, pagesize=landscape(A4))
-    c.setTitle("請求受取太郎 サービス紹介資料")
-    c.setAuthor("rebellion-inc")
-
-    slides = [
-        slide_cover,
-        slide_problem,
-        slide_solution,
-        slide_flow,
-        slide_ss_invoice,
-        slide_ss_vendor,
-        slide_security,
-        slide_tech,
-        slide_market,
-        slide_comparison,
-        slide_pricing,
-        slide_closing,
-    ]
+SLIDES = [
+    slide_cover,
+    slide_problem,
+    slide_solution,
+    slide_flow,
+    slide_ss_invoice,
+    slide_ss_vendor,
+    slide_security,
+    slide_tech,
+    slide_market,
+    slide_comparison,
+    slide_pricing,
+    slide_closing,
+]
+
+# Module settings that CLI flags override; shipped to worker processes.
+RENDER_SETTINGS = ("GRADIENT_MODE", "IMAGE_DPI", "RECOMMENDED_PLAN", "STATE_CACHE",
+                   "EMBED_FONT", "FORMS", "REPRODUCIBLE", "LINEARIZE", "OBJECT_STREAMS",
+                   "COMPRESS_LEVEL", "MEMORY_BUDGET", "MEMORY_STRATEGY")
+# Read by new_canvas() and setup_fonts(), not by any slide function, so
+# incremental builds add them to every page's key explicitly.
+CANVAS_SETTINGS = ("STATE_CACHE", "EMBED_FONT", "REPRODUCIBLE")
+# Likewise the modules behind them, imported lazily and so not module globals;
+# gstate decides which operators a page's content keeps.
+CANVAS_MODULES = ("slidekit.gstate", "slidekit.forms", "slidekit.streaming",
+                  "slidekit.artifacts", "slidekit.fonts")
+DOC_TITLE = "請求受取太郎 サービス紹介資料"
+DOC_AUTHOR = "rebellion-inc"
+
+
+def current_settings():
+    return {name: globals()[name] for name in RENDER_SETTINGS}
+
+
+def apply_settings(settings):
+    from slidekit import memory
+
+    globals().update(settings)
+    memory.set_budget(MEMORY_BUDGET, MEMORY_STRATEGY == "stream" and MEMORY_BUDGET
+                      and int(MEMORY_BUDGET * STREAM_RESERVE))
+    setup_fonts()
+
+
+def setup_fonts():
+    """Register the deck's fonts on first use and point FONT/FONT_MIN at them."""
+    global FONT, FONT_MIN
+    if EMBED_FONT:
+        from slidekit import fonts
+
+        FONT = FONT_MIN = fonts.register(EMBED_FONT, os.path.join(CACHE_DIR, "fonts"))
+        return
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.cidfonts import UnicodeCIDFont
+
+    registered = pdfmetrics.getRegisteredFontNames()
+    for name in (CID_FONT, CID_FONT_MIN):
+        if name not in registered:
+            pdfmetrics.registerFont(UnicodeCIDFont(name))
+    FONT, FONT_MIN = CID_FONT, CID_FONT_MIN
+
+
+def new_canvas(target, streaming=False):
+    """Canvas for the deck, writing to a path or binary file object.
+
+    A streaming canvas writes each page to target as it is finished instead
+    of holding the whole document until save().
+    """
+    setup_fonts()
+    if STATE_CACHE:
+        from slidekit.gstate import StateCachingCanvas as canvas_cls
+    else:
+        from reportlab.pdfgen.canvas import Canvas as canvas_cls
+    if streaming:
+        from slidekit import streaming as streaming_mod
+
+        canvas_cls = streaming_mod.canvas_class(canvas_cls)
+    if REPRODUCIBLE:
+        from slidekit import artifacts
+
+        canvas_cls = artifacts.canvas_class(canvas_cls)
+    c = canvas_cls(target, pagesize=landscape(A4), invariant=REPRODUCIBLE or None)
+    c.setTitle(DOC_TITLE)
+    c.setAuthor(DOC_AUTHOR)
+    return c
+
+
+def check_memory(c, where):
+    """Enforce MEMORY_BUDGET after `where` was drawn on c: fail, or switch c to streaming."""
+    from slidekit import memory
+
+    try:
+        memory.check(where)
+    except memory.MemoryBudgetExceeded as e:
+        from slidekit import streaming
+
+        if MEMORY_STRATEGY != "stream" or isinstance(c, streaming.StreamingMixin):
+            raise
+        print(f"Memory: {e}; writing out finished pages and streaming the rest",
+              file=sys.stderr)
+        streaming.stream_from_here(c)
+        memory.rebase(reserve=0)
+
+
+def render_deck(c, slides):
+    """Draw slides onto c, one page each."""
+    from slidekit import memory
 
     for i, fn in enumerate(slides):
-        fn(c)
+        textlayout.set_where(fn.__name__)
+        with memory.section("slide", fn.__name__):
+            fn(c)
         if i < len(slides) - 1:
             c.showPage()
+        check_memory(c, fn.__name__)
+
 
+def render_slide_pdf(name):
+    """Render one slide to a standalone single-page PDF (worker entry point)."""
+    from slidekit import memory
+
+    buf = io.BytesIO()
+    c = new_canvas(buf)
+    textlayout.set_where(name)
+    globals()[name](c)
+    memory.check(name)
     c.save()
-    print(f"Done: {os.path.abspath(OUTPUT_PATH)}")
+    return buf.getvalue(), images.report(), textlayout.report()
+
+
+def render_pages(slides, jobs=1):
+    """Single-page PDFs for slides, rendered in-process or on `jobs` workers."""
+    names = [fn.__name__ for fn in slides]
+    if jobs <= 1:
+        results = [render_slide_pdf(name) for name in names]
+    else:
+        from slidekit import memory, parallel
+
+        results = parallel.render_pages(render_slide_pdf, names, jobs,
+                                        initializer=apply_settings,
+                                        initargs=(current_settings(),))
+        # Workers guard their own memory; the pages now held here count too.
+        memory.check("parallel render")
+    for _, image_report, text_report in results:
+        images.merge_report(image_report)
+        textlayout.merge_report(text_report)
+    return [pdf for pdf, _, _ in results]
+
+
+def merge_pages(pages, path):
+    from slidekit import memory, parallel
+
+    parallel.merge_pdfs(pages, path, metadata={"/Title": DOC_TITLE, "/Author": DOC_AUTHOR})
+    memory.check("merge", last=True)
+
+
+def delivery_options():
+    """pdfopt.rewrite() keywords for the delivery settings; empty when they are all off."""
+    if not (LINEARIZE or OBJECT_STREAMS or COMPRESS_LEVEL is not None):
+        return {}
+    return {"linearize": LINEARIZE, "object_streams": OBJECT_STREAMS, "level": COMPRESS_LEVEL}
+
+
+def finish_pdf(path):
+    """Apply the delivery settings to the finished PDF at path."""
+    options = delivery_options()
+    if options:
+        from slidekit import pdfopt
+
+        pdfopt.rewrite(path, **options)
+
+
+def build(path, slides, jobs=1, streaming=False):
+    """Render slides to path, serially or on a pool of `jobs` processes."""
+    if jobs <= 1:
+        c = new_canvas(path, streaming)
+        render_deck(c, slides)
+        c.save()
+    else:
+        merge_pages(render_pages(slides, jobs), path)
+
+
+def render_to_stream(stream, slides=None):
+    """Render slides (default: the whole deck) to a writable binary stream.
+
+    Pages are written as they are finished, so memory stays flat with page
+    count and the stream is never seeked (stdout, sockets and buffers all
+    work). Returns the number of bytes written.
+    """
+    c = new_canvas(stream, streaming=True)
+    render_deck(c, SLIDES if slides is None else slides)
+    c.save()
+    return c.bytes_written
+
+
+def build_profiled(path, slides, profile_path):
+    """Serial build recording per-slide call counts, timings and stream sizes."""
+    from slidekit import instrument
+
+    profiler = instrument.Profiler()
+    c = new_canvas(path)
+    for i, fn in enumerate(slides):
+        textlayout.set_where(fn.__name__)
+        profiler.run(fn.__name__, fn, c)
+        if i < len(slides) - 1:
+            c.showPage()
+        check_memory(c, fn.__name__)
+    c.save()
+    with open(profile_path, "w", encoding="utf-8") as f:
+        f.write(profiler.to_json())
+    return profiler
+
+
+def build_memory_profiled(path, slides, profile_path, streaming=False):
+    """Serial build tracing allocations and RSS per slide, per image and for save()."""
+    from slidekit import memory
+
+    profiler = memory.MemoryProfiler()
+    profiler.start()
+    try:
+        c = new_canvas(path, streaming)
+        render_deck(c, slides)
+        profiler.snapshot_sites()
+        with memory.section("save", "canvas.save()"):
+            c.save()
+    finally:
+        profiler.stop()
+    with open(profile_path, "w", encoding="utf-8") as f:
+        json.dump(profiler.to_dict(), f, indent=2, ensure_ascii=False)
+    return profiler
+
+
+def build_incremental(path, slides, jobs=1, explain=False):
+    """Re-render only slides whose fingerprint changed and splice in cached pages.
+
+    Returns True if the output file was (re)written.
+    """
+    from slidekit import buildcache
+
+    store = buildcache.PageStore(os.path.join(CACHE_DIR, "pages"))
+    manifest = store.load_manifest()
+    previous = manifest.get("slides", {})
+    root = os.path.abspath(BASE_DIR)
+
+    canvas = {**buildcache.settings({name: globals()[name] for name in CANVAS_SETTINGS}),
+              **buildcache.modules(CANVAS_MODULES)}
+    entries, memo = [], {}
+    for fn in slides:
+        deps = {**buildcache.dependencies(fn, globals(), root, memo), **canvas}
+        entries.append((fn, deps, buildcache.fingerprint(deps)))
+    stale = [e for e in entries if not store.has(e[2])]
+
+    if explain:
+        for fn, deps, key in entries:
+            if (fn, deps, key) not in stale:
+                state = "up to date" if previous.get(fn.__name__, {}).get("key") == key \
+                    else "reused cached page"
+                print(f"  {fn.__name__}: {state} ({key[:12]})")
+            else:
+                prev = previous.get(fn.__name__, {}).get("deps")
+                reasons = buildcache.explain(deps, prev) or ["no cached page"]
+                print(f"  {fn.__name__}: rebuild ({'; '.join(reasons)})")
+
+    for (fn, _, key), pdf in zip(stale, render_pages([e[0] for e in stale], jobs)):
+        store.put(key, pdf)
+
+    deck_key = buildcache.fingerprint({"delivery": delivery_options(),
+                                       **{str(i): e[2] for i, e in enumerate(entries)}})
+    written = not (manifest.get("deck") == deck_key and manifest.get("output") == path
+                   and buildcache.output_digest(path) == manifest.get("output_digest"))
+    if written:
+        merge_pages([store.get(key) for _, _, key in entries], path)
+        finish_pdf(path)
+    store.save_manifest({
+        "deck": deck_key,
+        "output": path,
+        "output_digest": buildcache.output_digest(path),
+        "slides": {fn.__name__: {"key": key, "deps": deps} for fn, deps, key in entries},
+    })
+    return written
+
+
+def export_thumbnails(path, slides, out_dir, widths, formats, jobs=1):
+    """Rasterize each page of the built PDF at path to out_dir, plus manifest.json."""
+    from slidekit import thumbnails
+
+    names = [fn.__name__.removeprefix("slide_") for fn in slides]
+    return thumbnails.export(path, names, out_dir, widths, formats,
+                             cache_dir=os.path.join(CACHE_DIR, "thumbs"), jobs=jobs)
+
+
+def pdf_runs(path, index):
+    """(text, x, y) of each string drawn on page `index` of the PDF at path, in drawing order."""
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        raise SystemExit("--check requires pypdf (pip install pypdf)")
+
+    runs = []
+
+    def visit(text, cm, tm, *_):
+        if text.strip():
+            x, y = tm[4], tm[5]
+            runs.append((text.strip(), cm[0] * x + cm[2] * y + cm[4], cm[1] * x + cm[3] * y + cm[5]))
+
+    PdfReader(path).pages[index].extract_text(visitor_text=visit)
+    return runs
+
+
+def pdf_strings(path, index):
+    """Text strings drawn on page `index` of the PDF at path, in drawing order."""
+    return [text for text, _, _ in pdf_runs(path, index)]
+
+
+def row_value(runs, label):
+    """First string right of `label` on its baseline (a table row's first value), or None."""
+    anchor = next(((x, y) for text, x, y in runs if text == label), None)
+    if anchor is None:
+        return None
+    right = [(x, text) for text, x, y in runs if abs(y - anchor[1]) < 1 and x > anchor[0] + 1]
+    return min(right)[1] if right else None
+
+
+def check_pricing(path):
+    """Where the pricing and comparison slides in the PDF at path disagree with plan-limits.ts."""
+    def after(shown, label, start=0):
+        """String drawn right after `label` (a card name or row label), or None."""
+        if label not in shown[start:-1]:
+            return None
+        return shown[shown.index(label, start) + 1]
+
+    problems = []
+    shown = pdf_strings(path, SLIDES.index(slide_pricing))
+    for plan in pricing_plans():
+        if plan["name"] not in shown:
+            problems.append(f"{plan['name']}: plan card missing")
+            continue
+        start = shown.index(plan["name"])
+        expected = [("料金", plan["name"], plan["price"])]
+        expected += [(label, label, value) for label, value in plan["features"]]
+        for label, anchor, value in expected:
+            actual = after(shown, anchor, start)
+            if actual != value:
+                problems.append(f"{plan['name']} {label}: PDF shows {actual}, source says {value}")
+    # By position: the order cells are written in is the table's business.
+    actual = row_value(pdf_runs(path, SLIDES.index(slide_comparison)), "料金")
+    if actual != price_from():
+        problems.append(f"比較表 料金: PDF shows {actual}, source says {price_from()}")
+    return problems
+
+
+def load_generator():
+    """A fresh copy of this module from disk, so --watch picks up edits.
+
+    The source is compiled directly: .pyc validation only compares whole-second
+    mtimes and sizes, which can miss quick same-length edits.
+    """
+    import linecache
+    import types
+
+    path = os.path.abspath(__file__)
+    linecache.checkcache(path)  # inspect.getsource must see the edited file
+    with open(path, "rb") as f:
+        code = compile(f.read(), path, "exec")
+    module = types.ModuleType("generate_slides_live")
+    module.__file__ = path
+    exec(code, vars(module))
+    return module
+
+
+def watch(indexes, settings, port):
+    """Re-render slides whose fingerprint changed whenever their sources change,
+    and serve the preview on localhost:port until interrupted.
+    """
+    import traceback
+
+    from slidekit import buildcache, preview
+
+    source = os.path.abspath(__file__)
+    watched = [source, os.path.join(BASE_DIR, "docs", "images"), PLAN_LIMITS_PATH]
+    root = os.path.abspath(BASE_DIR)
+    live = preview.Preview()
+    server = preview.serve(live, PREVIEW_HOST, port)
+    print(f"Preview: http://{PREVIEW_HOST}:{server.server_port}/ (Ctrl-C to stop)")
+    keys, stamp, module, memo = {}, None, None, {}
+    try:
+        while True:
+            current = preview.snapshot(watched)
+            if current == stamp:
+                time.sleep(WATCH_INTERVAL)
+                continue
+            time.sleep(WATCH_SETTLE)
+            if preview.snapshot(watched) != current:
+                continue  # still being written
+            # Only an edit to this file needs a reload; asset changes reuse the module.
+            reload = module is None or stamp.get(source) != current.get(source)
+            stamp = current
+            t0 = time.perf_counter()
+            try:
+                if reload:
+                    module, memo = load_generator(), {}
+                    module.apply_settings(settings)
+                slides = [module.SLIDES[i] for i in indexes if i < len(module.SLIDES)]
+                names = [fn.__name__ for fn in slides]
+                if names != live.names:
+                    keys = {}
+                fresh = {}
+                for i, fn in enumerate(slides):
+                    key = buildcache.fingerprint(
+                        buildcache.dependencies(fn, vars(module), root, memo))
+                    if keys.get(fn.__name__) != key:
+                        fresh[i] = key
+                if not fresh and live.error is None:
+                    continue
+                pages = {i: module.render_slide_pdf(names[i])[0] for i in fresh}
+                elapsed = (time.perf_counter() - t0) * 1000
+                message = f"{', '.join(names[i] for i in fresh) or 'no changes'} ({elapsed:.0f} ms)"
+                live.update(names, pages, message)
+                keys.update({names[i]: key for i, key in fresh.items()})
+                print(f"  rendered {message}")
+            except Exception:
+                module = None
+                error = traceback.format_exc()
+                live.fail(error)
+                print(error, end="")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+
+
+def slide_title(fn):
+    """Docstring title of a slide function without its "N. " prefix."""
+    title = (fn.__doc__ or "").strip().splitlines()[0] if fn.__doc__ else ""
+    number, _, rest = title.partition(". ")
+    return rest if number.isdigit() else title
+
+
+def select_slides(selection=None, first=None, last=None):
+    """0-based indexes of SLIDES picked by a --slides list and a --from/--to range.
+
+    `selection` is comma-separated 1-based numbers, ranges ("3-5") or slide
+    names ("pricing" or "slide_pricing"); `first`/`last` are 1-based and
+    inclusive. Raises ValueError for anything that does not name a slide.
+    """
+    count = len(SLIDES)
+    names = {fn.__name__: i for i, fn in enumerate(SLIDES)}
+    indexes = list(range(count))
+    if selection:
+        picked = []
+        for part in selection.split(","):
+            part = part.strip()
+            lo, sep, hi = part.partition("-")
+            if part.isdigit() or (sep and lo.isdigit() and hi.isdigit()):
+                lo, hi = int(lo), int(hi or lo)
+                if not 1 <= lo <= hi <= count:
+                    raise ValueError(f"slide {part} is outside 1-{count}")
+                picked.extend(range(lo - 1, hi))
+            elif part in names or f"slide_{part}" in names:
+                picked.append(names.get(part, names.get(f"slide_{part}")))
+            else:
+                raise ValueError(f"unknown slide {part!r} (see --list)")
+        indexes = sorted(set(picked))
+    first = 1 if first is None else first
+    last = count if last is None else last
+    if not 1 <= first <= last <= count:
+        raise ValueError(f"--from/--to must satisfy 1 <= from <= to <= {count}")
+    indexes = [i for i in indexes if first - 1 <= i <= last - 1]
+    if not indexes:
+        raise ValueError("no slides selected")
+    return indexes
+
+
+def parse_args(argv=None):
+    from slidekit.pdfopt import LEVELS     # stdlib only; pikepdf loads on rewrite()
+
+    parser = argparse.ArgumentParser(description="請求受取太郎 サービス資料 PDF を生成します")
+    parser.add_argument("-o", "--output", default=OUTPUT_PATH,
+                        help="PDF to write, or - for stdout "
+                             "(default: docs/請求受取太郎_サービス資料.pdf)")
+    parser.add_argument("--stream", action="store_true",
+                        help="write each page as it is finished, keeping memory flat "
+                             "for long documents (implied by -o -)")
+    parser.add_argument("--slides", metavar="LIST",
+                        help="render only these slides: numbers, ranges or names, e.g. 5,6 or 3-5,pricing")
+    parser.add_argument("--from", dest="first", type=int, metavar="N",
+                        help="first slide to render (1-based)")
+    parser.add_argument("--to", dest="last", type=int, metavar="N",
+                        help="last slide to render (1-based, inclusive)")
+    parser.add_argument("--list", action="store_true",
+                        help="list the slides and exit without rendering")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="print what would be rendered and where, without rendering")
+    parser.add_argument("--check", action="store_true",
+                        help="exit non-zero if the PDF's pricing is stale against "
+                             "src/lib/plan-limits.ts, without rendering")
+    parser.add_argument("--gradients", choices=gradients.MODES, default=GRADIENT_MODE,
+                        help="gradient rendering mode (default: %(default)s)")
+    parser.add_argument("--image-dpi", type=int, default=IMAGE_DPI,
+                        help="resolution images are resampled to (default: %(default)s)")
+    parser.add_argument("--embed-font", metavar="TTF", default=EMBED_FONT,
+                        help="embed this TrueType font, subsetted, instead of the CID fonts")
+    parser.add_argument("--no-state-cache", dest="state_cache", action="store_false",
+                        help="emit every font/color operator, even when the state is unchanged")
+    parser.add_argument("--no-forms", dest="forms", action="store_false",
+                        help="draw backgrounds, accent bars and card shadows on every page "
+                             "instead of as shared form XObjects")
+    parser.add_argument("--linearize", action="store_true",
+                        help="write a linearized (fast web view) PDF whose first page shows "
+                             "before the rest has downloaded (needs pikepdf)")
+    parser.add_argument("--object-streams", action="store_true",
+                        help="pack objects into compressed object streams with a "
+                             "cross-reference stream (PDF 1.5+, needs pikepdf)")
+    parser.add_argument("--compress-level", type=int, choices=LEVELS, metavar="0-9",
+                        help="recompress page and form content streams at this zlib level, "
+                             "0 for uncompressed (needs pikepdf)")
+    parser.add_argument("--reproducible", action="store_true",
+                        help="byte-identical output for identical inputs: timestamps from "
+                             "SOURCE_DATE_EPOCH (else 2000-01-01), ID from the content")
+    parser.add_argument("--store", metavar="DIR",
+                        help="also keep the PDF in DIR under its SHA-256, skipping it if "
+                             "already there (implies --reproducible)")
+    parser.add_argument("--upload", metavar="CMD",
+                        help="with --store, run CMD for each newly stored PDF; {path} and "
+                             "{digest} are substituted")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="render slides on N worker processes and merge (default: %(default)s)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="re-render only slides whose source, helpers or assets changed")
+    parser.add_argument("--explain", action="store_true",
+                        help="with --incremental, print why each slide was or wasn't rebuilt")
+    parser.add_argument("--watch", action="store_true",
+                        help="re-render changed slides on save and serve a live preview "
+                             "(writes no PDF)")
+    parser.add_argument("--port", type=int, default=PREVIEW_PORT,
+                        help="--watch preview port, 0 for any free port (default: %(default)s)")
+    parser.add_argument("--batch", metavar="RECIPIENTS",
+                        help="CSV/JSONL of recipients (id, company, contact, plan) "
+                             "to render personalized decks for")
+    parser.add_argument("--batch-out", metavar="DIR_OR_ZIP",
+                        help="output directory, or a .zip path, for --batch")
+    parser.add_argument("--spec", metavar="PATH",
+                        help="render the deck from a YAML/JSON spec (e.g. scripts/deck.yaml) "
+                             "instead of the slide functions")
+    parser.add_argument("--profile", metavar="JSON",
+                        help="instrument each slide, write the profile to JSON and print a table")
+    parser.add_argument("--memory-profile", metavar="JSON",
+                        help="trace allocations and RSS per slide and per image, write them "
+                             "to JSON and print a table with the top allocation sites")
+    parser.add_argument("--memory-budget", type=float, metavar="MB",
+                        help="stop before resident memory exceeds MB (see --on-budget)")
+    parser.add_argument("--on-budget", choices=("fail", "stream"), default=MEMORY_STRATEGY,
+                        help="when the budget is at risk: fail, or write out finished pages "
+                             "and stream the rest (serial builds) (default: %(default)s)")
+    parser.add_argument("--thumbnails", metavar="DIR", nargs="?", const=THUMB_DIR,
+                        help="also export PNG/WebP thumbnails of each page and a manifest.json "
+                             "to DIR (default: public/slides)")
+    parser.add_argument("--thumb-widths", default="320,640,1280", metavar="LIST",
+                        help="comma-separated thumbnail widths in pixels (default: %(default)s)")
+    parser.add_argument("--thumb-formats", default="png,webp", metavar="LIST",
+                        help="comma-separated thumbnail formats, png and/or webp "
+                             "(default: %(default)s)")
+    args = parser.parse_args(argv)
+    try:
+        args.thumb_widths = [int(w) for w in args.thumb_widths.split(",") if w.strip()]
+    except ValueError:
+        parser.error("--thumb-widths must be comma-separated integers")
+    args.thumb_formats = [f.strip().lower() for f in args.thumb_formats.split(",") if f.strip()]
+    if not args.thumb_widths or min(args.thumb_widths) <= 0:
+        parser.error("--thumb-widths must list positive widths")
+    if not args.thumb_formats or set(args.thumb_formats) - {"png", "webp"}:
+        parser.error("--thumb-formats must be png and/or webp")
+    if args.thumbnails and args.batch:
+        parser.error("--thumbnails cannot be combined with --batch")
+    if args.check and (args.batch or args.spec or args.slides or args.first or args.last):
+        parser.error("--check inspects a whole built deck (-o); "
+                     "--batch, --spec and slide selection do not apply")
+    if args.watch and (args.batch or args.spec or args.profile or args.incremental
+                       or args.explain or args.thumbnails or args.check or args.jobs > 1):
+        parser.error("--watch renders in-process and cannot be combined with --batch, "
+                     "--spec, --profile, --incremental, --thumbnails, --check or --jobs")
+    args.stream = args.stream or args.output == "-"
+    if args.stream and (args.jobs > 1 or args.incremental or args.explain or args.spec
+                        or args.profile or args.thumbnails or args.check or args.watch):
+        parser.error("--stream and -o - render serially in one pass and cannot be combined "
+                     "with --jobs, --incremental, --spec, --profile, --thumbnails, "
+                     "--check or --watch")
+    if args.batch and not args.batch_out:
+        parser.error("--batch requires --batch-out")
+    if args.spec and (args.batch or args.incremental or args.explain or args.jobs > 1):
+        parser.error("--spec cannot be combined with --batch, --incremental or --jobs")
+    if args.memory_profile and (args.profile or args.spec or args.batch or args.incremental
+                                or args.jobs > 1 or args.watch or args.output == "-"):
+        parser.error("--memory-profile traces one serial build and cannot be combined with "
+                     "--profile, --spec, --batch, --incremental, --jobs, --watch or -o -")
+    if args.memory_budget is not None and args.memory_budget <= 0:
+        parser.error("--memory-budget must be positive")
+    if args.profile and (args.spec or args.batch or args.incremental or args.jobs > 1):
+        parser.error("--profile renders serially and cannot be combined with "
+                     "--spec, --batch, --incremental or --jobs")
+    if args.output == "-" and (args.linearize or args.object_streams
+                               or args.compress_level is not None):
+        parser.error("--linearize, --object-streams and --compress-level rewrite a finished "
+                     "file and cannot be combined with -o -")
+    if args.upload and not args.store:
+        parser.error("--upload requires --store")
+    if args.store and (args.batch or args.watch or args.output == "-"):
+        parser.error("--store keeps a built deck file and cannot be combined with "
+                     "--batch, --watch or -o -")
+    args.reproducible = args.reproducible or bool(args.store)
+    selecting = args.slides or args.first is not None or args.last is not None
+    if args.batch and (selecting or args.output != OUTPUT_PATH):
+        parser.error("--batch renders whole decks to --batch-out; "
+                     "--slides, --from/--to and -o do not apply")
+    try:
+        args.indexes = select_slides(args.slides, args.first, args.last)
+    except ValueError as e:
+        parser.error(str(e))
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.list:
+        for i, fn in enumerate(SLIDES, 1):
+            print(f"{i:>3}  {fn.__name__:<18} {slide_title(fn)}")
+        return
+    if args.check:
+        problems = check_pricing(args.output)
+        if problems:
+            raise SystemExit(f"Stale: {os.path.abspath(args.output)} disagrees with "
+                             f"{os.path.relpath(PLAN_LIMITS_PATH, BASE_DIR)}:\n  "
+                             + "\n  ".join(problems)
+                             + "\nRebuild with: python scripts/generate_slides.py")
+        print(f"Up to date with {os.path.relpath(PLAN_LIMITS_PATH, BASE_DIR)}: "
+              f"{os.path.abspath(args.output)}")
+        return
+    slides = [SLIDES[i] for i in args.indexes]
+    output = args.output
+
+    if args.dry_run:
+        mode = ("batch" if args.batch else "watch" if args.watch
+                else "spec" if args.spec else "profile" if args.profile
+                else "incremental" if args.incremental or args.explain else "full")
+        print(f"Mode: {mode} (jobs={args.jobs}, gradients={args.gradients}, "
+              f"image dpi={args.image_dpi}, font={args.embed_font or CID_FONT})")
+        if args.batch:
+            print(f"Recipients: {args.batch} -> {os.path.abspath(args.batch_out)}")
+        elif args.watch:
+            print(f"Preview: http://{PREVIEW_HOST}:{args.port}/")
+        else:
+            print(f"Output: {os.path.abspath(output)}")
+        if args.store:
+            print(f"Store: {os.path.abspath(args.store)}")
+        if args.thumbnails:
+            print(f"Thumbnails: {os.path.abspath(args.thumbnails)} "
+                  f"({', '.join(args.thumb_formats)} at {args.thumb_widths})")
+        for i in args.indexes:
+            print(f"{i + 1:>3}  {SLIDES[i].__name__:<18} {slide_title(SLIDES[i])}")
+        return
+
+    settings = {"GRADIENT_MODE": args.gradients, "IMAGE_DPI": args.image_dpi,
+                "STATE_CACHE": args.state_cache, "EMBED_FONT": args.embed_font,
+                "FORMS": args.forms, "REPRODUCIBLE": args.reproducible,
+                "LINEARIZE": args.linearize, "OBJECT_STREAMS": args.object_streams,
+                "COMPRESS_LEVEL": args.compress_level,
+                "MEMORY_BUDGET": args.memory_budget and int(args.memory_budget * 2**20),
+                "MEMORY_STRATEGY": args.on_budget}
+    if args.watch:
+        watch(args.indexes, settings, args.port)
+        return
+    apply_settings(settings)
+
+    if args.batch:
+        t0 = time.perf_counter()
+        count, failures = build_batch(args.batch, args.batch_out, jobs=args.jobs)
+        elapsed = time.perf_counter() - t0
+        print(f"Done: {count} decks -> {os.path.abspath(args.batch_out)} "
+              f"({elapsed:.2f}s, {count / elapsed:.1f} decks/s)")
+        if failures:
+            raise SystemExit(f"Failed: {len(failures)} of {count + len(failures)} recipients\n"
+                             + "\n".join(f"  {f}" for f in failures))
+        return
+
+    if output == "-":
+        # The PDF is the only thing written to stdout; status goes to stderr.
+        written = render_to_stream(sys.stdout.buffer, slides)
+        print(f"Done: {len(slides)} slides, {written:,} bytes -> stdout", file=sys.stderr)
+        return
+
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    up_to_date = False
+    # A reproducible rebuild of unchanged inputs leaves the existing file
+    # (and its mtime) alone; --incremental already does so itself.
+    target = f"{output}.{os.getpid()}.tmp" if REPRODUCIBLE else output
+    if args.spec:
+        build_spec(target, args.spec, args.indexes)
+    elif args.profile:
+        profiler = build_profiled(target, slides, args.profile)
+        print(profiler.format_table())
+        print(f"Profile: {os.path.abspath(args.profile)}")
+    elif args.memory_profile:
+        profiler = build_memory_profiled(target, slides, args.memory_profile, args.stream)
+        print(profiler.format_table())
+        print(f"Memory profile: {os.path.abspath(args.memory_profile)}")
+    elif args.incremental or args.explain:
+        target = output
+        if not build_incremental(output, slides, jobs=args.jobs, explain=args.explain):
+            print(f"Up to date: {os.path.abspath(output)}")
+            up_to_date = True
+    else:
+        build(target, slides, jobs=args.jobs, streaming=args.stream)
+    if not (args.incremental or args.explain):
+        finish_pdf(target)          # build_incremental() finishes what it merges
+    if target != output:
+        from slidekit import artifacts
+
+        if not artifacts.replace_if_changed(target, output):
+            print(f"Unchanged: {os.path.abspath(output)}")
+            up_to_date = True
+    if args.store:
+        from slidekit import artifacts
+
+        digest, stored, added = artifacts.ArtifactStore(args.store, args.upload).put_file(output)
+        print(f"{'Stored' if added else 'Already stored'}: {digest[:12]} -> {os.path.abspath(stored)}")
+
+    if args.thumbnails:
+        t0 = time.perf_counter()
+        manifest, rasterized = export_thumbnails(output, slides, args.thumbnails,
+                                                 args.thumb_widths, args.thumb_formats,
+                                                 jobs=args.jobs)
+        files = sum(len(s["images"]) for s in manifest["slides"])
+        print(f"Thumbnails: {files} files -> {os.path.abspath(args.thumbnails)} "
+              f"({rasterized} of {len(slides)} pages rasterized, "
+              f"{time.perf_counter() - t0:.2f}s)")
+    if up_to_date:
+        return
+
+    print(f"Done: {os.path.abspath(output)}")
+    if images.report():
+        print("Images:")
+        print(images.format_report(images.report()))
+    if textlayout.report():
+        print("Text (shrunk to fit or overflowing):")
+        print(textlayout.format_report(textlayout.report()))
+    if EMBED_FONT:
+        from slidekit import fonts
+
+        print("Fonts:")
+        print(fonts.format_report(fonts.report()))
+    from slidekit import memory
+
+    if memory.budget_status():
+        peak, budget = memory.budget_status()
+        print(f"Memory: peak RSS {peak / 2**20:.1f} MB of the {budget / 2**20:.0f} MB budget")
 
 
 if __name__ == "__main__":
-    main()
+    try:
+        main()
+    except MemoryError as e:
+        from slidekit import memory
+
+        if not isinstance(e, memory.MemoryBudgetExceeded):
+            raise
+        raise SystemExit(f"Memory budget exceeded {e}")
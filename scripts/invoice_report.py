@@ -0,0 +1,306 @@
+"""
+請求受取太郎 請求書レポート PDF 生成スクリプト
+Usage: python scripts/invoice_report.py CSV [-o PATH|-] [--generate N]
+
+Builds a paginated summary of an /api/invoices/export CSV with the deck's
+drawing helpers: headline totals and the paid/unpaid split, totals per due
+month and per vendor, and every invoice as an appendix. The CSV is read
+twice (totals first, then the appendix rows) and pages are written as they
+are finished, so memory depends on the number of vendors and months, not
+on the number of invoices. Rows per second and peak memory are reported.
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import NamedTuple
+
+from slidekit import bench, invoices, tables
+
+import generate_slides as g
+from generate_slides import (
+    PAGE_W, PAGE_H, MARGIN, WHITE, INDIGO_600, PURPLE_600, EMERALD_500, AMBER_500,
+    SLATE_50, SLATE_100, SLATE_200, SLATE_400, SLATE_500, SLATE_600, SLATE_800, SLATE_900,
+    accent_bar_bottom, circle, draw_shadow_card, draw_text, page_bg, pill, section_header,
+)
+
+REPORT_TITLE = "請求受取太郎 請求書レポート"
+
+# ─── Layout ───────────────────────────────────────────────────
+TABLE_X = MARGIN
+TABLE_TOP = PAGE_H - 125
+TABLE_BOTTOM = 40
+HEADER_H = 26
+GROUP_ROW_H = 22
+APPENDIX_ROW_H = 17
+# Cells start after the per-row status dot.
+DOT_W = 28
+
+GROUP_COLUMNS = [("", 192, "left"), ("件数", 70, "right"), ("請求金額", 110, "right"),
+                 ("振込済", 110, "right"), ("未振込", 110, "right"), ("振込率", 126, "left")]
+APPENDIX_COLUMNS = [("取引先名", 178, "left"), ("ファイル名", 210, "left"),
+                    ("請求金額", 96, "right"), ("請求期日", 82, "left"),
+                    ("アップロード日", 92, "left"), ("ステータス", 60, "left")]
+TOP_VENDORS = 5
+
+
+def page_count(rows, per_page):
+    return -(-rows // per_page)
+
+
+# ─── Formatting ───────────────────────────────────────────────
+
+def yen(amount):
+    return f"¥{amount:,}"
+
+
+def month_label(key):
+    if key == invoices.NO_MONTH:
+        return key
+    year, month = key.split("-")
+    return f"{year}年{int(month)}月"
+
+
+# ─── Table ────────────────────────────────────────────────────
+
+class Pill(NamedTuple):
+    text: str
+    color: object
+
+
+class Ratio(NamedTuple):
+    value: float
+
+
+def status_pill(paid):
+    return Pill(invoices.PAID, EMERALD_500) if paid else Pill(invoices.UNPAID, AMBER_500)
+
+
+def pill_cell(c, cell, x, y, size):
+    """A status pill with its lower left at (x, y), as a shared form.
+
+    The appendix repeats the same two pills on every row; via g.reuse() a
+    pill is drawn once per document and placed with one operator after that.
+    """
+    def draw(c, x, y):
+        pill(c, x, y, 46, 12, cell.color)
+        draw_text(c, x + 23, y + 3.5, cell.text, size - 1.5, WHITE, "center")
+
+    # XObject names end up as PDF names, which must stay ASCII.
+    name = f"pill-{cell.text.encode().hex()}-{cell.color.hexval()[2:]}-{size}"
+    g.reuse(c, name, x, y, (0, 0, 46, 12), draw)
+
+
+def draw_cell(c, cell, x, y, w, h, align, size):
+    """A status pill or a ratio bar cell, vertically centered on y."""
+    if isinstance(cell, Pill):
+        pill_cell(c, cell, x, y - 6, size)
+    elif isinstance(cell, Ratio):
+        bar_w = w - 50
+        pill(c, x, y - 3, bar_w, 6, SLATE_100)
+        if cell.value > 0:
+            pill(c, x, y - 3, max(6, bar_w * cell.value), 6, EMERALD_500)
+        draw_text(c, x + w - 8, y - size / 2 + 1, f"{cell.value:.0%}", size, SLATE_600, "right")
+
+
+def table_style(row_h, size):
+    """tech_table look: gradient header, zebra rows, a colored dot per row."""
+    return tables.TableStyle(
+        header=(INDIGO_600, PURPLE_600), header_text=WHITE, header_size=size + 1,
+        header_h=HEADER_H, size=size, row_h=row_h, drop=size / 2 - 1,
+        colors={"key": SLATE_800, "body": SLATE_600},
+        zebra=SLATE_50, rule=SLATE_200, dot_w=DOT_W, dot_r=3.5)
+
+
+GROUP_TABLE = table_style(GROUP_ROW_H, 9)
+APPENDIX_TABLE = table_style(APPENDIX_ROW_H, 8)
+
+
+def report_table(columns, style):
+    """Table for (title, width, align) columns; names may be cut with an ellipsis."""
+    return g.table([tables.Column(title, w, align, "key" if i == 0 else "body", "ellipsis")
+                    for i, (title, w, align) in enumerate(columns)], style, draw_cell)
+
+
+def group_row(label, totals):
+    ratio = totals.paid_amount / totals.amount if totals.amount else 0.0
+    dot = EMERALD_500 if totals.unpaid_count == 0 else AMBER_500
+    return ([label, f"{totals.count:,}", yen(totals.amount), yen(totals.paid_amount),
+             yen(totals.unpaid_amount), Ratio(ratio)], dot)
+
+
+def appendix_row(inv):
+    return ([inv.vendor or invoices.NO_VENDOR, inv.file_name,
+             "—" if inv.amount is None else yen(inv.amount), inv.due or "—",
+             inv.uploaded, status_pill(inv.paid)], None)
+
+
+# ─── Pages ────────────────────────────────────────────────────
+
+def page_footer(c, n, total):
+    accent_bar_bottom(c)
+    draw_text(c, 36, 22, REPORT_TITLE, 8, SLATE_400)
+    draw_text(c, PAGE_W - 36, 22, f"{n} / {total}", 8, SLATE_400, "right")
+
+
+def kpi_card(c, x, y, w, h, label, value, note, color):
+    draw_shadow_card(c, x, y, w, h)
+    g.fill_rect(c, x + 16, y + h - 22, 3, 12, color)
+    draw_text(c, x + 26, y + h - 20, label, 10, SLATE_500)
+    draw_text(c, x + 16, y + h - 54, value, 20, SLATE_900)
+    draw_text(c, x + 16, y + 14, note, 9, SLATE_400)
+
+
+def summary_page(c, source, summary):
+    total, months = summary.total, summary.months
+    dated = sorted(m for m in months if m != invoices.NO_MONTH)
+    period = f"請求期日 {month_label(dated[0])}〜{month_label(dated[-1])}" if dated else "請求期日なし"
+    page_bg(c, WHITE)
+    section_header(c, "請求書サマリー", f"{source} ・ {period} ・ {total.count:,}件")
+
+    gap = 16
+    card_w = (PAGE_W - MARGIN * 2 - gap * 3) / 4
+    card_h = 92
+    card_y = PAGE_H - 130 - card_h
+    no_amount = f"金額未入力 {total.no_amount:,}件" if total.no_amount else f"{total.count:,}件"
+    cards = [
+        ("請求総額", yen(total.amount), no_amount, INDIGO_600),
+        ("振込済", yen(total.paid_amount), f"{total.paid_count:,}件", EMERALD_500),
+        ("未振込", yen(total.unpaid_amount), f"{total.unpaid_count:,}件", AMBER_500),
+        ("取引先", f"{len(summary.vendors):,}社", f"{len(dated)}か月分の請求", PURPLE_600),
+    ]
+    for i, card in enumerate(cards):
+        kpi_card(c, MARGIN + i * (card_w + gap), card_y, card_w, card_h, *card)
+
+    # Paid / unpaid split
+    bar_y = card_y - 44
+    bar_w = PAGE_W - MARGIN * 2
+    ratio = total.paid_amount / total.amount if total.amount else 0.0
+    draw_text(c, MARGIN, bar_y + 16, "支払状況（金額ベース）", 11, SLATE_800)
+    pill(c, MARGIN, bar_y, bar_w, 10, AMBER_500 if total.unpaid_amount else SLATE_100)
+    if ratio > 0:
+        pill(c, MARGIN, bar_y, max(10, bar_w * ratio), 10, EMERALD_500)
+    legend_y = bar_y - 18
+    for x, color, label, amount, count, share in (
+            (MARGIN, EMERALD_500, invoices.PAID, total.paid_amount, total.paid_count, ratio),
+            (MARGIN + 280, AMBER_500, invoices.UNPAID, total.unpaid_amount, total.unpaid_count,
+             1 - ratio if total.amount else 0.0)):
+        circle(c, x + 4, legend_y + 3, 4, color)
+        draw_text(c, x + 14, legend_y, f"{label} {yen(amount)}（{count:,}件・{share:.0%}）",
+                  10, SLATE_600)
+
+    # Vendors with the most outstanding
+    top_y = legend_y - 34
+    draw_text(c, MARGIN, top_y, "未振込額の多い取引先", 11, SLATE_800)
+    unpaid = sorted(((v, t) for v, t in summary.vendors.items() if t.unpaid_amount),
+                    key=lambda vt: -vt[1].unpaid_amount)[:TOP_VENDORS]
+    if unpaid:
+        columns = [("取引先名",) + GROUP_COLUMNS[0][1:]] + GROUP_COLUMNS[1:]
+        report_table(columns, GROUP_TABLE).draw(
+            c, TABLE_X, top_y - 10, [group_row(v or invoices.NO_VENDOR, t) for v, t in unpaid])
+    else:
+        draw_text(c, MARGIN, top_y - 24, "未振込の請求書はありません", 10, SLATE_500)
+
+
+def group_pages(c, title, subtitle, label, groups):
+    """Pages of a per-group totals table; yields after drawing each page."""
+    def begin(start, count):
+        page_bg(c, WHITE)
+        section_header(c, title if start == 0 else f"{title}（続き）", subtitle)
+
+    columns = [(label,) + GROUP_COLUMNS[0][1:]] + GROUP_COLUMNS[1:]
+    yield from report_table(columns, GROUP_TABLE).pages(
+        c, TABLE_X, (group_row(name, totals) for name, totals in groups),
+        TABLE_TOP, TABLE_BOTTOM, begin)
+
+
+def appendix_pages(c, rows, count):
+    """Pages listing every invoice, consuming rows lazily; yields after each page."""
+    def begin(start, n):
+        page_bg(c, WHITE)
+        title = "請求書一覧" if start == 0 else "請求書一覧（続き）"
+        section_header(c, title, f"{start + 1:,}〜{start + n:,}件目 / 全{count:,}件"
+                                 "（エクスポート順）")
+
+    yield from report_table(APPENDIX_COLUMNS, APPENDIX_TABLE).pages(
+        c, TABLE_X, map(appendix_row, rows), TABLE_TOP, TABLE_BOTTOM, begin)
+
+
+def render_report(c, csv_path):
+    """Draw the report for csv_path onto a streaming canvas; returns (invoices, pages)."""
+    summary = invoices.summarize(invoices.read(csv_path))
+    months = sorted(summary.months.items(),
+                    key=lambda kv: (kv[0] == invoices.NO_MONTH, kv[0]))
+    months = [(month_label(k), t) for k, t in months]
+    vendors = sorted(summary.vendors.items(), key=lambda kv: (-kv[1].amount, kv[0]))
+    vendors = [(k or invoices.NO_VENDOR, t) for k, t in vendors]
+    count = summary.total.count
+    group_rows = report_table(GROUP_COLUMNS, GROUP_TABLE).rows_per_page(TABLE_TOP, TABLE_BOTTOM)
+    total_pages = (1 + page_count(len(months), group_rows) + page_count(len(vendors), group_rows)
+                   + page_count(count, report_table(APPENDIX_COLUMNS, APPENDIX_TABLE)
+                                .rows_per_page(TABLE_TOP, TABLE_BOTTOM)))
+
+    source = os.path.basename(csv_path)
+
+    def pages():
+        summary_page(c, source, summary)
+        yield
+        yield from group_pages(c, "月別集計", "請求期日の月ごとの件数・金額と支払状況", "月", months)
+        yield from group_pages(c, "取引先別集計", "請求金額の多い順", "取引先名", vendors)
+        yield from appendix_pages(c, invoices.read(csv_path), count)
+
+    n = 0
+    for n, _ in enumerate(pages(), 1):
+        page_footer(c, n, total_pages)
+        c.showPage()
+    return count, n
+
+
+# ─── Main ─────────────────────────────────────────────────────
+
+def default_output(csv_path):
+    return os.path.splitext(csv_path)[0] + "_report.pdf"
+
+
+def build_report(csv_path, target):
+    """Write the report for csv_path to a path or binary stream; returns (invoices, pages, bytes)."""
+    c = g.new_canvas(target, streaming=True)
+    c.setTitle(REPORT_TITLE)
+    count, pages = render_report(c, csv_path)
+    c.save()
+    return count, pages, c.bytes_written
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="請求書CSVからレポート PDF を生成します")
+    parser.add_argument("csv", help="CSV exported from /api/invoices/export")
+    parser.add_argument("-o", "--output",
+                        help="PDF to write, or - for stdout (default: CSV name + _report.pdf)")
+    parser.add_argument("--generate", type=int, metavar="N",
+                        help="first write a synthetic export of N invoices to CSV (for benchmarking)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.generate is not None:
+        invoices.write_sample(args.csv, args.generate)
+    output = args.output or default_output(args.csv)
+    # With -o - the PDF is the only thing on stdout; status goes to stderr.
+    log = sys.stderr if output == "-" else sys.stdout
+    t0 = time.perf_counter()
+    try:
+        count, pages, written = build_report(
+            args.csv, sys.stdout.buffer if output == "-" else output)
+    except (OSError, invoices.InvoiceCsvError) as e:
+        raise SystemExit(f"error: {e}")
+    elapsed = time.perf_counter() - t0
+    target = "stdout" if output == "-" else os.path.abspath(output)
+    print(f"Done: {count:,} invoices, {pages:,} pages, {written:,} bytes -> {target}", file=log)
+    print(f"  {elapsed:.2f}s, {count / elapsed:,.0f} rows/s, "
+          f"peak RSS {bench.max_rss() / 2**20:.1f} MB", file=log)
+
+
+if __name__ == "__main__":
+    main()
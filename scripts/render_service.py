@@ -0,0 +1,237 @@
+"""
+請求受取太郎 資料レンダリングサービス (ローカル HTTP)
+Usage: python scripts/render_service.py [--port N] [-j N] [--queue N] [--timeout S]
+       [--cache-entries N] [--cache-mb N]
+
+Lets other local tools (the dashboard, CRM exports) request rendered decks
+and invoice reports over HTTP instead of shelling out to
+generate_slides.py. Listens on 127.0.0.1 only. POST /render takes a JSON
+job and answers with the PDF:
+
+    {"deck": "slides",              # slides | spec | recipient | invoice_report
+     "slides": "1,3-5,pricing",     # slides/spec only; default all
+     "params": {"gradients": "stripes", "recommended_plan": "Pro",
+                "linearize": true},
+     "recipient": {"id": "a1", "company": "株式会社…", "contact": "…", "plan": "Pro"},
+     "csv": "…",                    # invoice_report: an /api/invoices/export CSV,
+     "csv_name": "invoices.csv"}    # shown on the report as its source
+
+Output is always reproducible, so a cached result is byte-identical to a
+fresh render. Cache keys include the mtimes of plan-limits.ts, the deck
+spec and docs/images, so edits to those are picked up; a change to the
+slide code needs a restart. GET /metrics reports queue depth, cache hit
+rate and p50/p95 latency (see slidekit/service.py).
+"""
+
+import argparse
+import asyncio
+import hashlib
+import io
+import os
+import tempfile
+
+from slidekit import batch, gradients, pdfopt, preview, service, textlayout
+
+import generate_slides as g
+
+SERVICE_HOST = "127.0.0.1"
+SERVICE_PORT = 8010
+SPEC_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "deck.yaml")
+DECKS = ("slides", "spec", "recipient", "invoice_report")
+# Files whose edits change rendered output without a code change.
+INPUTS = (g.PLAN_LIMITS_PATH, SPEC_PATH, os.path.join(g.BASE_DIR, "docs", "images"))
+# Stamping templates kept per worker, by settings.
+TEMPLATES = 4
+
+
+def _flag(value):
+    if not isinstance(value, bool):
+        raise ValueError("must be true or false")
+    return value
+
+
+def _int_range(lo, hi):
+    def check(value):
+        if isinstance(value, bool) or not isinstance(value, int) or not lo <= value <= hi:
+            raise ValueError(f"must be an integer from {lo} to {hi}")
+        return value
+    return check
+
+
+def _choice(options):
+    def check(value):
+        if value not in options:
+            raise ValueError(f"must be one of {', '.join(map(str, options))}")
+        return value
+    return check
+
+
+def _optional(check):
+    return lambda value: None if value is None else check(value)
+
+
+# Request params: name -> (module setting, validator).
+PARAMS = {
+    "gradients": ("GRADIENT_MODE", _choice(gradients.MODES)),
+    "image_dpi": ("IMAGE_DPI", _int_range(36, 600)),
+    "recommended_plan": ("RECOMMENDED_PLAN", _optional(_choice(tuple(g.PLAN_STYLES)))),
+    "state_cache": ("STATE_CACHE", _flag),
+    "forms": ("FORMS", _flag),
+    "linearize": ("LINEARIZE", _flag),
+    "object_streams": ("OBJECT_STREAMS", _flag),
+    "compress_level": ("COMPRESS_LEVEL", _optional(_choice(tuple(pdfopt.LEVELS)))),
+}
+
+
+# ─── Jobs ─────────────────────────────────────────────────────
+
+def inputs_stamp():
+    stamp = preview.snapshot(INPUTS)
+    return hashlib.sha256(repr(sorted(stamp.items())).encode()).hexdigest()[:16]
+
+
+def prepare(payload):
+    """Normalized job for a request body; raises JobError for a bad one."""
+    if not isinstance(payload, dict):
+        raise service.JobError("job must be a JSON object")
+    unknown = set(payload) - {"deck", "slides", "params", "recipient", "csv", "csv_name"}
+    if unknown:
+        raise service.JobError(f"unknown field(s): {', '.join(sorted(unknown))}")
+    deck = payload.get("deck", "slides")
+    if deck not in DECKS:
+        raise service.JobError(f"deck must be one of {', '.join(DECKS)}")
+
+    params = payload.get("params") or {}
+    if not isinstance(params, dict):
+        raise service.JobError("params must be an object")
+    settings = g.current_settings()
+    settings["REPRODUCIBLE"] = True
+    for name, value in params.items():
+        if name not in PARAMS:
+            raise service.JobError(f"unknown param {name!r} (one of {', '.join(PARAMS)})")
+        setting, check = PARAMS[name]
+        try:
+            settings[setting] = check(value)
+        except ValueError as e:
+            raise service.JobError(f"params.{name} {e}")
+    job = {"deck": deck, "settings": settings, "inputs": inputs_stamp()}
+
+    if deck in ("slides", "spec"):
+        slides = payload.get("slides")
+        if slides is not None and not isinstance(slides, str):
+            raise service.JobError('slides must be a string such as "1,3-5,pricing"')
+        try:
+            job["slides"] = g.select_slides(slides, None, None)
+        except ValueError as e:
+            raise service.JobError(str(e))
+    elif deck == "recipient":
+        rec = payload.get("recipient")
+        if not isinstance(rec, dict):
+            raise service.JobError("recipient deck needs a recipient object")
+        job["recipient"] = {k: str(rec.get(k) or "").strip() for k in batch.RECIPIENT_FIELDS}
+        job["recipient"]["id"] = job["recipient"]["id"] or "1"
+        try:
+            g.recommended_plan(job["recipient"])
+        except ValueError as e:
+            raise service.JobError(str(e))
+    else:
+        if not isinstance(payload.get("csv"), str) or not payload["csv"].strip():
+            raise service.JobError("invoice_report needs the export CSV as csv")
+        job["csv"] = payload["csv"]
+        job["csv_name"] = os.path.basename(str(payload.get("csv_name") or "")) or "invoices.csv"
+    return job
+
+
+# ─── Worker ───────────────────────────────────────────────────
+
+_stampers = {}
+
+
+def _stamper(settings):
+    """Stamper over the template deck for these settings, rendered once per worker."""
+    key = service.job_key(settings)
+    if key not in _stampers:
+        g.apply_settings({**settings, "RECOMMENDED_PLAN": None, "LINEARIZE": False,
+                          "OBJECT_STREAMS": False, "COMPRESS_LEVEL": None})
+        template = io.BytesIO()
+        g.build(template, g.SLIDES)
+        if len(_stampers) >= TEMPLATES:
+            _stampers.pop(next(iter(_stampers)))
+        _stampers[key] = batch.Stamper(template.getvalue())
+        g.apply_settings(settings)
+    return _stampers[key]
+
+
+def render(job):
+    """PDF bytes for a prepared job (worker entry point)."""
+    g.apply_settings(job["settings"])
+    textlayout.clear_report()
+    deck = job["deck"]
+    if deck == "recipient":
+        g._stamper = _stamper(job["settings"])
+        return g.render_recipient(job["recipient"])
+
+    buf = io.BytesIO()
+    if deck == "slides":
+        g.build(buf, [g.SLIDES[i] for i in job["slides"]])
+    elif deck == "spec":
+        g.build_spec(buf, SPEC_PATH, job["slides"])
+    else:
+        import invoice_report
+        from slidekit import invoices
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, job["csv_name"])
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(job["csv"])
+            try:
+                invoice_report.build_report(path, buf)
+            except invoices.InvoiceCsvError as e:
+                raise service.JobError(str(e).replace(path, job["csv_name"]))
+    options = g.delivery_options()
+    return pdfopt.rewrite_bytes(buf.getvalue(), **options) if options else buf.getvalue()
+
+
+# ─── Main ─────────────────────────────────────────────────────
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="資料レンダリング用のローカル HTTP サービスを起動します")
+    parser.add_argument("--port", type=int, default=SERVICE_PORT,
+                        help="port on 127.0.0.1, 0 for any free port (default: %(default)s)")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                        help="worker processes (default: one per CPU, %(default)s)")
+    parser.add_argument("--queue", type=int, default=16,
+                        help="jobs allowed to wait for a worker before requests get 503 "
+                             "(default: %(default)s)")
+    parser.add_argument("--timeout", type=float, default=60.0,
+                        help="seconds a job may render before it is stopped (default: %(default)s)")
+    parser.add_argument("--cache-entries", type=int, default=service.CACHE_ENTRIES,
+                        help="results kept in the LRU cache (default: %(default)s)")
+    parser.add_argument("--cache-mb", type=int, default=service.CACHE_BYTES // 2**20,
+                        help="total size of cached results in MB (default: %(default)s)")
+    args = parser.parse_args(argv)
+    if args.jobs < 1 or args.queue < 0 or args.timeout <= 0:
+        parser.error("--jobs must be at least 1, --queue at least 0 and --timeout positive")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    async def run():
+        svc = service.RenderService(
+            prepare, render, jobs=args.jobs, queue=args.queue, timeout=args.timeout,
+            cache=service.ResultCache(args.cache_entries, args.cache_mb * 2**20),
+            initializer=g.setup_fonts)
+        await service.serve(svc, SERVICE_HOST, args.port, ready=lambda host, port: print(
+            f"Listening: http://{host}:{port}/ ({args.jobs} workers, queue {args.queue}; "
+            f"Ctrl-C to stop)", flush=True))
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
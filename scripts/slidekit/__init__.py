@@ -0,0 +1,7 @@
+"""
+Build infrastructure for scripts/generate_slides.py.
+
+The deck itself (colors, helpers, slide_* functions) lives in
+generate_slides.py; the modules here hold the reusable pieces that the
+generator and its companion scripts share.
+"""
@@ -0,0 +1,97 @@
+"""
+Reproducible builds and a content-addressed artifact store.
+
+ReportLab stamps every document with the time it was built and derives the
+file ID from that time, so rebuilding an unchanged deck yields new bytes.
+A reproducible canvas is created invariant, taking its timestamps from
+SOURCE_DATE_EPOCH (2000-01-01 when unset), and folds every page's and
+form's content into the ID; object numbering and order are already
+deterministic. Identical inputs then give byte-identical PDFs run to run
+on each build path; the serial, streaming and parallel (-j) paths lay the
+file out differently, so their outputs match their own, not each other's.
+
+ArtifactStore keeps build outputs under the SHA-256 of their bytes. Storing
+a digest that is already there writes nothing and skips the upload hook.
+"""
+
+import hashlib
+import os
+import shlex
+import subprocess
+
+from .images import _write_atomic
+
+CHUNK = 1 << 20
+
+
+class ContentIdMixin:
+    """Canvas mixin deriving the document ID from the drawn content."""
+
+    def _restartAccumulators(self):
+        # Runs as each page or form is finished, before its operators are dropped.
+        code = self.__dict__.get("_code")
+        if code:
+            self._doc.signature.update("\n".join(code).encode("utf-8", "surrogatepass"))
+        super()._restartAccumulators()
+
+
+def canvas_class(base):
+    """Reproducible subclass of the canvas class `base`."""
+    return type(f"Reproducible{base.__name__}", (ContentIdMixin, base), {})
+
+
+def file_digest(path):
+    """SHA-256 hex digest of a file's bytes."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(CHUNK), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def replace_if_changed(src, dest):
+    """Move src over dest unless dest already has the same bytes (then drop src).
+
+    Leaving an unchanged dest alone keeps its mtime, so make, rsync and
+    friends see nothing to do. Returns True if dest was replaced.
+    """
+    if os.path.exists(dest) and file_digest(dest) == file_digest(src):
+        os.remove(src)
+        return False
+    os.replace(src, dest)
+    return True
+
+
+class ArtifactStore:
+    """Files named by their SHA-256 under root/ab/abcdef....ext.
+
+    `upload`, if given, is a command run once per newly stored file, with
+    {path} and {digest} replaced (e.g. "aws s3 cp {path} s3://bucket/{digest}.pdf").
+    """
+
+    def __init__(self, root, upload=None):
+        self.root = root
+        self.upload = upload
+
+    def path(self, digest, ext=".pdf"):
+        return os.path.join(self.root, digest[:2], digest + ext)
+
+    def put_file(self, src):
+        """(digest, stored path, added) for the file at src; added is False if the
+        content was already stored, in which case nothing is written or uploaded."""
+        digest = file_digest(src)
+        path = self.path(digest, os.path.splitext(src)[1])
+        if os.path.exists(path):
+            return digest, path, False
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(src, "rb") as f:
+            _write_atomic(path, f.read())
+        if self.upload:
+            cmd = [arg.format(path=path, digest=digest) for arg in shlex.split(self.upload)]
+            try:
+                subprocess.run(cmd, check=True)
+            except (OSError, subprocess.CalledProcessError) as e:
+                # Forget the file so the next build retries the upload.
+                os.remove(path)
+                raise SystemExit(f"upload of {digest[:12]} failed: {e}")
+        return digest, path, True
@@ -0,0 +1,168 @@
+"""
+Personalized deck batches.
+
+The static deck is rendered once as a template. For each recipient only a
+small overlay PDF (one page per personalized slide) is rendered and stamped
+onto the template's pages with pypdf. Recipients are read lazily from CSV or
+JSONL, fanned out to a bounded worker pool, and each finished deck is
+written to a directory or a zip as soon as it is ready. A recipient that
+fails is reported at the end; the others are still written.
+
+Throughput target: at least 50 decks/s per worker core for the 12-slide
+deck with three personalized pages.
+"""
+
+import csv
+import io
+import json
+import os
+import re
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from concurrent.futures.process import BrokenProcessPool
+
+RECIPIENT_FIELDS = ("id", "company", "contact", "plan")
+
+
+def read_recipients(path):
+    """Yield recipient dicts from a .csv (with header) or .jsonl file."""
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        if path.endswith((".jsonl", ".ndjson")):
+            rows = (json.loads(line) for line in f if line.strip())
+        else:
+            rows = csv.DictReader(f)
+        for i, row in enumerate(rows, 1):
+            rec = {k: (row.get(k) or "").strip() for k in RECIPIENT_FIELDS}
+            rec["id"] = rec["id"] or str(i)
+            yield rec
+
+
+def output_name(rec):
+    """File name for a recipient's deck, safe on every filesystem."""
+    stem = re.sub(r'[\\/:*?"<>|\s]+', "_", f"{rec['id']}_{rec['company']}").strip("_")
+    return f"{stem or rec['id']}.pdf"
+
+
+def unique_name(rec, taken):
+    """output_name(rec), suffixed -2, -3, … if an earlier recipient has it.
+
+    taken holds the names given so far, case-folded for case-insensitive
+    filesystems; the new name is added to it.
+    """
+    name = output_name(rec)
+    stem, ext = os.path.splitext(name)
+    n = 1
+    while name.casefold() in taken:
+        n += 1
+        name = f"{stem}-{n}{ext}"
+    taken.add(name.casefold())
+    return name
+
+
+class DirectorySink:
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def write(self, name, data):
+        with open(os.path.join(self.path, name), "wb") as f:
+            f.write(data)
+
+    def close(self):
+        pass
+
+
+class ZipSink:
+    """PDFs are already compressed, so entries are stored, not deflated."""
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.zip = zipfile.ZipFile(path, "w", zipfile.ZIP_STORED)
+
+    def write(self, name, data):
+        self.zip.writestr(name, data)
+
+    def close(self):
+        self.zip.close()
+
+
+def open_sink(path):
+    return ZipSink(path) if path.endswith(".zip") else DirectorySink(path)
+
+
+class Stamper:
+    """Stamps per-recipient overlay pages onto a parsed template deck."""
+
+    def __init__(self, template):
+        from pypdf import PdfReader
+
+        self.template = template
+        self.reader = PdfReader(io.BytesIO(template))
+
+    def stamp(self, overlay, page_indexes):
+        """Deck bytes with overlay page i merged over template page page_indexes[i]."""
+        from pypdf import PdfReader, PdfWriter
+
+        writer = PdfWriter(clone_from=self.reader)
+        layer = PdfReader(io.BytesIO(overlay))
+        for page, index in zip(layer.pages, page_indexes):
+            writer.pages[index].merge_page(page)
+        out = io.BytesIO()
+        writer.write(out)
+        return out.getvalue()
+
+
+def _failure(rec, exc):
+    # The budget guard and a dead pool stop the whole batch, not one recipient.
+    if isinstance(exc, (MemoryError, BrokenProcessPool)):
+        raise exc
+    return f"{rec['id']}: {type(exc).__name__}: {exc}"
+
+
+def run(recipients, render_one, sink, jobs=1, initializer=None, initargs=(),
+        max_inflight=None):
+    """Render every recipient with render_one(rec) -> bytes into sink.
+
+    Decks are named by unique_name() in recipient order, so duplicate ids
+    get suffixed names instead of overwriting each other. A recipient whose
+    render fails is skipped and the rest still run. At most `max_inflight`
+    recipients are buffered at once, so arbitrarily long recipient lists run
+    in bounded memory. Returns (decks written, failure messages).
+    """
+    count, failures, taken = 0, [], set()
+    if jobs <= 1:
+        if initializer:
+            initializer(*initargs)
+        for rec in recipients:
+            name = unique_name(rec, taken)
+            try:
+                data = render_one(rec)
+            except Exception as e:
+                failures.append(_failure(rec, e))
+                continue
+            sink.write(name, data)
+            count += 1
+        return count, failures
+
+    def finish(futures):
+        nonlocal count
+        for fut in futures:
+            rec, name = pending.pop(fut)
+            try:
+                data = fut.result()
+            except Exception as e:
+                failures.append(_failure(rec, e))
+                continue
+            sink.write(name, data)
+            count += 1
+
+    max_inflight = max_inflight or jobs * 4
+    with ProcessPoolExecutor(max_workers=jobs, initializer=initializer,
+                             initargs=initargs) as pool:
+        pending = {}
+        for rec in recipients:
+            if len(pending) >= max_inflight:
+                finish(wait(pending, return_when=FIRST_COMPLETED).done)
+            pending[pool.submit(render_one, rec)] = (rec, unique_name(rec, taken))
+        finish(as_completed(list(pending)))
+    return count, failures
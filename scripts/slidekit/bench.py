@@ -0,0 +1,126 @@
+"""
+Benchmark helpers: repeated timing, peak memory, and baseline comparison.
+
+Every metric is "lower is better" (seconds, bytes). A run regresses when a
+metric exceeds its baseline by more than the allowed percentage; timings
+additionally get an absolute slack so millisecond-scale jitter on tiny
+measurements does not fail a run.
+"""
+
+import json
+import os
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+
+DEFAULT_THRESHOLD = 10.0
+# Timing regressions smaller than this many seconds are treated as noise.
+TIME_SLACK = 0.005
+
+
+def timeit(fn, repeat=5, setup=None):
+    """Median wall time of fn() over `repeat` runs, and the last result.
+
+    With `setup`, each run calls fn(setup()) and only fn is timed.
+    """
+    times = []
+    result = None
+    for _ in range(repeat):
+        args = (setup(),) if setup else ()
+        t0 = time.perf_counter()
+        result = fn(*args)
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times), result
+
+
+def peak_memory(fn):
+    """(peak traced Python allocation in bytes, result) of a single fn() call."""
+    tracemalloc.start()
+    try:
+        result = fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak, result
+
+
+def max_rss():
+    """Peak resident set size of this process in bytes."""
+    # Linux carries ru_maxrss over from the parent through fork and exec, so a
+    # benchmark's child process would report the parent's peak; VmHWM starts
+    # afresh with the new program.
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def load_baseline(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def save_baseline(path, metrics, thresholds=None):
+    data = {"metrics": metrics, "thresholds": thresholds or {}}
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, sort_keys=True, ensure_ascii=False)
+        f.write("\n")
+
+
+def compare(metrics, baseline, threshold=DEFAULT_THRESHOLD):
+    """Rows of (name, baseline, current, change %, regressed) for metrics in both.
+
+    The baseline file may override the percentage per metric under
+    "thresholds"; a key ending in "*" applies to every metric with that prefix.
+    """
+    overrides = baseline.get("thresholds", {})
+    rows = []
+    for name, base in sorted(baseline.get("metrics", {}).items()):
+        if name not in metrics:
+            continue
+        current = metrics[name]
+        limit = overrides.get(name)
+        if limit is None:
+            limit = next((v for k, v in overrides.items()
+                          if k.endswith("*") and name.startswith(k[:-1])), threshold)
+        change = (current - base) / base * 100 if base else 0.0
+        regressed = change > limit
+        if regressed and name.endswith("_s") and current - base < TIME_SLACK:
+            regressed = False
+        rows.append((name, base, current, change, regressed))
+    return rows
+
+
+def _fmt(name, value):
+    if name.endswith("_s"):
+        return f"{value * 1000:.1f} ms"
+    if name.endswith("_bytes"):
+        return f"{value:,}"
+    return f"{value:g}"
+
+
+def format_table(metrics, rows=None):
+    """Human-readable metric table, with baseline deltas when rows are given."""
+    by_name = {r[0]: r for r in rows or []}
+    width = max(len(n) for n in metrics)
+    lines = []
+    for name in sorted(metrics):
+        line = f"  {name:<{width}}  {_fmt(name, metrics[name]):>14}"
+        if name in by_name:
+            _, base, _, change, regressed = by_name[name]
+            line += f"  (baseline {_fmt(name, base)}, {change:+.1f}%)"
+            if regressed:
+                line += "  REGRESSION"
+        lines.append(line)
+    return "\n".join(lines)
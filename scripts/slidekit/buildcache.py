@@ -0,0 +1,201 @@
+"""
+Incremental deck builds.
+
+Each slide function is fingerprinted from its own source plus everything it
+reaches through module globals: helper functions (recursively), constants,
+project modules such as slidekit.images, and any file a string constant
+points at (LOGO_PATH, SS_INVOICE, ...). Rendered single-page PDFs are kept
+in a page store keyed by that fingerprint; unchanged slides are spliced
+back in from the store instead of being re-rendered.
+"""
+
+import ast
+import hashlib
+import importlib.util
+import inspect
+import json
+import linecache
+import os
+import sys
+import types
+
+import reportlab
+
+_ENV = f"python {sys.version_info[:2]} reportlab {reportlab.Version}"
+
+
+def _digest(*parts):
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part if isinstance(part, bytes) else str(part).encode())
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def _file_digest(path, _memo={}):
+    st = os.stat(path)
+    key = (path, st.st_mtime_ns, st.st_size)
+    if key not in _memo:
+        with open(path, "rb") as f:
+            _memo[key] = _digest(f.read())
+    return _memo[key]
+
+
+def _source(fn, _spans={}):
+    """inspect.getsource(fn) for top-level functions, from one AST parse per file
+    version instead of tokenizing the file again for every function.
+    """
+    path = fn.__code__.co_filename
+    lines = linecache.getlines(path)
+    key = (path, _digest("".join(lines)))
+    if key not in _spans:
+        try:
+            tree = ast.parse("".join(lines))
+        except SyntaxError:
+            tree = ast.Module(body=[], type_ignores=[])
+        _spans[key] = {node.lineno: node.end_lineno for node in tree.body
+                       if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+                       and not node.decorator_list}
+    end = _spans[key].get(fn.__code__.co_firstlineno)
+    if end is None:
+        return inspect.getsource(fn)
+    return "".join(lines[fn.__code__.co_firstlineno - 1:end])
+
+
+def _names(code):
+    """Global names referenced by a code object and its nested functions."""
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            names |= _names(const)
+    return names
+
+
+def _is_project_file(path, root):
+    return path and os.path.abspath(path).startswith(root)
+
+
+def dependencies(fn, namespace, root, memo=None):
+    """Map of dependency label -> digest for a slide function.
+
+    Pass the same `memo` dict when fingerprinting several slides of one
+    namespace so shared helpers are read and hashed once.
+    """
+    memo = {} if memo is None else memo
+    deps = {"env": _digest(_ENV)}
+    seen = set()
+    todo = [fn]
+    while todo:
+        f = todo.pop()
+        if f.__name__ in seen:
+            continue
+        seen.add(f.__name__)
+        label = "slide" if f is fn else "helper"
+        if f not in memo:
+            memo[f] = (_digest(_source(f)), sorted(_names(f.__code__)))
+        source, names = memo[f]
+        deps[f"{label} {f.__name__}"] = source
+        for name in names:
+            if name not in namespace:
+                continue
+            value = namespace[name]
+            if isinstance(value, types.FunctionType):
+                if value.__module__ == fn.__module__:
+                    todo.append(value)
+            elif isinstance(value, types.ModuleType):
+                path = getattr(value, "__file__", None)
+                if _is_project_file(path, root):
+                    deps[f"module {name}"] = _file_digest(path)
+            elif isinstance(value, (str, int, float, bool, tuple, list, dict)) \
+                    or hasattr(value, "hexval"):
+                deps[f"constant {name}"] = _digest(repr(value))
+                if isinstance(value, str) and os.path.isfile(value):
+                    deps[f"asset {os.path.basename(value)}"] = _file_digest(value)
+    return deps
+
+
+def settings(values):
+    """Dependencies on settings no slide function refers to (canvas class, fonts):
+    label -> digest like dependencies(), name -> value in, files hashed too."""
+    deps = {}
+    for name, value in values.items():
+        deps[f"setting {name}"] = _digest(repr(value))
+        if isinstance(value, str) and os.path.isfile(value):
+            deps[f"asset {os.path.basename(value)}"] = _file_digest(value)
+    return deps
+
+
+def modules(names):
+    """Dependencies on modules no slide function refers to (imported lazily by
+    the canvas): label -> digest of each one's source, found without importing it."""
+    return {f"module {name}": _file_digest(importlib.util.find_spec(name).origin)
+            for name in names}
+
+
+def fingerprint(deps):
+    return _digest(*(f"{k}={v}" for k, v in sorted(deps.items())))
+
+
+def explain(deps, previous):
+    """Human-readable reasons a slide's dependencies differ from its last build."""
+    if previous is None:
+        return ["first build"]
+    reasons = []
+    for label in sorted(set(deps) | set(previous)):
+        if label not in previous:
+            reasons.append(f"{label} added")
+        elif label not in deps:
+            reasons.append(f"{label} no longer used")
+        elif deps[label] != previous[label]:
+            reasons.append(f"{label} changed")
+    return reasons
+
+
+class PageStore:
+    """Single-page PDFs keyed by slide fingerprint, plus the last build manifest."""
+
+    def __init__(self, cache_dir):
+        self.dir = cache_dir
+        self.manifest_path = os.path.join(cache_dir, "manifest.json")
+
+    def _path(self, key):
+        return os.path.join(self.dir, key[:2], key + ".pdf")
+
+    def get(self, key):
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def has(self, key):
+        return os.path.exists(self._path(key))
+
+    def put(self, key, data):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def load_manifest(self):
+        try:
+            with open(self.manifest_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_manifest(self, manifest):
+        os.makedirs(self.dir, exist_ok=True)
+        tmp = f"{self.manifest_path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(manifest, f, indent=1, ensure_ascii=False)
+        os.replace(tmp, self.manifest_path)
+
+
+def output_digest(path):
+    try:
+        return _file_digest(path)
+    except OSError:
+        return None
@@ -0,0 +1,453 @@
+"""
+Columnar invoice exports.
+
+slidekit.invoices reads an export row by row, which is what a report
+needs; finance scripts that aggregate exports of millions of rows want
+whole columns instead. load() parses an export straight into NumPy arrays.
+
+The file is memory-mapped and cut into chunks of whole records. A chunk
+without quote characters (the common case: the API only quotes values
+containing commas, quotes or line breaks) is parsed with array operations
+on its bytes: newline and comma positions give every field's span, amounts
+and dates are decoded from their digits, and vendor names are factorized
+into integer codes. Chunks with quotes go through the csv module. Parsed
+columns are cached as one uncompressed .npz named by the CSV's SHA-256, so
+a re-run hashes the file and skips parsing.
+
+NumPy is imported on first use; the rest of slidekit does not need it.
+"""
+
+import hashlib
+import io
+import mmap
+import os
+from typing import NamedTuple
+
+from . import invoices
+from .images import file_hash
+
+# Bytes per parsing chunk; bounds the temporary arrays of the vectorized path.
+CHUNK_BYTES = 8 << 20
+# Bump when parsing or the cached layout changes so cached columns are ignored.
+CACHE_VERSION = 1
+# Unpaid aging: days past the due date at which each bucket after the first starts.
+AGING_DAYS = (1, 31, 61, 91)
+AGING_LABELS = ("期日前", "1〜30日", "31〜60日", "61〜90日", "91日以上")
+
+_PAID = invoices.PAID.encode()
+_UNPAID = invoices.UNPAID.encode()
+
+
+def _np():
+    try:
+        import numpy
+    except ImportError:
+        raise SystemExit("columnar invoice loading requires NumPy (pip install numpy)")
+    return numpy
+
+
+class InvoiceColumns:
+    """An export as parallel arrays, one entry per invoice.
+
+    vendor holds codes into vendor_names; file names are UTF-8 bytes in
+    file_data, invoice i spanning file_offsets[i]:file_offsets[i + 1].
+    Missing amounts are 0 with has_amount False, missing due dates NaT.
+    """
+
+    ARRAYS = ("vendor", "file_offsets", "file_data", "amount", "has_amount",
+              "due", "uploaded", "paid")
+
+    def __init__(self, vendor_names, **arrays):
+        self.vendor_names = list(vendor_names)
+        for name in self.ARRAYS:
+            setattr(self, name, arrays[name])
+
+    def __len__(self):
+        return len(self.vendor)
+
+    def file_name(self, i):
+        return bytes(self.file_data[self.file_offsets[i]:self.file_offsets[i + 1]]).decode()
+
+    def rows(self):
+        """Yield the invoices as invoices.Invoice tuples, in file order."""
+        np = _np()
+        due = np.datetime_as_string(self.due, unit="D")
+        uploaded = np.datetime_as_string(self.uploaded, unit="D")
+        for i in range(len(self)):
+            yield invoices.Invoice(
+                self.vendor_names[self.vendor[i]], self.file_name(i),
+                int(self.amount[i]) if self.has_amount[i] else None,
+                None if due[i] == "NaT" else str(due[i]),
+                str(uploaded[i]).replace("-", "/"), bool(self.paid[i]))
+
+
+# ─── Parsing ──────────────────────────────────────────────────
+
+def _pack(np, strings):
+    """(offsets, data): UTF-8 strings concatenated, string i at offsets[i]:offsets[i + 1]."""
+    encoded = [s.encode() for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(e) for e in encoded], out=offsets[1:])
+    return offsets, np.frombuffer(b"".join(encoded), dtype=np.uint8)
+
+
+def _unpack(offsets, data):
+    raw = data.tobytes()
+    return [raw[a:b].decode() for a, b in zip(offsets[:-1].tolist(), offsets[1:].tolist())]
+
+
+def _fixed_digits(np, buf, starts, offset, width):
+    """(values, ok) of the `width` decimal digits at starts + offset."""
+    value = np.zeros(len(starts), dtype=np.int64)
+    ok = np.ones(len(starts), dtype=bool)
+    for j in range(offset, offset + width):
+        digit = buf[np.minimum(starts + j, len(buf) - 1)].astype(np.int64) - 48
+        ok &= (digit >= 0) & (digit <= 9)
+        value = value * 10 + digit
+    return value, ok
+
+
+def _error(where, lines, bad, message):
+    raise invoices.InvoiceCsvError(f"{where}:{lines[int(bad.nonzero()[0][0])]}: {message}")
+
+
+def _dates(np, buf, starts, sep, where, lines):
+    """datetime64[D] of the YYYY{sep}MM{sep}DD fields at starts."""
+    year, ok_y = _fixed_digits(np, buf, starts, 0, 4)
+    month, ok_m = _fixed_digits(np, buf, starts, 5, 2)
+    day, ok_d = _fixed_digits(np, buf, starts, 8, 2)
+    month_start = ((year - 1970) * 12 + month - 1).astype("datetime64[M]")
+    dates = month_start.astype("datetime64[D]") + (day - 1)
+    valid = (ok_y & ok_m & ok_d & (buf[starts + 4] == sep) & (buf[starts + 7] == sep)
+             & (month >= 1) & (month <= 12) & (day >= 1)
+             & (dates.astype("datetime64[M]") == month_start))
+    if not valid.all():
+        _error(where, lines, ~valid, "invalid date")
+    return dates
+
+
+def _amounts(np, buf, starts, ends, where, lines):
+    """(amounts, present) of the optionally signed integer fields at starts:ends."""
+    length = ends - starts
+    negative = (length > 0) & (buf[np.minimum(starts, len(buf) - 1)] == ord("-"))
+    digits = length - negative
+    width = int(digits.max()) if len(digits) else 0
+    if width > 18:
+        _error(where, lines, digits > 18, "amount too large")
+    # Read every field right-aligned in a window of `width` bytes ending at
+    # its end, using only the positions inside the field.
+    amount = np.zeros(len(starts), dtype=np.int64)
+    ok = (length == 0) | (digits > 0)
+    for j in range(width):
+        used = j >= width - digits
+        digit = buf[np.maximum(ends - width + j, 0)].astype(np.int64) - 48
+        ok &= ~used | ((digit >= 0) & (digit <= 9))
+        amount = np.where(used, amount * 10 + digit, amount)
+    if not ok.all():
+        _error(where, lines, ~ok, "amount is not an integer")
+    return np.where(negative, -amount, amount), length > 0
+
+
+def _factorize(np, buf, starts, lengths):
+    """(codes, names) for the byte strings at starts/lengths.
+
+    Strings are factorized on a 64-bit FNV-1a hash, built a byte column at
+    a time; every row is then compared with the first row of its group and
+    any collision falls back to sorting the strings themselves.
+    """
+    width = int(lengths.max()) if len(lengths) else 0
+
+    def column(at, j):
+        return buf.take(at + j, mode="clip")
+
+    h = np.full(len(starts), 0xCBF29CE484222325, dtype=np.uint64) ^ lengths.astype(np.uint64)
+    for j in range(width):
+        h = (h ^ np.where(j < lengths, column(starts, j), 0).astype(np.uint64)) \
+            * np.uint64(0x100000001B3)
+    _, first, codes = np.unique(h, return_index=True, return_inverse=True)
+    rep = starts[first][codes]
+    same = lengths == lengths[first][codes]
+    for j in range(width):
+        same &= (j >= lengths) | (column(starts, j) == column(rep, j))
+    if not same.all():
+        mat = np.zeros((len(starts), width), dtype=np.uint8)
+        for j in range(width):
+            mat[:, j] = np.where(j < lengths, column(starts, j), 0)
+        # UTF-8 text never contains the NUL padding of fixed-width strings.
+        _, first, codes = np.unique(mat.view(f"S{width}").ravel(),
+                                    return_index=True, return_inverse=True)
+    names = [buf[a:a + n].tobytes().decode()
+             for a, n in zip(starts[first].tolist(), lengths[first].tolist())]
+    return codes.astype(np.int32), names
+
+
+def _gather(np, buf, starts, lengths):
+    """(offsets, data): the byte strings at starts/lengths, concatenated."""
+    offsets = np.zeros(len(starts) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    idx = np.repeat(starts - offsets[:-1], lengths) + np.arange(offsets[-1])
+    return offsets, buf[idx]
+
+
+def _unquote(text):
+    return text[1:-1].replace('""', '"') if text.startswith('"') else text
+
+
+def _parse_fast(np, buf, where, first_line):
+    """Columns of a chunk of records (vector path), or None when a field
+    other than the vendor or file name is quoted."""
+    ends = np.flatnonzero(buf == 10)
+    commas = np.flatnonzero(buf == 44)
+    quotes = np.flatnonzero(buf == 34)
+    if len(quotes):
+        # Newlines and commas after an odd number of quotes are inside a
+        # quoted field.
+        ends = ends[np.searchsorted(quotes, ends) % 2 == 0]
+        commas = commas[np.searchsorted(quotes, commas) % 2 == 0]
+    if len(buf) and (not len(ends) or ends[-1] != len(buf) - 1):
+        ends = np.append(ends, len(buf))
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    content_end = ends - ((ends > starts) & (buf[np.maximum(ends - 1, 0)] == 13))
+    per_line = np.bincount(np.searchsorted(ends, commas), minlength=len(ends))
+    keep = content_end > starts
+    all_lines = np.arange(first_line, first_line + len(ends))
+    wrong = keep & (per_line != len(invoices.HEADERS) - 1)
+    if wrong.any():
+        i = int(wrong.nonzero()[0][0])
+        raise invoices.InvoiceCsvError(
+            f"{where}:{all_lines[i]}: expected {len(invoices.HEADERS)} columns, "
+            f"got {per_line[i] + 1}")
+    lines = all_lines[keep]
+    commas = commas.reshape(-1, len(invoices.HEADERS) - 1)
+    fs = np.column_stack([starts[keep], commas + 1])
+    fe = np.column_stack([commas, content_end[keep]])
+    lengths = fe - fs
+    quoted = (lengths > 0) & (buf[np.minimum(fs, len(buf) - 1)] == 34) if len(quotes) else None
+    if quoted is not None and quoted[:, 2:].any():
+        return None
+
+    amount, has_amount = _amounts(np, buf, fs[:, 2], fe[:, 2], where, lines)
+
+    # Dates: due is YYYY-MM-DD or empty, uploaded is YYYY/MM/DD.
+    has_due = lengths[:, 3] == 10
+    bad = ~(has_due | (lengths[:, 3] == 0)) | (lengths[:, 4] != 10)
+    if bad.any():
+        _error(where, lines, bad, "invalid date")
+    due = np.full(len(fs), np.datetime64("NaT"), dtype="datetime64[D]")
+    due[has_due] = _dates(np, buf, fs[has_due, 3], ord("-"), where, lines[has_due])
+    uploaded = _dates(np, buf, fs[:, 4], ord("/"), where, lines)
+
+    # Status: one of two strings of the same length.
+    paid = lengths[:, 5] == len(_PAID)
+    unpaid = paid.copy()
+    for j in range(len(_PAID)):
+        byte = buf[np.minimum(fs[:, 5] + j, len(buf) - 1)]
+        paid &= byte == _PAID[j]
+        unpaid &= byte == _UNPAID[j]
+    if not (paid | unpaid).all():
+        _error(where, lines, ~(paid | unpaid), "unknown status")
+
+    vendor, names = _factorize(np, buf, fs[:, 0], lengths[:, 0])
+    if quoted is not None and quoted[:, 1].any():
+        file_offsets, file_data = _pack(np, [
+            _unquote(buf[a:b].tobytes().decode())
+            for a, b in zip(fs[:, 1].tolist(), fe[:, 1].tolist())])
+    else:
+        file_offsets, file_data = _gather(np, buf, fs[:, 1], lengths[:, 1])
+    names = [_unquote(n) for n in names] if quoted is not None else names
+    return names, {"vendor": vendor, "file_offsets": file_offsets, "file_data": file_data,
+                   "amount": amount, "has_amount": has_amount, "due": due,
+                   "uploaded": uploaded, "paid": paid}
+
+
+def _parse_rows(np, rows, where):
+    """Columns of a list of invoices.Invoice (csv path)."""
+    names = {}
+    codes = [names.setdefault(inv.vendor, len(names)) for inv in rows]
+    file_offsets, file_data = _pack(np, [inv.file_name for inv in rows])
+    try:
+        due = np.array([inv.due or "NaT" for inv in rows], dtype="datetime64[D]")
+        uploaded = np.array([inv.uploaded.replace("/", "-") for inv in rows],
+                            dtype="datetime64[D]")
+    except ValueError as e:
+        raise invoices.InvoiceCsvError(f"{where}: invalid date ({e})")
+    return list(names), {
+        "vendor": np.array(codes, dtype=np.int32),
+        "file_offsets": file_offsets, "file_data": file_data,
+        "amount": np.array([inv.amount or 0 for inv in rows], dtype=np.int64),
+        "has_amount": np.array([inv.amount is not None for inv in rows], dtype=bool),
+        "due": due, "uploaded": uploaded,
+        "paid": np.array([inv.paid for inv in rows], dtype=bool),
+    }
+
+
+def _chunks(mm, start):
+    """(start, end) spans of whole records from start, about CHUNK_BYTES each."""
+    size = len(mm)
+    while start < size:
+        end = min(start + CHUNK_BYTES, size)
+        if end < size:
+            nl = mm.find(b"\n", end - 1)
+            end = size if nl < 0 else nl + 1
+        # A newline inside a quoted field is not a record boundary: extend
+        # until the quotes in the chunk balance.
+        while end < size and mm[start:end].count(b'"') % 2:
+            nl = mm.find(b"\n", end)
+            end = size if nl < 0 else nl + 1
+        yield start, end
+        start = end
+
+
+def _parse_mapped(np, mm, path):
+    buf = np.frombuffer(mm, dtype=np.uint8)
+    start = 3 if mm[:3] == b"\xef\xbb\xbf" else 0
+    nl = mm.find(b"\n", start)
+    header_end = len(mm) if nl < 0 else nl + 1
+    header = mm[start:header_end].decode("utf-8", "replace").rstrip("\r\n").split(",")
+    if tuple(h.strip() for h in header) != invoices.HEADERS:
+        raise invoices.InvoiceCsvError(f"{path}: expected the columns {', '.join(invoices.HEADERS)}")
+    parts, names, line = [], {}, 2
+    for offset, end in _chunks(mm, header_end):
+        parsed = _parse_fast(np, buf[offset:end], path, line)
+        if parsed:
+            chunk_names, cols = parsed
+        else:
+            text = io.StringIO(mm[offset:end].decode("utf-8"), newline="")
+            rows = list(invoices.parse(text, path, header=False, first_line=line))
+            chunk_names, cols = _parse_rows(np, rows, f"{path}:{line}")
+        # Map chunk-local vendor codes to codes over the whole file.
+        remap = np.array([names.setdefault(n, len(names)) for n in chunk_names] or [0],
+                         dtype=np.int32)
+        cols["vendor"] = remap[cols["vendor"]]
+        parts.append(cols)
+        line += int(np.count_nonzero(buf[offset:end] == 10))
+    return _concat(np, list(names), parts)
+
+
+def parse(path):
+    """InvoiceColumns of the export at path."""
+    np = _np()
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise invoices.InvoiceCsvError(
+                f"{path}: expected the columns {', '.join(invoices.HEADERS)}")
+        # Left open: NumPy views keep the map alive and it is unmapped with
+        # the last of them. Every returned array is a copy.
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return _parse_mapped(np, mm, path)
+
+
+def _concat(np, names, parts):
+    if not parts:
+        parts = [_parse_rows(np, [], "")[1]]
+    arrays = {k: np.concatenate([p[k] for p in parts])
+              for k in InvoiceColumns.ARRAYS if k != "file_offsets"}
+    base = np.cumsum([0] + [p["file_offsets"][-1] for p in parts[:-1]])
+    arrays["file_offsets"] = np.concatenate(
+        [np.zeros(1, np.int64)] + [p["file_offsets"][1:] + b for p, b in zip(parts, base)])
+    return InvoiceColumns(names, **arrays)
+
+
+# ─── Cache ────────────────────────────────────────────────────
+
+def load(path, cache_dir=None):
+    """InvoiceColumns of the export at path, via the parsed-column cache in cache_dir."""
+    np = _np()
+    if not cache_dir:
+        return parse(path)
+    digest = hashlib.sha256(f"v{CACHE_VERSION}:{file_hash(path)}".encode()).hexdigest()
+    cached = os.path.join(cache_dir, f"{digest[:32]}.npz")
+    try:
+        with np.load(cached) as data:
+            names = _unpack(data["vendor_offsets"], data["vendor_data"])
+            return InvoiceColumns(names, **{k: data[k] for k in InvoiceColumns.ARRAYS})
+    except (OSError, KeyError, ValueError):
+        pass
+    cols = parse(path)
+    vendor_offsets, vendor_data = _pack(np, cols.vendor_names)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = f"{cached}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        np.savez(f, vendor_offsets=vendor_offsets, vendor_data=vendor_data,
+                 **{k: getattr(cols, k) for k in InvoiceColumns.ARRAYS})
+    os.replace(tmp, cached)
+    return cols
+
+
+# ─── Aggregations ─────────────────────────────────────────────
+
+class Crosstab(NamedTuple):
+    vendors: list               # row labels
+    months: list                # column labels: YYYY-MM, then NO_MONTH if any
+    count: object               # int64 (vendors, months)
+    amount: object
+    unpaid_amount: object
+
+
+def _sum_by(np, keys, values, size):
+    # bincount sums in float64, exact while a total stays below 2**53 yen.
+    return np.rint(np.bincount(keys, weights=values, minlength=size)).astype(np.int64)
+
+
+def month_codes(cols):
+    """(codes, labels): each invoice's due month as an index into labels."""
+    np = _np()
+    months = cols.due.astype("datetime64[M]")
+    dated = ~np.isnat(months)
+    uniq, inverse = np.unique(months[dated], return_inverse=True)
+    codes = np.full(len(cols), len(uniq), dtype=np.int64)
+    codes[dated] = inverse
+    labels = [str(m) for m in uniq]
+    if not dated.all():
+        labels.append(invoices.NO_MONTH)
+    return codes, labels
+
+
+def vendor_month_totals(cols):
+    """Count, amount and unpaid amount per vendor × due month."""
+    np = _np()
+    months, labels = month_codes(cols)
+    shape = (len(cols.vendor_names), len(labels))
+    cell = cols.vendor.astype(np.int64) * shape[1] + months
+    size = shape[0] * shape[1]
+    unpaid = np.where(cols.paid, 0, cols.amount)
+    return Crosstab(
+        list(cols.vendor_names), labels,
+        np.bincount(cell, minlength=size).reshape(shape),
+        _sum_by(np, cell, cols.amount, size).reshape(shape),
+        _sum_by(np, cell, unpaid, size).reshape(shape))
+
+
+def aging(cols, today):
+    """[(label, count, amount)] of unpaid invoices by days past due on `today`.
+
+    Unpaid invoices without a due date come last, labeled NO_MONTH.
+    """
+    np = _np()
+    unpaid = ~cols.paid
+    due = cols.due[unpaid]
+    amount = cols.amount[unpaid]
+    dated = ~np.isnat(due)
+    overdue = (np.datetime64(today, "D") - due[dated]).astype(np.int64)
+    bucket = np.digitize(overdue, AGING_DAYS)
+    counts = np.bincount(bucket, minlength=len(AGING_LABELS))
+    sums = _sum_by(np, bucket, amount[dated], len(AGING_LABELS))
+    rows = [(label, int(n), int(s)) for label, n, s in zip(AGING_LABELS, counts, sums)]
+    if not dated.all():
+        rows.append((invoices.NO_MONTH, int((~dated).sum()), int(amount[~dated].sum())))
+    return rows
+
+
+def top_vendors(cols, n=10, unpaid=False):
+    """[(vendor, count, amount, unpaid amount)] of the n vendors with the largest
+    amount (or unpaid amount), largest first; ties keep vendor name order."""
+    np = _np()
+    size = len(cols.vendor_names)
+    count = np.bincount(cols.vendor, minlength=size)
+    amount = _sum_by(np, cols.vendor, cols.amount, size)
+    outstanding = _sum_by(np, cols.vendor, np.where(cols.paid, 0, cols.amount), size)
+    key = outstanding if unpaid else amount
+    names = np.array(cols.vendor_names, dtype=object)
+    order = np.lexsort((names, -key))[:n]
+    return [(cols.vendor_names[i], int(count[i]), int(amount[i]), int(outstanding[i]))
+            for i in order]
@@ -0,0 +1,254 @@
+"""
+Declarative deck specifications.
+
+A spec (YAML, or JSON) lists slides as sequences of components named after
+the drawing helpers in generate_slides.py. Parameters are literals or
+"=expressions" over the generator's constants and loop variables, so copy
+and coordinates live in the spec instead of Python:
+
+    slides:
+      - name: problem
+        draw:
+          - page_bg: {color: WHITE}
+          - section_header: {title: こんな課題、ありませんか？}
+          - repeat:
+              over: [{color: ROSE_500, icon: "!", text: ...}, ...]
+              vars: {y: "=PAGE_H - 145 - i * 68"}
+              draw:
+                - icon_badge: {x: "=MARGIN + 42", y: "=y + 18", size: 32,
+                               color: "=color", letter: "=icon"}
+
+`group` scopes `vars` to its own `draw` list; `repeat` binds `i` and, for mapping items, each field (other items are bound
+to `item`); `vars` adds computed names to the current scope; any component
+may carry `if: "=condition"`. Compiling evaluates every expression and
+resolves colors, producing a layout plan: per slide, a flat list of
+[component, params] with plain JSON values. Plans are cached on disk keyed
+by the spec bytes, this module's source and the constants it was compiled
+against, so unchanged specs skip parsing and evaluation entirely.
+"""
+
+import ast
+import hashlib
+import json
+import operator
+import os
+
+# Parameters whose plain-string values name a color rather than text.
+COLOR_PARAMS = {"color", "fill", "stroke", "text_color", "dot_color", "c1", "c2"}
+COLOR_LIST_PARAMS = {"dot_colors"}
+
+_BINOPS = {
+    ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul,
+    ast.Div: operator.truediv, ast.FloorDiv: operator.floordiv, ast.Mod: operator.mod,
+}
+_UNARY = {ast.USub: operator.neg, ast.UAdd: operator.pos, ast.Not: operator.not_}
+_COMPARE = {
+    ast.Eq: operator.eq, ast.NotEq: operator.ne, ast.Lt: operator.lt,
+    ast.LtE: operator.le, ast.Gt: operator.gt, ast.GtE: operator.ge,
+    ast.In: lambda a, b: a in b, ast.NotIn: lambda a, b: a not in b,
+}
+_FUNCS = {"sum": sum, "len": len, "min": min, "max": max}
+
+
+class SpecError(ValueError):
+    pass
+
+
+def _eval(node, scope):
+    if isinstance(node, ast.Expression):
+        return _eval(node.body, scope)
+    if isinstance(node, ast.Constant):
+        return node.value
+    if isinstance(node, ast.Name):
+        if node.id in scope:
+            return scope[node.id]
+        if node.id in _FUNCS:
+            return _FUNCS[node.id]
+        raise SpecError(f"unknown name {node.id!r}")
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINOPS:
+        return _BINOPS[type(node.op)](_eval(node.left, scope), _eval(node.right, scope))
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY:
+        return _UNARY[type(node.op)](_eval(node.operand, scope))
+    if isinstance(node, ast.BoolOp):
+        values = (_eval(v, scope) for v in node.values)
+        return all(values) if isinstance(node.op, ast.And) else any(values)
+    if isinstance(node, ast.Compare):
+        left = _eval(node.left, scope)
+        for op, comp in zip(node.ops, node.comparators):
+            right = _eval(comp, scope)
+            if not _COMPARE[type(op)](left, right):
+                return False
+            left = right
+        return True
+    if isinstance(node, ast.IfExp):
+        return _eval(node.body if _eval(node.test, scope) else node.orelse, scope)
+    if isinstance(node, (ast.List, ast.Tuple)):
+        return [_eval(e, scope) for e in node.elts]
+    if isinstance(node, ast.Subscript):
+        return _eval(node.value, scope)[_eval(node.slice, scope)]
+    if isinstance(node, ast.Slice):
+        return slice(*(None if n is None else _eval(n, scope)
+                       for n in (node.lower, node.upper, node.step)))
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) \
+            and node.func.id in _FUNCS and not node.keywords:
+        return _FUNCS[node.func.id](*(_eval(a, scope) for a in node.args))
+    raise SpecError(f"unsupported expression: {ast.dump(node)}")
+
+
+def evaluate(text, scope):
+    """Value of a spec expression (without its leading '=')."""
+    try:
+        tree = ast.parse(text.strip(), mode="eval")
+    except SyntaxError as e:
+        raise SpecError(f"bad expression {text!r}: {e.msg}") from None
+    return _eval(tree, scope)
+
+
+def _color(value, scope):
+    """Plan encoding of a color: {"rgba": [r, g, b, a]} or None."""
+    if value is None or isinstance(value, dict):
+        return value
+    if isinstance(value, str):
+        if value.startswith("#"):
+            h = value.lstrip("#")
+            rgb = [int(h[k:k + 2], 16) / 255 for k in (0, 2, 4)]
+            return {"rgba": rgb + [1]}
+        if value not in scope:
+            raise SpecError(f"unknown color {value!r}")
+        value = scope[value]
+    if isinstance(value, (list, tuple)):
+        return {"rgba": list(value) + [1] * (4 - len(value))}
+    if hasattr(value, "rgb"):
+        return {"rgba": [value.red, value.green, value.blue, value.alpha]}
+    raise SpecError(f"not a color: {value!r}")
+
+
+def _raw(value, scope):
+    """Value with every "=expression" (at any depth) evaluated."""
+    if isinstance(value, str) and value.startswith("="):
+        return evaluate(value[1:], scope)
+    if isinstance(value, list):
+        return [_raw(v, scope) for v in value]
+    if isinstance(value, dict):
+        return {k: _raw(v, scope) for k, v in value.items()}
+    return value
+
+
+def _value(key, value, scope):
+    """Plan encoding of a component parameter."""
+    value = _raw(value, scope)
+    if key in COLOR_PARAMS or hasattr(value, "rgb"):
+        return _color(value, scope)
+    if key in COLOR_LIST_PARAMS:
+        return [_color(v, scope) for v in value]
+    return value
+
+
+def _bind_vars(spec_vars, scope):
+    scope = dict(scope)
+    for name, value in (spec_vars or {}).items():
+        scope[name] = _raw(value, scope)
+    return scope
+
+
+def _compile_block(items, scope, components, ops):
+    for entry in items:
+        if not isinstance(entry, dict) or len(entry) != 1:
+            raise SpecError(f"component must be a single-key mapping: {entry!r}")
+        (kind, params), = entry.items()
+        params = dict(params or {})
+        cond = params.pop("if", None)
+        if cond is not None and not _raw(cond, scope):
+            continue
+        if kind == "group":
+            _compile_block(params.get("draw", []), _bind_vars(params.get("vars"), scope),
+                           components, ops)
+        elif kind == "repeat":
+            over = _raw(params.get("over", []), scope)
+            for i, item in enumerate(over):
+                inner = dict(scope, i=i)
+                if isinstance(item, dict):
+                    inner.update(item)
+                else:
+                    inner["item"] = item
+                inner = _bind_vars(params.get("vars"), inner)
+                _compile_block(params.get("draw", []), inner, components, ops)
+        elif kind in components:
+            ops.append([kind, {k: _value(k, v, scope) for k, v in params.items()}])
+        else:
+            raise SpecError(f"unknown component {kind!r}")
+
+
+def load(path):
+    """Parsed spec from a .yaml/.yml (needs PyYAML) or .json file."""
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    if path.endswith((".yaml", ".yml")):
+        try:
+            import yaml
+        except ImportError:
+            raise SystemExit("YAML deck specs require PyYAML (pip install pyyaml)")
+        return yaml.safe_load(text)
+    return json.loads(text)
+
+
+def compile_spec(spec, env, components):
+    """Layout plan for a parsed spec: [{"name", "ops": [[component, params], ...]}]."""
+    base = _bind_vars(spec.get("vars"), env)
+    plan = []
+    for slide in spec["slides"]:
+        ops = []
+        scope = _bind_vars(slide.get("vars"), base)
+        _compile_block(slide.get("draw", []), scope, components, ops)
+        plan.append({"name": slide["name"], "ops": ops})
+    return plan
+
+
+def _env_digest(env):
+    h = hashlib.sha256()
+    for name in sorted(env):
+        value = env[name]
+        if value is None or isinstance(value, (str, int, float, list, dict)) \
+                or hasattr(value, "rgb"):
+            h.update(f"{name}={value!r}\n".encode())
+    return h.hexdigest()
+
+
+def cached_plan(path, env, components, cache_dir=None):
+    """Compiled plan for the spec at path, reusing the on-disk plan cache."""
+    with open(path, "rb") as f:
+        spec_bytes = f.read()
+    with open(__file__, "rb") as f:
+        compiler = f.read()
+    key = hashlib.sha256(spec_bytes + b"\0" + compiler + b"\0"
+                         + _env_digest(env).encode()
+                         + "\0".join(sorted(components)).encode()).hexdigest()[:32]
+    plan_path = os.path.join(cache_dir, key + ".json") if cache_dir else None
+    if plan_path:
+        try:
+            with open(plan_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            pass
+    plan = compile_spec(load(path), env, components)
+    if plan_path:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = f"{plan_path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(plan, f, ensure_ascii=False)
+        os.replace(tmp, plan_path)
+    return plan
+
+
+def _decode(value, color_cls):
+    if isinstance(value, dict) and "rgba" in value:
+        return color_cls(*value["rgba"])
+    if isinstance(value, list):
+        return [_decode(v, color_cls) for v in value]
+    return value
+
+
+def render_page(c, ops, components, color_cls):
+    """Execute one slide's ops from a layout plan on canvas c."""
+    for kind, params in ops:
+        components[kind](c, **{k: _decode(v, color_cls) for k, v in params.items()})
@@ -0,0 +1,82 @@
+"""
+Embedded TrueType fonts with a persistent subset cache.
+
+ReportLab embeds a TrueType font as subsets of at most 256 glyphs, in the
+order characters are first drawn, so a deck only carries the glyphs it
+uses. Building each subset means re-parsing and rewriting tables of the
+full font, which for a CJK font costs far more than the rest of the page.
+SubsetCachingTTFont stores every subset on disk keyed by the font file's
+hash and the subset's character list; the same deck (or another batch
+recipient with the same glyphs) reuses the bytes instead of re-subsetting.
+"""
+
+import hashlib
+import os
+import time
+
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+
+from .images import _write_atomic, file_hash
+
+_stats = {}
+
+
+class SubsetCachingTTFont(TTFont):
+    """TTFont whose subsets are read from / written to cache_dir."""
+
+    def __init__(self, name, filename, cache_dir=None):
+        t0 = time.perf_counter()
+        super().__init__(name, filename)
+        self.cache_dir = cache_dir
+        self.font_hash = file_hash(filename)
+        make_subset = self.face.makeSubset
+        self.face.makeSubset = lambda subset: self._subset(make_subset, subset)
+        self.stats = _stats.setdefault(name, {
+            "source": os.path.basename(filename), "load_s": 0.0, "subset_s": 0.0,
+            "subsets": 0, "cached": 0, "bytes": 0,
+        })
+        self.stats["load_s"] += time.perf_counter() - t0
+
+    def _subset(self, make_subset, subset):
+        key = hashlib.sha256(
+            f"{self.font_hash}:{','.join(map(str, subset))}".encode()).hexdigest()[:32]
+        path = os.path.join(self.cache_dir, key + ".ttf") if self.cache_dir else None
+        t0 = time.perf_counter()
+        data = None
+        if path:
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+                self.stats["cached"] += 1
+            except OSError:
+                pass
+        if data is None:
+            data = make_subset(subset)
+            if path:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                _write_atomic(path, data)
+        self.stats["subset_s"] += time.perf_counter() - t0
+        self.stats["subsets"] += 1
+        self.stats["bytes"] += len(data)
+        return data
+
+
+def register(path, cache_dir=None, name=None):
+    """Register the TrueType font at path (once per process); returns its font name."""
+    name = name or os.path.splitext(os.path.basename(path))[0]
+    if name not in pdfmetrics.getRegisteredFontNames():
+        pdfmetrics.registerFont(SubsetCachingTTFont(name, path, cache_dir))
+    return name
+
+
+def report():
+    """Per-font load time, subsetting time, subset count and embedded bytes so far."""
+    return {name: dict(s) for name, s in _stats.items()}
+
+
+def format_report(entries):
+    return "\n".join(
+        f"  {name} ({s['source']}): {s['subsets']} subsets, {s['bytes']:,} bytes embedded "
+        f"(load {s['load_s']:.2f}s, subsetting {s['subset_s']:.3f}s, {s['cached']} cached)"
+        for name, s in sorted(entries.items()))
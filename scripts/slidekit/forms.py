@@ -0,0 +1,110 @@
+"""
+Reusable form XObjects.
+
+Page chrome (backgrounds, the bottom accent bar, section header bars, card
+shadows) has the same geometry wherever it appears. A form XObject holds
+such an element's drawing operators once per document, and each use is a
+single `Do` under a translation instead of a fresh copy of the paths,
+gradients and color changes.
+
+ReportLab's own forms only declare fonts and XObjects as resources; forms
+here also carry the shadings and transparency states they use, and only
+those: a form's resources depend on its own drawing, never on what the rest
+of the document has drawn, so it is identical on every build. A form is
+painted in the graphics state of whatever page places it, so drawing into
+one starts from an unknown state: no color, font, line width or alpha set
+inside it is dropped as unchanged (see gstate.py).
+"""
+
+import re
+
+from reportlab.pdfbase import pdfdoc
+
+_GS_RE = re.compile(r"/(\S+) gs\b")
+_SH_RE = re.compile(r"/(\S+) sh\b")
+
+
+class FormXObject(pdfdoc.PDFFormXObject):
+    """Form whose resources include its shadings and ExtGStates."""
+
+    ExtGState = None
+    shadings = None
+
+    def format(self, document):
+        if not self.Resources:
+            resources = pdfdoc.PDFResourceDictionary()
+            resources.basicFonts()
+            resources.allProcs()
+            if self.XObjects:
+                resources.XObject = self.XObjects
+            if self.ExtGState:
+                resources.ExtGState = self.ExtGState
+            resources.setShading(self.shadings or {})
+            self.Resources = resources
+        return super().format(document)
+
+
+def _forget_state(c):
+    c._fillColorObj = c._strokeColorObj = None
+    c._fontname = None
+    c._lineWidth = None
+    c._extgstate._d.update(ca=None, CA=None)
+
+
+def _localize(code, pattern, prefix):
+    """Rename the resources code's operators name to prefix0, prefix1, … in
+    order of use, in place; returns {local name: document name}."""
+    names = {}
+
+    def rename(m):
+        local = names.setdefault(m.group(1), f"{prefix}{len(names)}")
+        return m.group(0).replace(m.group(1), local, 1)
+
+    code[:] = [pattern.sub(rename, op) for op in code]
+    return {local: name for name, local in names.items()}
+
+
+def _end_form(c):
+    """canvas.endForm(), registering a FormXObject with the form's own shadings
+    and ExtGStates: those its operators name, not the page's or document's.
+
+    They get names local to the form, so the form's bytes depend only on
+    what it draws, whichever page or worker defined it first.
+    """
+    name, lowerx, lowery, upperx, uppery = c._formData
+    form = FormXObject(lowerx, lowery, upperx, uppery)
+    form.compression = c._pageCompression
+    states = _localize(c._code, _GS_RE, "G")
+    shadings = _localize(c._code, _SH_RE, "S")
+    form.setStreamList([c._preamble] + c._code)
+    if states:
+        defined = {state: t for t, state in c._extgstate._c.items()}
+        form.ExtGState = pdfdoc.PDFDictionary({
+            local: pdfdoc.PDFDictionary(dict((defined[state],)))
+            for local, state in states.items()})
+    c._setXObjects(form)
+    form.shadings = {sh: local for local, sh in shadings.items()}
+    c._doc.addForm(name, form)
+    c._restartAccumulators()
+    c.pop_state_stack()
+
+
+def place(c, name, x, y, bbox, draw):
+    """Paint form `name` with its origin at (x, y), defining it on first use.
+
+    draw(c) paints the element at the origin; bbox is its (lowerx, lowery,
+    upperx, uppery) in those coordinates. name must be ASCII and identify
+    the geometry: forms are shared document-wide by name.
+    """
+    if not c.hasForm(name):
+        c.beginForm(name, *bbox)
+        _forget_state(c)
+        draw(c)
+        _end_form(c)
+    if x or y:
+        c.saveState()
+        c.translate(x, y)
+        c.doForm(name)
+        c.restoreState()
+    else:
+        c.doForm(name)
@@ -0,0 +1,101 @@
+"""
+Gradient fills.
+
+The default mode paints each gradient with a single PDF axial shading
+(`sh` operator) clipped to the target rectangle. Shadings are defined in a
+unit square and mapped onto the rectangle with a transform, so every
+gradient with the same colors and direction shares one shading dictionary
+across the whole document. The legacy stripe painter is kept as a fallback
+for viewers that mishandle shadings.
+"""
+
+from reportlab.lib.colors import Color
+from reportlab.pdfbase.pdfdoc import PDFAxialShading
+from reportlab.pdfgen.canvas import _buildColorFunction, _normalizeColors
+
+SHADING = "shading"
+STRIPES = "stripes"
+MODES = (SHADING, STRIPES)
+
+
+def _stops(colors, positions):
+    """Return sorted (position, color) pairs covering 0..1."""
+    if positions is None:
+        n = len(colors)
+        positions = [i / (n - 1) for i in range(n)] if n > 1 else [0.0]
+    if len(positions) != len(colors):
+        raise ValueError("need to have the same number of colors and positions")
+    stops = sorted(zip(positions, colors), key=lambda s: s[0])
+    if stops[0][0] > 0:
+        stops.insert(0, (0.0, stops[0][1]))
+    if stops[-1][0] < 1:
+        stops.append((1.0, stops[-1][1]))
+    return stops
+
+
+def color_at(stops, t):
+    """Interpolated (r, g, b) at position t along the stops."""
+    for (p0, c0), (p1, c1) in zip(stops, stops[1:]):
+        if t <= p1:
+            u = 0 if p1 == p0 else (t - p0) / (p1 - p0)
+            return (c0.red + (c1.red - c0.red) * u,
+                    c0.green + (c1.green - c0.green) * u,
+                    c0.blue + (c1.blue - c0.blue) * u)
+    last = stops[-1][1]
+    return (last.red, last.green, last.blue)
+
+
+def _shading_name(c, stops, vertical):
+    """Resource name of the shared unit shading, registering it on first use."""
+    doc = c._doc
+    registry = getattr(doc, "_slidekit_shadings", None)
+    if registry is None:
+        registry = doc._slidekit_shadings = {}
+    key = (vertical, tuple((round(p, 6), col.red, col.green, col.blue)
+                           for p, col in stops))
+    name = registry.get(key)
+    if name is None:
+        space, ncolors = _normalizeColors([col for _, col in stops])
+        fcn = _buildColorFunction(ncolors, [p for p, _ in stops])
+        x1, y1 = (0, 1) if vertical else (1, 0)
+        shading = PDFAxialShading(0, 0, x1, y1, Function=fcn,
+                                  ColorSpace=space, Extend="[true true]")
+        name = registry[key] = doc.addShading(shading)
+    c._shadingUsed[name] = name
+    return name
+
+
+def shade_rect(c, x, y, w, h, colors, positions=None, vertical=False):
+    """Fill a rectangle with a shared axial shading."""
+    name = _shading_name(c, _stops(colors, positions), vertical)
+    c.saveState()
+    clip = c.beginPath()
+    clip.rect(x, y, w, h)
+    c.clipPath(clip, stroke=0, fill=0)
+    # `sh` honours the current fill alpha; gradients are always opaque.
+    c.setFillAlpha(1)
+    c.transform(w, 0, 0, h, x, y)
+    c._code.append("/%s sh" % name)
+    c.restoreState()
+
+
+def stripe_rect(c, x, y, w, h, colors, positions=None, vertical=False, steps=60):
+    """Fill a rectangle with `steps` solid stripes approximating the gradient."""
+    stops = _stops(colors, positions)
+    for i in range(steps):
+        c.setFillColor(Color(*color_at(stops, i / steps)))
+        if vertical:
+            c.rect(x, y + h * i / steps, w, h / steps + 1, stroke=0, fill=1)
+        else:
+            c.rect(x + w * i / steps, y, w / steps + 1, h, stroke=0, fill=1)
+
+
+def fill_rect(c, x, y, w, h, colors, positions=None, vertical=False,
+              mode=SHADING, steps=60):
+    """Gradient-fill a rectangle using the given mode."""
+    if mode == SHADING:
+        shade_rect(c, x, y, w, h, colors, positions, vertical)
+    elif mode == STRIPES:
+        stripe_rect(c, x, y, w, h, colors, positions, vertical, steps)
+    else:
+        raise ValueError(f"unknown gradient mode: {mode!r}")
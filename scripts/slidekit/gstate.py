@@ -0,0 +1,101 @@
+"""
+Graphics-state caching canvas.
+
+Slides set the font and fill color before every string and shape, even when
+nothing changed. ReportLab already mirrors the PDF graphics state on the
+Python side (and saves/restores it with q/Q), so StateCachingCanvas compares
+each setFont/setFillColor/setStrokeColor/setLineWidth against that state and
+drops the operator when it would be a no-op; alpha still goes through
+ReportLab, which only emits a `gs` switch when the value changes.
+
+Transparency states are also named document-wide: every page refers to one
+shared ExtGState resource dictionary instead of carrying its own copy. Pages
+placing the same images and forms likewise share one XObject dictionary.
+"""
+
+from collections import Counter
+
+from reportlab.lib.colors import CMYKColor, Color
+from reportlab.pdfbase import pdfdoc
+from reportlab.pdfgen import canvas
+
+
+def _rgb(color):
+    """Components written by an `rg`/`RG` operator for color, or None if not plain RGB."""
+    if isinstance(color, CMYKColor):
+        return None
+    if isinstance(color, Color):
+        return (color.red, color.green, color.blue)
+    if isinstance(color, (tuple, list)) and len(color) == 3:
+        return tuple(color)
+    return None
+
+
+class StateCachingCanvas(canvas.Canvas):
+    def __init__(self, *args, **kwargs):
+        self.elided = Counter()
+        super().__init__(*args, **kwargs)
+
+    def init_graphics_state(self):
+        super().init_graphics_state()
+        # Share one name registry across pages so each state is defined once.
+        self._extgstate._c = self.__dict__.setdefault("_gstate_names", {})
+
+    def _setExtGState(self, obj):
+        names = self._gstate_names
+        if not names:
+            obj.ExtGState = None
+            return
+        shared = self.__dict__.get("_gstate_resource")
+        if shared is None:
+            shared = self._gstate_resource = pdfdoc.PDFDictionary({})
+            self._gstate_ref = self._doc.Reference(shared)
+        for t, name in names.items():
+            if name not in shared.dict:
+                shared.dict[name] = pdfdoc.PDFDictionary(dict((t,)))
+        obj.ExtGState = self._gstate_ref
+
+    def _setXObjects(self, thing):
+        if not isinstance(thing, pdfdoc.PDFPage) or not self._formsinuse:
+            return super()._setXObjects(thing)
+        key = frozenset(self._formsinuse)
+        shared = self.__dict__.setdefault("_xobject_dicts", {})
+        if key not in shared:
+            shared[key] = self._doc.Reference(self._doc.xobjDict(sorted(key)))
+        thing.XObjects = shared[key]
+
+    def setFont(self, psfontname, size, leading=None):
+        if leading is None:
+            leading = size * 1.2
+        if (psfontname, size, leading) == (self._fontname, self._fontsize, self._leading):
+            self.elided["setFont"] += 1
+            return
+        super().setFont(psfontname, size, leading)
+
+    def setFillColor(self, aColor, alpha=None):
+        rgb = _rgb(aColor)
+        if rgb is None or self._enforceColorSpace or rgb != _rgb(self._fillColorObj):
+            return super().setFillColor(aColor, alpha)
+        self.elided["setFillColor"] += 1
+        self._fillColorObj = aColor
+        if alpha is None:
+            alpha = getattr(aColor, "alpha", None)
+        if alpha is not None:
+            self.setFillAlpha(alpha)
+
+    def setStrokeColor(self, aColor, alpha=None):
+        rgb = _rgb(aColor)
+        if rgb is None or self._enforceColorSpace or rgb != _rgb(self._strokeColorObj):
+            return super().setStrokeColor(aColor, alpha)
+        self.elided["setStrokeColor"] += 1
+        self._strokeColorObj = aColor
+        if alpha is None:
+            alpha = getattr(aColor, "alpha", None)
+        if alpha is not None:
+            self.setStrokeAlpha(alpha)
+
+    def setLineWidth(self, width):
+        if width == self._lineWidth:
+            self.elided["setLineWidth"] += 1
+            return
+        super().setLineWidth(width)
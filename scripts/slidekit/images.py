@@ -0,0 +1,258 @@
+"""
+Image preparation stage with a content-addressed on-disk cache.
+
+Each source image is resampled to the size it is actually placed at (for a
+target DPI, never upscaling), stripped of its alpha channel unless it has
+real transparency, and encoded as either PNG-predicted Flate (lossless) or
+JPEG, whichever suits the image. The encoded payload is written to the
+cache keyed by the source hash and the preparation parameters, and is
+embedded into the PDF as-is, so later builds never decode the source.
+"""
+
+import hashlib
+import io
+import json
+import os
+import struct
+
+from reportlab.pdfbase import pdfdoc
+from reportlab.pdfgen.canvas import aspectRatioFix
+
+DEFAULT_DPI = 150
+JPEG_QUALITY = 85
+# JPEG is only chosen when it is at most this fraction of the lossless size.
+# Flat graphics with few colors stay lossless; the deck's UI screenshots and
+# logo, resampled to their placed size, come out near 0.3 and go to JPEG.
+JPEG_GAIN = 0.5
+# Bump when the encoding logic changes so stale cache entries are ignored.
+CACHE_VERSION = 1
+
+_report = {}
+
+
+class PreparedImageXObject(pdfdoc.PDFImageXObject):
+    """Image XObject whose stream is an already-encoded cached payload."""
+
+    def __init__(self, name, meta, payload):
+        self.name = name
+        self.width = meta["width"]
+        self.height = meta["height"]
+        self.bitsPerComponent = 8
+        self.colorSpace = meta["colorspace"]
+        self._filters = (meta["filter"],)
+        self._decodeParms = meta.get("decode_parms")
+        self.streamContent = payload
+        self.mask = None
+
+    def format(self, document):
+        S = pdfdoc.PDFStream(content=self.streamContent)
+        d = S.dictionary
+        d["Type"] = pdfdoc.PDFName("XObject")
+        d["Subtype"] = pdfdoc.PDFName("Image")
+        d["Width"] = self.width
+        d["Height"] = self.height
+        d["BitsPerComponent"] = self.bitsPerComponent
+        d["ColorSpace"] = pdfdoc.PDFName(self.colorSpace)
+        d["Filter"] = pdfdoc.PDFArray([pdfdoc.PDFName(f) for f in self._filters])
+        if self._decodeParms:
+            # Filter is an array, so DecodeParms must be a parallel array.
+            d["DecodeParms"] = pdfdoc.PDFArray([pdfdoc.PDFDictionary(dict(self._decodeParms))])
+        d["Length"] = len(self.streamContent)
+        if getattr(self, "smask", None):
+            d["SMask"] = self.smask
+        return S.format(document)
+
+
+def file_hash(path):
+    """sha256 of a file's bytes."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _write_atomic(path, data):
+    """Write via a temp file so concurrent builds never read a partial entry."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _png_idat(im):
+    """Flate stream with PNG row predictors, taken straight from the PNG encoder."""
+    buf = io.BytesIO()
+    im.save(buf, "PNG", optimize=True)
+    data = buf.getvalue()
+    pos, idat = 8, []
+    while pos < len(data):
+        length, kind = struct.unpack(">I4s", data[pos:pos + 8])
+        if kind == b"IDAT":
+            idat.append(data[pos + 8:pos + 8 + length])
+        pos += 12 + length
+    colors = 1 if im.mode == "L" else 3
+    parms = {"Predictor": 15, "Colors": colors, "BitsPerComponent": 8,
+             "Columns": im.size[0]}
+    return b"".join(idat), parms
+
+
+def _encode(im):
+    """Pick lossless Flate or JPEG for an RGB/L image; returns (meta, payload)."""
+    space = "DeviceGray" if im.mode == "L" else "DeviceRGB"
+    flate, parms = _png_idat(im)
+    buf = io.BytesIO()
+    im.save(buf, "JPEG", quality=JPEG_QUALITY, optimize=True)
+    jpeg = buf.getvalue()
+    if len(jpeg) <= len(flate) * JPEG_GAIN:
+        return {"filter": "DCTDecode", "colorspace": space}, jpeg
+    return {"filter": "FlateDecode", "colorspace": space, "decode_parms": parms}, flate
+
+
+def _prepare(path, px_w, px_h):
+    from PIL import Image
+
+    im = Image.open(path)
+    im.load()
+    alpha = None
+    if im.mode in ("RGBA", "LA", "P"):
+        im = im.convert("RGBA")
+        a = im.getchannel("A")
+        if a.getextrema()[0] < 255:
+            alpha = a
+        im = im.convert("RGB")
+    elif im.mode not in ("RGB", "L"):
+        im = im.convert("RGB")
+    if (px_w, px_h) != im.size:
+        im = im.resize((px_w, px_h), Image.LANCZOS)
+        if alpha is not None:
+            alpha = alpha.resize((px_w, px_h), Image.LANCZOS)
+    meta, payload = _encode(im)
+    meta.update(width=px_w, height=px_h)
+    mask = None
+    if alpha is not None:
+        mask, parms = _png_idat(alpha)
+        meta["mask"] = {"width": px_w, "height": px_h, "colorspace": "DeviceGray",
+                        "filter": "FlateDecode", "decode_parms": parms}
+    return meta, payload, mask
+
+
+def _source_size(path):
+    from PIL import Image
+
+    with Image.open(path) as im:
+        return im.size
+
+
+def prepare(path, box_w, box_h, dpi=DEFAULT_DPI, cache_dir=None,
+            preserveAspectRatio=True):
+    """Prepared image entry for `path` drawn into a box of box_w x box_h points.
+
+    Returns (key, meta, payload, mask_payload). Cache hits read only the
+    cached files; the source is hashed but never decoded.
+    """
+    src_hash = file_hash(path)
+    params = f"v{CACHE_VERSION}:{src_hash}:{box_w:.3f}x{box_h:.3f}@{dpi}:{int(preserveAspectRatio)}"
+    key = hashlib.sha256(params.encode()).hexdigest()[:32]
+    if cache_dir:
+        base = os.path.join(cache_dir, key)
+        try:
+            with open(base + ".json") as f:
+                meta = json.load(f)
+            with open(base + ".bin", "rb") as f:
+                payload = f.read()
+            mask = None
+            if "mask" in meta:
+                with open(base + ".mask.bin", "rb") as f:
+                    mask = f.read()
+            meta["cached"] = True
+            return key, meta, payload, mask
+        except (OSError, ValueError):
+            pass
+
+    src_w, src_h = _source_size(path)
+    if preserveAspectRatio:
+        scale = min(box_w / src_w, box_h / src_h)
+        box_w, box_h = src_w * scale, src_h * scale
+    px_w = max(1, min(src_w, round(box_w * dpi / 72)))
+    px_h = max(1, min(src_h, round(box_h * dpi / 72)))
+    meta, payload, mask = _prepare(path, px_w, px_h)
+    meta.update(source=os.path.basename(path), source_bytes=os.path.getsize(path),
+                source_size=[src_w, src_h])
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+        base = os.path.join(cache_dir, key)
+        if mask is not None:
+            _write_atomic(base + ".mask.bin", mask)
+        _write_atomic(base + ".bin", payload)
+        # The metadata file is written last: its presence marks a complete entry.
+        _write_atomic(base + ".json", json.dumps(meta).encode())
+    meta["cached"] = False
+    return key, meta, payload, mask
+
+
+def draw_image(c, path, x, y, width, height, dpi=DEFAULT_DPI, cache_dir=None,
+               preserveAspectRatio=True, anchor="c"):
+    """Drop-in replacement for c.drawImage(..., mask="auto") using prepared images."""
+    from . import memory
+
+    with memory.section("image", os.path.basename(path)):
+        return _draw_image(c, path, x, y, width, height, dpi, cache_dir,
+                           preserveAspectRatio, anchor)
+
+
+def _draw_image(c, path, x, y, width, height, dpi, cache_dir, preserveAspectRatio, anchor):
+    key, meta, payload, mask = prepare(path, width, height, dpi, cache_dir,
+                                       preserveAspectRatio)
+    name = "prep" + key
+    regName = c._doc.getXObjectName(name)
+    imgObj = c._doc.idToObject.get(regName)
+    if imgObj is None:
+        imgObj = PreparedImageXObject(name, meta, payload)
+        c._setXObjects(imgObj)
+        c._doc.Reference(imgObj, regName)
+        c._doc.addForm(name, imgObj)
+        if mask is not None:
+            smask = PreparedImageXObject(name + "m", meta["mask"], mask)
+            imgObj.smask = c._doc.Reference(smask, c._doc.getXObjectName(smask.name))
+        embedded = len(payload) + (len(mask) if mask is not None else 0)
+        _report[name] = {
+            "source": meta["source"], "source_bytes": meta["source_bytes"], "embedded_bytes": embedded,
+            "pixels": [meta["width"], meta["height"]], "filter": meta["filter"],
+            "alpha": mask is not None, "cached": meta["cached"],
+        }
+    c._currentPageHasImages = 1
+    x, y, width, height, _ = aspectRatioFix(preserveAspectRatio, anchor, x, y,
+                                            width, height, imgObj.width, imgObj.height)
+    c.saveState()
+    # Image painting honours the current fill alpha left by translucent shapes.
+    c.setFillAlpha(1)
+    c.translate(x, y)
+    c.scale(width, height)
+    c._code.append("/%s Do" % regName)
+    c.restoreState()
+    c._formsinuse.append(name)
+    return imgObj.width, imgObj.height
+
+
+def report():
+    """Per-image summary of the images embedded so far in this process."""
+    return dict(_report)
+
+
+def merge_report(entries):
+    """Fold a report produced in another process into this one."""
+    _report.update(entries)
+
+
+def format_report(entries):
+    lines = []
+    for e in sorted(entries.values(), key=lambda e: (e["source"], e["pixels"])):
+        saved = e["source_bytes"] - e["embedded_bytes"]
+        lines.append(
+            f"  {e['source']}: {e['source_bytes']:,} -> {e['embedded_bytes']:,} bytes "
+            f"(saved {saved:,}; {e['pixels'][0]}x{e['pixels'][1]} "
+            f"{e['filter']}{' +alpha' if e['alpha'] else ''}"
+            f"{', cached' if e['cached'] else ''})"
+        )
+    return "\n".join(lines)
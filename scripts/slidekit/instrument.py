@@ -0,0 +1,128 @@
+"""
+Per-slide drawing instrumentation.
+
+CountingCanvas wraps the canvas handed to a slide function and counts the
+canvas calls the slide (and the helpers it uses) makes, by kind. Profiler
+drives it slide by slide and adds wall time plus the size and operator
+histogram of the content-stream code each slide appended, so the cost of a
+page can be traced back to calls (setFillColor, roundRect, ...) and to the
+operators they turn into (gs, sh, Do, ...).
+"""
+
+import json
+import time
+from collections import Counter
+
+from . import pdfstats
+
+# Canvas method -> reported kind. Text drawing variants are folded together.
+TRACKED = {
+    "setFillColor": "setFillColor",
+    "setStrokeColor": "setStrokeColor",
+    "setFont": "setFont",
+    "setLineWidth": "setLineWidth",
+    "setFillAlpha": "setFillAlpha",
+    "rect": "rect",
+    "roundRect": "roundRect",
+    "circle": "circle",
+    "line": "line",
+    "drawPath": "drawPath",
+    "drawString": "drawString",
+    "drawCentredString": "drawString",
+    "drawRightString": "drawString",
+    "drawImage": "drawImage",
+    "clipPath": "clipPath",
+    "saveState": "saveState",
+}
+# Columns of the text report: (header, source, key).
+COLUMNS = [
+    ("fill", "calls", "setFillColor"),
+    ("font", "calls", "setFont"),
+    ("alpha", "calls", "alphaColor"),
+    ("rect", "calls", "rect"),
+    ("rrect", "calls", "roundRect"),
+    ("text", "calls", "drawString"),
+    ("clip", "calls", "clipPath"),
+    ("img", "ops", "Do"),
+    ("sh", "ops", "sh"),
+    ("gs", "ops", "gs"),
+]
+
+
+class CountingCanvas:
+    """Transparent proxy for a ReportLab canvas that counts tracked calls."""
+
+    def __init__(self, canvas, counts):
+        object.__setattr__(self, "_canvas", canvas)
+        object.__setattr__(self, "_counts", counts)
+
+    def __getattr__(self, name):
+        attr = getattr(self._canvas, name)
+        kind = TRACKED.get(name)
+        if kind is None:
+            return attr
+        counts = self._counts
+
+        def counted(*args, **kwargs):
+            counts[kind] += 1
+            if kind in ("setFillColor", "setStrokeColor") and args \
+                    and getattr(args[0], "alpha", 1) < 1:
+                # Translucent colors also emit an ExtGState (gs) switch.
+                counts["alphaColor"] += 1
+            return attr(*args, **kwargs)
+        return counted
+
+    def __setattr__(self, name, value):
+        setattr(self._canvas, name, value)
+
+
+class Profiler:
+    def __init__(self):
+        self.slides = []
+
+    def run(self, name, fn, c):
+        """Call fn on an instrumented view of canvas c and record its profile."""
+        counts = Counter()
+        start = len(c._code)
+        t0 = time.perf_counter()
+        fn(CountingCanvas(c, counts))
+        elapsed = time.perf_counter() - t0
+        code = "\n".join(c._code[start:]).encode("utf-8")
+        self.slides.append({
+            "name": name,
+            "time_s": elapsed,
+            "stream_bytes": len(code),
+            "calls": dict(counts),
+            "ops": dict(pdfstats.operator_counts(code)),
+        })
+
+    def totals(self):
+        calls, ops = Counter(), Counter()
+        for s in self.slides:
+            calls.update(s["calls"])
+            ops.update(s["ops"])
+        return {
+            "time_s": sum(s["time_s"] for s in self.slides),
+            "stream_bytes": sum(s["stream_bytes"] for s in self.slides),
+            "calls": dict(calls),
+            "ops": dict(ops),
+        }
+
+    def to_json(self):
+        return json.dumps({"slides": self.slides, "totals": self.totals()},
+                          indent=2, ensure_ascii=False)
+
+    def format_table(self):
+        rows = self.slides + [dict(self.totals(), name="total")]
+        width = max(len(r["name"]) for r in rows)
+        head = (f"  {'slide':<{width}} {'ms':>7} {'stream':>8} {'ops':>6} "
+                + " ".join(f"{h:>5}" for h, _, _ in COLUMNS))
+        lines = [head]
+        for r in rows:
+            if r["name"] == "total":
+                lines.append("  " + "-" * (len(head) - 2))
+            lines.append(
+                f"  {r['name']:<{width}} {r['time_s'] * 1000:>7.2f} {r['stream_bytes']:>8,} "
+                f"{sum(r['ops'].values()):>6} "
+                + " ".join(f"{r[src].get(key, 0):>5}" for _, src, key in COLUMNS))
+        return "\n".join(lines)
@@ -0,0 +1,142 @@
+"""
+Invoice CSV exports.
+
+/api/invoices/export writes one row per invoice, newest upload first, as
+UTF-8 with a BOM and CRLF line ends, quoting only where needed. read()
+parses such a file lazily, so an export of any length is read in constant
+memory, and summarize() folds the rows into running totals whose size
+depends only on the number of distinct vendors and months.
+"""
+
+import csv
+from typing import NamedTuple, Optional
+
+HEADERS = ("取引先名", "ファイル名", "請求金額", "請求期日", "アップロード日", "ステータス")
+PAID = "振込済"
+UNPAID = "未振込"
+# Group labels for rows without a vendor or a due date.
+NO_VENDOR = "(取引先なし)"
+NO_MONTH = "期日なし"
+
+
+class Invoice(NamedTuple):
+    vendor: str
+    file_name: str
+    amount: Optional[int]
+    due: Optional[str]          # YYYY-MM-DD
+    uploaded: str               # YYYY/MM/DD (Asia/Tokyo)
+    paid: bool
+
+
+class InvoiceCsvError(ValueError):
+    pass
+
+
+def read(path):
+    """Yield an Invoice per row of the export at path."""
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        yield from parse(f, path)
+
+
+def parse(lines, name, header=True, first_line=1):
+    """Yield an Invoice per CSV record in lines, an iterable of text lines.
+
+    name and first_line (the line number of lines[0]) locate errors; without
+    `header` the lines hold records only.
+    """
+    reader = csv.reader(lines)
+    if header:
+        columns = next(reader, None)
+        if columns is None or tuple(h.strip() for h in columns) != HEADERS:
+            raise InvoiceCsvError(f"{name}: expected the columns {', '.join(HEADERS)}")
+    for row in reader:
+        if not row:
+            continue
+        where = f"{name}:{first_line - 1 + reader.line_num}"
+        if len(row) != len(HEADERS):
+            raise InvoiceCsvError(f"{where}: expected {len(HEADERS)} columns, got {len(row)}")
+        vendor, file_name, amount, due, uploaded, status = row
+        if status not in (PAID, UNPAID):
+            raise InvoiceCsvError(f"{where}: unknown status {status!r}")
+        try:
+            amount = int(amount) if amount else None
+        except ValueError:
+            raise InvoiceCsvError(f"{where}: amount {amount!r} is not an integer")
+        yield Invoice(vendor, file_name, amount, due or None, uploaded, status == PAID)
+
+
+def month_of(invoice):
+    """YYYY-MM of the due date, or NO_MONTH."""
+    return invoice.due[:7] if invoice.due else NO_MONTH
+
+
+class Totals:
+    """Running count and amount of a group of invoices, split by status."""
+
+    __slots__ = ("count", "amount", "paid_count", "paid_amount", "no_amount")
+
+    def __init__(self):
+        self.count = self.amount = self.paid_count = self.paid_amount = self.no_amount = 0
+
+    def add(self, invoice):
+        amount = invoice.amount or 0
+        self.count += 1
+        self.amount += amount
+        if invoice.amount is None:
+            self.no_amount += 1
+        if invoice.paid:
+            self.paid_count += 1
+            self.paid_amount += amount
+
+    @property
+    def unpaid_count(self):
+        return self.count - self.paid_count
+
+    @property
+    def unpaid_amount(self):
+        return self.amount - self.paid_amount
+
+
+class Summary(NamedTuple):
+    total: Totals
+    vendors: dict               # vendor -> Totals
+    months: dict                # YYYY-MM or NO_MONTH -> Totals
+
+
+def summarize(invoices):
+    """Totals overall, per vendor and per due month of an iterable of invoices."""
+    total, vendors, months = Totals(), {}, {}
+    for inv in invoices:
+        total.add(inv)
+        vendor = vendors.get(inv.vendor)
+        if vendor is None:
+            vendor = vendors[inv.vendor] = Totals()
+        vendor.add(inv)
+        key = month_of(inv)
+        month = months.get(key)
+        if month is None:
+            month = months[key] = Totals()
+        month.add(inv)
+    return Summary(total, vendors, months)
+
+
+def write_sample(path, count, seed=0):
+    """Write a synthetic export of `count` invoices to path, formatted like the API's."""
+    import random
+
+    rng = random.Random(seed)
+    vendors = [f"株式会社サンプル商事{i:03d}" for i in range(120)] + ["", "合同会社テスト, 東京支店"]
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.writer(f, lineterminator="\r\n")
+        writer.writerow(HEADERS)
+        for i in range(count):
+            year, month, day = rng.choice((2025, 2026)), rng.randint(1, 12), rng.randint(1, 28)
+            paid = rng.random() < 0.7
+            writer.writerow([
+                rng.choice(vendors),
+                f"invoice_{year}{month:02d}_{i:06d}.pdf",
+                "" if rng.random() < 0.01 else rng.randint(1, 2_000) * 1_000,
+                "" if rng.random() < 0.02 else f"{year}-{month:02d}-{day:02d}",
+                f"{year}/{month:02d}/{day:02d}",
+                PAID if paid else UNPAID,
+            ])
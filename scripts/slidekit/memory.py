@@ -0,0 +1,228 @@
+"""
+Memory accounting and a peak-RSS budget.
+
+A buffered canvas keeps every finished page, content stream and embedded
+image until save(), so a deck's memory grows with its length. Two tools:
+
+MemoryProfiler traces Python allocations (tracemalloc) and resident set
+size around named sections: each slide function, each image embedded,
+canvas.save(). For every section it records the bytes still allocated when
+it ends (what the document now holds), its transient peak, and the RSS
+change; a snapshot taken before save() gives the top allocation sites.
+
+A budget guard reads the process RSS after each slide. It trips as soon
+as the next step could cross the budget, judged by the largest growth
+between two checks so far, so the build can fail with a clear message or
+change strategy while there is still room, instead of being OOM-killed.
+The guard does not need tracemalloc and costs one /proc read per slide.
+"""
+
+import contextlib
+import os
+import tracemalloc
+from collections import Counter
+
+TOP_SITES = 15
+# Frames kept per traced allocation: enough to see which helper allocated.
+TRACE_FRAMES = 4
+
+_profiler = None
+_guard = None
+
+
+def rss():
+    """Current resident set size in bytes (the peak where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        from .bench import max_rss
+
+        return max_rss()
+
+
+class MemoryBudgetExceeded(MemoryError):
+    def __init__(self, where, rss, step, budget, reserve=0):
+        # Everything goes to args so the exception survives pickling from workers.
+        super().__init__(where, rss, step, budget, reserve)
+        self.where, self.rss, self.step, self.budget = where, rss, step, budget
+        self.reserve = reserve
+
+    def __str__(self):
+        if not self.step and not self.reserve:
+            return (f"after {self.where}: RSS {self.rss / 2**20:.1f} MB exceeds the "
+                    f"{self.budget / 2**20:.0f} MB budget")
+        reserve = f" less {self.reserve / 2**20:.1f} MB in reserve" if self.reserve else ""
+        return (f"after {self.where}: RSS {self.rss / 2**20:.1f} MB plus up to "
+                f"{self.step / 2**20:.1f} MB for the next step would exceed the "
+                f"{self.budget / 2**20:.0f} MB budget{reserve}")
+
+
+class Guard:
+    def __init__(self, budget, reserve=0):
+        self.budget = budget
+        self.reserve = reserve
+        self.peak = 0
+        self.rebase()
+
+    def rebase(self, reserve=None):
+        if reserve is not None:
+            self.reserve = reserve
+        self.last = rss()
+        self.peak = max(self.peak, self.last)
+        self.step = 0
+
+    def check(self, where, last=False):
+        now = rss()
+        self.step = max(self.step, now - self.last)
+        self.last = now
+        self.peak = max(self.peak, now)
+        if last:
+            if now > self.budget:
+                raise MemoryBudgetExceeded(where, now, 0, self.budget)
+        elif now + self.step + self.reserve > self.budget:
+            raise MemoryBudgetExceeded(where, now, self.step, self.budget, self.reserve)
+
+
+def set_budget(budget, reserve=0):
+    """Enforce an RSS budget in bytes at every check() from now on (None: off),
+    tripping `reserve` bytes early to leave room for a change of strategy."""
+    global _guard
+    _guard = Guard(budget, reserve) if budget else None
+
+
+def check(where, last=False):
+    """Raise MemoryBudgetExceeded if the budget is at risk after `where`; after
+    the last step, with nothing left to grow, only if RSS already exceeds it."""
+    if _guard is not None:
+        _guard.check(where, last)
+
+
+def rebase(reserve=None):
+    """Forget the growth measured so far, e.g. once finished pages were written
+    out; a reserve given replaces the one set with the budget."""
+    if _guard is not None:
+        _guard.rebase(reserve)
+
+
+def budget_status():
+    """(peak RSS seen by the guard, budget), or None without a budget."""
+    return None if _guard is None else (_guard.peak, _guard.budget)
+
+
+@contextlib.contextmanager
+def section(kind, name):
+    """Account what the block allocates to (kind, name) while profiling."""
+    if _profiler is None:
+        yield
+    else:
+        with _profiler.measure(kind, name):
+            yield
+
+
+class MemoryProfiler:
+    def __init__(self):
+        self.sections = []
+        self.sites = []
+        self._hidden = []
+
+    def start(self):
+        global _profiler
+        tracemalloc.start(TRACE_FRAMES)
+        self._hidden = [0]
+        self.start_rss = rss()
+        _profiler = self
+
+    def stop(self):
+        global _profiler
+        from .bench import max_rss
+
+        _profiler = None
+        self.peak = max([self._hidden[0], tracemalloc.get_traced_memory()[1]])
+        tracemalloc.stop()
+        self.peak_rss = max_rss()
+
+    @contextlib.contextmanager
+    def measure(self, kind, name):
+        # tracemalloc has one peak counter; it is reset for each section and
+        # the peak it had reached is carried over to the enclosing one.
+        current, peak = tracemalloc.get_traced_memory()
+        self._hidden[-1] = max(self._hidden[-1], peak)
+        self._hidden.append(0)
+        tracemalloc.reset_peak()
+        rss0 = rss()
+        try:
+            yield
+        finally:
+            end, peak = tracemalloc.get_traced_memory()
+            peak = max(self._hidden.pop(), peak)
+            self._hidden[-1] = max(self._hidden[-1], peak)
+            self.sections.append({
+                "kind": kind, "name": name,
+                "alloc_bytes": end - current,
+                "peak_bytes": peak - current,
+                "rss_delta_bytes": rss() - rss0,
+            })
+
+    def snapshot_sites(self, limit=TOP_SITES):
+        """Record the top allocation sites of what is allocated right now."""
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ])
+        self.sites = []
+        for stat in snapshot.statistics("lineno")[:limit]:
+            frame = stat.traceback[0]
+            self.sites.append({"site": f"{_short(frame.filename)}:{frame.lineno}",
+                               "bytes": stat.size, "count": stat.count})
+
+    def images(self):
+        """Image sections merged by name: draws, bytes held, largest peak."""
+        merged = {}
+        for s in self.sections:
+            if s["kind"] != "image":
+                continue
+            m = merged.setdefault(s["name"], Counter())
+            m["draws"] += 1
+            m["alloc_bytes"] += s["alloc_bytes"]
+            m["rss_delta_bytes"] += s["rss_delta_bytes"]
+            m["peak_bytes"] = max(m["peak_bytes"], s["peak_bytes"])
+        return [dict(v, name=k) for k, v in merged.items()]
+
+    def to_dict(self):
+        return {
+            "slides": [s for s in self.sections if s["kind"] != "image"],
+            "images": self.images(),
+            "top_sites": self.sites,
+            "traced_peak_bytes": self.peak,
+            "start_rss_bytes": self.start_rss,
+            "peak_rss_bytes": self.peak_rss,
+        }
+
+    def format_table(self):
+        lines = [f"  {'section':<28} {'held KB':>9} {'peak KB':>9} {'RSS KB':>9}"]
+        rows = [s for s in self.sections if s["kind"] != "image"] + [
+            dict(r, name=f"image {r['name']} (x{r['draws']})") for r in self.images()]
+        for r in rows:
+            lines.append(f"  {r['name']:<28} {_kb(r['alloc_bytes'])} {_kb(r['peak_bytes'])} "
+                         f"{_kb(r['rss_delta_bytes'])}")
+        lines.append(f"  traced peak {self.peak / 2**20:.1f} MB, "
+                     f"RSS {self.start_rss / 2**20:.1f} -> peak {self.peak_rss / 2**20:.1f} MB")
+        if self.sites:
+            lines.append("  Top allocation sites before save():")
+            for s in self.sites:
+                lines.append(f"    {s['bytes'] / 1024:>9,.0f} KB {s['count']:>8,}  {s['site']}")
+        return "\n".join(lines)
+
+
+def _kb(value):
+    """Bytes as right-aligned whole KB for format_table()."""
+    return f"{value / 1024:>9,.0f}"
+
+
+def _short(path):
+    """path relative to site-packages or this repo, for readable site names."""
+    for marker in ("site-packages" + os.sep, "scripts" + os.sep):
+        if marker in path:
+            return path.split(marker, 1)[1]
+    return path
@@ -0,0 +1,39 @@
+"""
+Parallel per-slide rendering.
+
+Each slide is rendered by a worker process into its own single-page PDF;
+the pages are then merged in order with pypdf, which also collapses the
+objects every page carries a copy of (font dictionaries, shadings, shared
+images) into one.
+"""
+
+import io
+from concurrent.futures import ProcessPoolExecutor
+
+DEDUP_PASSES = 3
+
+
+def render_pages(render_one, names, jobs, initializer=None, initargs=()):
+    """Results of render_one(name) for each name, computed on `jobs` processes, in order."""
+    with ProcessPoolExecutor(max_workers=jobs, initializer=initializer,
+                             initargs=initargs) as pool:
+        return list(pool.map(render_one, names))
+
+
+def merge_pdfs(pages, target, metadata=None):
+    """Concatenate single-document PDF byte strings into `target`, deduplicating objects."""
+    try:
+        from pypdf import PdfReader, PdfWriter
+    except ImportError:
+        raise SystemExit("parallel rendering requires pypdf (pip install pypdf)")
+
+    writer = PdfWriter()
+    for data in pages:
+        writer.append(PdfReader(io.BytesIO(data)))
+    # Each pass only merges objects whose children are already merged, and
+    # resources nest a few levels deep (Function -> Shading, image -> SMask).
+    for _ in range(DEDUP_PASSES):
+        writer.compress_identical_objects()
+    if metadata:
+        writer.add_metadata(metadata)
+    writer.write(target)
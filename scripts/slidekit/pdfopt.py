@@ -0,0 +1,94 @@
+"""
+Delivery rewrite of a finished PDF: linearization, object streams and
+content-stream compression level (via pikepdf/qpdf).
+
+A plain PDF ends with its cross-reference table, so a viewer fetching it
+over HTTP cannot draw anything until the whole file has arrived. A
+linearized ("fast web view") file starts with a linearization dictionary,
+the first page's cross-reference section and every object page 1 needs;
+page 1 can be shown once the first /E bytes are in.
+
+Object streams pack the many small dictionaries ReportLab writes one by
+one (fonts, pages, annotations, ExtGStates) into compressed streams,
+indexed by a cross-reference stream instead of a text table. ReportLab
+always deflates at zlib's default level; content streams (pages and form
+XObjects) can be recompressed at another level, 0 meaning uncompressed.
+Images are left as they are.
+
+IDs are derived from the content, so rewriting stays reproducible.
+"""
+
+import io
+import re
+import zlib
+
+LEVELS = range(10)
+
+
+def _pikepdf():
+    try:
+        import pikepdf
+    except ImportError:
+        raise SystemExit("--linearize, --object-streams and --compress-level require pikepdf "
+                         "(pip install pikepdf)")
+    return pikepdf
+
+
+def _content_streams(pdf, pikepdf):
+    """Page content streams and form XObjects, each once."""
+    seen = set()
+    for page in pdf.pages:
+        contents = page.obj.get("/Contents")
+        if contents is None:
+            continue
+        for s in (contents if isinstance(contents, pikepdf.Array) else [contents]):
+            if s.objgen not in seen:
+                seen.add(s.objgen)
+                yield s
+    for obj in pdf.objects:
+        if (isinstance(obj, pikepdf.Stream) and obj.get("/Subtype") == "/Form"
+                and obj.objgen not in seen):
+            seen.add(obj.objgen)
+            yield obj
+
+
+def _recompress(pdf, pikepdf, level):
+    for s in _content_streams(pdf, pikepdf):
+        data = s.read_bytes()
+        if level:
+            s.write(zlib.compress(data, level), filter=pikepdf.Name.FlateDecode)
+        else:
+            s.write(data)
+
+
+def _rewrite(src, dest, linearize, object_streams, level):
+    pikepdf = _pikepdf()
+    with pikepdf.open(src, allow_overwriting_input=isinstance(src, str)) as pdf:
+        if level is not None:
+            _recompress(pdf, pikepdf, level)
+        mode = pikepdf.ObjectStreamMode
+        pdf.save(dest, linearize=linearize, deterministic_id=True,
+                 compress_streams=level != 0,
+                 object_stream_mode=mode.generate if object_streams else mode.preserve)
+
+
+def rewrite(path, linearize=False, object_streams=False, level=None):
+    """Rewrite the PDF at path in place."""
+    _rewrite(path, path, linearize, object_streams, level)
+
+
+def rewrite_bytes(data, linearize=False, object_streams=False, level=None):
+    """The rewritten PDF for PDF bytes."""
+    out = io.BytesIO()
+    _rewrite(io.BytesIO(data), out, linearize, object_streams, level)
+    return out.getvalue()
+
+
+def first_page_end(head):
+    """Offset (/E) at which page 1's objects end, from a linearized file's
+    first kilobyte; None for a file that is not linearized."""
+    m = re.search(rb"/Linearized\s.*?>>", head[:1024], re.S)
+    if m is None:
+        return None
+    e = re.search(rb"/E\s+(\d+)", m.group())
+    return int(e.group(1)) if e else None
@@ -0,0 +1,82 @@
+"""
+Content-stream statistics for generated PDFs (stdlib only).
+
+Used to compare builds: operator counts per page, stream sizes and total
+output bytes. Only understands the plain (non object-stream) layout that
+ReportLab writes.
+"""
+
+import base64
+import re
+import zlib
+from collections import Counter
+
+_OBJ_RE = re.compile(rb"(\d+) 0 obj\s*(.*?)endobj", re.S)
+_CONTENTS_RE = re.compile(rb"/Contents (\d+) 0 R")
+_KIDS_RE = re.compile(rb"/Kids \[([^\]]*)\]")
+_TOKEN_RE = re.compile(
+    rb"\((?:\\.|[^\\)])*\)"      # literal string
+    rb"|<[0-9A-Fa-f\s]*>"        # hex string
+    rb"|/[^\s/\[\]()<>]+"        # name
+    rb"|[-+]?\d*\.?\d+"          # number
+    rb"|[\[\]]"
+    rb"|[A-Za-z'\"*]+"           # operator
+)
+
+
+def _objects(data):
+    return {int(m.group(1)): m.group(2) for m in _OBJ_RE.finditer(data)}
+
+
+def _a85(payload):
+    text = payload.strip()
+    if text.endswith(b"~>") and not text.startswith(b"<~"):
+        text = b"<~" + text
+    return base64.a85decode(text, adobe=True)
+
+
+def stream_payload(body):
+    """Decoded stream of an object body, applying ASCII85/Flate filters."""
+    head, _, rest = body.partition(b"stream")
+    payload = rest.lstrip(b"\r\n").rsplit(b"endstream", 1)[0]
+    if b"/ASCII85Decode" in head:
+        payload = _a85(payload)
+    if b"/FlateDecode" in head:
+        payload = zlib.decompress(payload)
+    return payload
+
+
+def page_streams(data):
+    """Decoded content stream of each page, in page order."""
+    objs = _objects(data)
+    kids = []
+    for body in objs.values():
+        if b"/Type /Pages" in body:
+            m = _KIDS_RE.search(body)
+            if m:
+                kids = [int(n) for n in re.findall(rb"(\d+) 0 R", m.group(1))]
+                break
+    streams = []
+    for num in kids:
+        m = _CONTENTS_RE.search(objs[num])
+        streams.append(stream_payload(objs[int(m.group(1))]))
+    return streams
+
+
+def operator_counts(stream):
+    """Counter of PDF operators in one decoded content stream."""
+    ops = Counter()
+    for tok in _TOKEN_RE.findall(stream):
+        if tok[:1].isalpha() or tok[:1] in b"'\"*":
+            ops[tok.decode("latin-1")] += 1
+    return ops
+
+
+def summarize(data):
+    """Per-page operator totals and stream sizes for a PDF byte string."""
+    pages = []
+    for stream in page_streams(data):
+        ops = operator_counts(stream)
+        pages.append({"ops": sum(ops.values()), "stream_bytes": len(stream),
+                      "by_op": dict(ops)})
+    return {"bytes": len(data), "pages": pages}
@@ -0,0 +1,155 @@
+"""
+Plan limits extracted from the app's TypeScript source.
+
+src/lib/plan-limits.ts is the source of truth for what each plan allows
+and costs; the pricing slide renders from it instead of restating the
+numbers. The `PLAN_LIMITS` object literal is parsed with a small
+tokenizer (it only holds numbers, null, booleans and strings) into
+PlanLimits tuples; a field holding anything else is an error naming it. The result is cached as JSON next to the file's mtime,
+size and hash: an unchanged mtime skips reading the file, and a touched
+but identical file is re-hashed without being re-parsed.
+"""
+
+import hashlib
+import json
+import os
+import re
+from typing import NamedTuple, Optional
+
+# Bump when parsing changes so cached extractions are ignored.
+CACHE_VERSION = 1
+
+
+class PlanLimits(NamedTuple):
+    max_vendors: Optional[int]
+    max_invoices: Optional[int]
+    max_members: Optional[int]
+    can_export_csv: bool
+    monthly_price: int
+    display_name: str
+
+
+# TypeScript field -> (PlanLimits field, accepted Python types).
+FIELDS = {
+    "maxVendors": ("max_vendors", (int, type(None))),
+    "maxInvoices": ("max_invoices", (int, type(None))),
+    "maxMembers": ("max_members", (int, type(None))),
+    "canExportCsv": ("can_export_csv", (bool,)),
+    "monthlyPrice": ("monthly_price", (int,)),
+    "displayName": ("display_name", (str,)),
+}
+
+_COMMENT_RE = re.compile(r"/\*.*?\*/|//[^\n]*", re.S)
+_DECL_RE = re.compile(r"\bconst\s+PLAN_LIMITS\b[^=]*=\s*\{")
+_TIER_RE = re.compile(r"\s*(\w+|\"[^\"]*\"|'[^']*')\s*:\s*\{")
+_TIER_END_RE = re.compile(r"\}\s*,?")
+# A field is one literal followed by a comma or the end of the block.
+_FIELD_RE = re.compile(r"\s*(\w+)\s*:\s*(\"[^\"]*\"|'[^']*'|[^,\s]+)\s*(?:,|\Z)")
+_KEY_RE = re.compile(r"\s*(\w+)\s*:\s*([^\n]*)")
+_NUMBER_RE = re.compile(r"-?\d[\d_]*")
+
+
+class PlanLimitsError(ValueError):
+    pass
+
+
+def _literal(text, where):
+    if text == "null":
+        return None
+    if text in ("true", "false"):
+        return text == "true"
+    if text[0] in "\"'":
+        return text[1:-1]
+    if _NUMBER_RE.fullmatch(text):
+        return int(text.replace("_", ""))
+    raise PlanLimitsError(f"{where}: unsupported value {text!r}")
+
+
+def _block(source, start):
+    """Text between the brace before `start` and its matching close brace."""
+    depth = 1
+    for i in range(start, len(source)):
+        if source[i] == "{":
+            depth += 1
+        elif source[i] == "}":
+            depth -= 1
+            if depth == 0:
+                return source[start:i]
+    raise PlanLimitsError("PLAN_LIMITS: unbalanced braces")
+
+
+def parse(source):
+    """{tier: PlanLimits} from the text of plan-limits.ts, in source order."""
+    source = _COMMENT_RE.sub("", source)
+    decl = _DECL_RE.search(source)
+    if not decl:
+        raise PlanLimitsError("no `const PLAN_LIMITS = {...}` declaration found")
+    body = _block(source, decl.end())
+    plans, pos = {}, 0
+    while body[pos:].strip():
+        tier = _TIER_RE.match(body, pos)
+        if not tier:
+            raise PlanLimitsError(f"PLAN_LIMITS: cannot parse {body[pos:].strip()[:40]!r}")
+        name = tier.group(1).strip("\"'")
+        fields = _block(body, tier.end())
+        values, at = {}, 0
+        while fields[at:].strip():
+            head = _KEY_RE.match(fields, at)
+            if not head:
+                raise PlanLimitsError(f"{name}: cannot parse {fields[at:].strip()[:40]!r}")
+            key = head.group(1)
+            if key not in FIELDS:
+                raise PlanLimitsError(f"{name}.{key}: unknown field")
+            field = _FIELD_RE.match(fields, at)
+            if not field:
+                raise PlanLimitsError(f"{name}.{key}: unsupported value "
+                                      f"{head.group(2).strip().rstrip(',')[:40]!r} (expected a number, "
+                                      "string, boolean or null)")
+            at, text = field.end(), field.group(2)
+            attr, types = FIELDS[key]
+            value = _literal(text, f"{name}.{key}")
+            if not isinstance(value, types) or (bool not in types and isinstance(value, bool)):
+                raise PlanLimitsError(f"{name}.{key}: unexpected value {text}")
+            values[attr] = value
+        missing = [key for key, (attr, _) in FIELDS.items() if attr not in values]
+        if missing:
+            raise PlanLimitsError(f"{name}: missing {', '.join(missing)}")
+        plans[name] = PlanLimits(**values)
+        pos = _TIER_END_RE.match(body, tier.end() + len(fields)).end()
+    if not plans:
+        raise PlanLimitsError("PLAN_LIMITS is empty")
+    return plans
+
+
+def load(path, cache_path=None):
+    """Plans from the TypeScript file at path, via the extraction cache at cache_path."""
+    st = os.stat(path)
+    cached = None
+    if cache_path:
+        try:
+            with open(cache_path, encoding="utf-8") as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            pass
+    if cached and cached.get("version") != CACHE_VERSION:
+        cached = None
+    if cached and (cached["mtime_ns"], cached["size"]) == (st.st_mtime_ns, st.st_size):
+        return {k: PlanLimits(**v) for k, v in cached["plans"].items()}
+
+    with open(path, "rb") as f:
+        data = f.read()
+    sha = hashlib.sha256(data).hexdigest()
+    if cached and cached["sha256"] == sha:
+        plans = {k: PlanLimits(**v) for k, v in cached["plans"].items()}
+    else:
+        plans = parse(data.decode("utf-8"))
+    if cache_path:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": CACHE_VERSION, "mtime_ns": st.st_mtime_ns,
+                       "size": st.st_size, "sha256": sha,
+                       "plans": {k: v._asdict() for k, v in plans.items()}},
+                      f, ensure_ascii=False)
+        os.replace(tmp, cache_path)
+    return plans
@@ -0,0 +1,235 @@
+"""
+Live preview for --watch.
+
+Preview holds the current single-page PDF of every slide plus a PNG
+rasterized right after the slide is rendered, and bumps a version each
+time pages change. serve() exposes it over HTTP on localhost:
+
+    /                 preview page (latest changed slide, strip of all slides)
+    /events           server-sent events; one message per version
+    /page/N.png       slide N (1-based) as PNG
+    /slide/N.pdf      slide N as a single-page PDF
+    /deck.pdf         all slides merged (on request, once per version)
+
+The page listens on /events and swaps in the changed slides' images, so
+the browser refreshes without reloading or re-downloading the deck.
+"""
+
+import io
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PREVIEW_WIDTH = 1280
+# Seconds between keep-alive comments on idle event streams.
+KEEPALIVE = 15
+
+PAGE = """<!doctype html>
+<html lang="ja"><head><meta charset="utf-8"><title>Slide preview</title>
+<style>
+body { margin: 0; font: 13px sans-serif; background: #0f172a; color: #e2e8f0; }
+header { padding: 8px 16px; display: flex; gap: 16px; align-items: center; }
+header a { color: #a5b4fc; }
+#main { display: block; margin: 0 auto; max-width: calc(100vw - 32px); max-height: calc(100vh - 160px); }
+#error { white-space: pre-wrap; background: #7f1d1d; padding: 8px 16px; display: none; }
+#strip { display: flex; gap: 6px; padding: 8px 16px; overflow-x: auto; }
+#strip img { height: 72px; cursor: pointer; outline: 2px solid transparent; }
+#strip img.current { outline-color: #818cf8; }
+</style></head><body>
+<header><b id="title"></b><span id="status"></span><a href="/deck.pdf">deck.pdf</a></header>
+<div id="error"></div>
+<img id="main" alt="">
+<div id="strip"></div>
+<script>
+let names = [], current = 0, version = 0;
+const $ = (id) => document.getElementById(id);
+function show(i) {
+  current = i;
+  $("main").src = `/page/${i + 1}.png?v=${version}`;
+  $("title").textContent = `${i + 1}. ${names[i]}`;
+  document.querySelectorAll("#strip img").forEach((im, k) => im.classList.toggle("current", k === i));
+}
+function update(state) {
+  const fresh = names.join() !== state.names.join();
+  names = state.names; version = state.version;
+  if (fresh) {
+    $("strip").replaceChildren(...names.map((n, i) => {
+      const im = document.createElement("img");
+      im.title = n; im.onclick = () => show(i);
+      return im;
+    }));
+  }
+  const thumbs = $("strip").children;
+  for (let i = 0; i < names.length; i++) {
+    if (fresh || state.changed.includes(i)) thumbs[i].src = `/page/${i + 1}.png?v=${version}`;
+  }
+  $("error").style.display = state.error ? "block" : "none";
+  $("error").textContent = state.error || "";
+  $("status").textContent = state.message || "";
+  if (names.length) show(state.changed.length ? state.changed[0] : Math.min(current, names.length - 1));
+}
+new EventSource("/events").onmessage = (e) => update(JSON.parse(e.data));
+</script></body></html>
+"""
+
+
+def rasterize(pdf, width=PREVIEW_WIDTH):
+    """PNG bytes of the first page of a PDF, `width` pixels wide."""
+    try:
+        import pymupdf
+    except ImportError:
+        raise SystemExit("--watch previews require PyMuPDF (pip install pymupdf)")
+    doc = pymupdf.open(stream=pdf, filetype="pdf")
+    try:
+        page = doc[0]
+        zoom = width / page.rect.width
+        return page.get_pixmap(matrix=pymupdf.Matrix(zoom, zoom), alpha=False).tobytes("png")
+    finally:
+        doc.close()
+
+
+def snapshot(paths):
+    """{file: (mtime_ns, size)} for the given files and the files under the given directories."""
+    state = {}
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                for name in files:
+                    full = os.path.join(root, name)
+                    st = os.stat(full)
+                    state[full] = (st.st_mtime_ns, st.st_size)
+        elif os.path.exists(path):
+            st = os.stat(path)
+            state[path] = (st.st_mtime_ns, st.st_size)
+    return state
+
+
+class Preview:
+    """Current slide pages, shared by the watch loop and the HTTP handlers."""
+
+    def __init__(self):
+        self.names = []
+        self.pages = []
+        self.pngs = []
+        self.version = 0
+        self.changed = []
+        self.error = None
+        self.message = ""
+        self._deck = None
+        self._cond = threading.Condition()
+
+    def update(self, names, pages, message=""):
+        """Replace the pages at the indexes in `pages` ({index: pdf}) and notify viewers."""
+        pngs = {i: rasterize(pdf) for i, pdf in pages.items()}
+        with self._cond:
+            if names != self.names:
+                self.names = list(names)
+                self.pages = [None] * len(names)
+                self.pngs = [None] * len(names)
+            for i, pdf in pages.items():
+                self.pages[i] = pdf
+                self.pngs[i] = pngs[i]
+            self.changed = sorted(pages)
+            self.error = None
+            self.message = message
+            self._deck = None
+            self.version += 1
+            self._cond.notify_all()
+
+    def fail(self, error):
+        """Keep the last good pages but show `error` to viewers."""
+        with self._cond:
+            self.changed = []
+            self.error = error
+            self.message = ""
+            self.version += 1
+            self._cond.notify_all()
+
+    def state(self):
+        return {"version": self.version, "names": self.names, "changed": self.changed,
+                "error": self.error, "message": self.message}
+
+    def wait(self, version, timeout):
+        """State once the version differs from `version`, or None after `timeout` seconds."""
+        with self._cond:
+            if self._cond.wait_for(lambda: self.version != version, timeout):
+                return self.state()
+            return None
+
+    def deck(self):
+        from .parallel import merge_pdfs
+
+        with self._cond:
+            if self._deck is None:
+                buf = io.BytesIO()
+                merge_pdfs([p for p in self.pages if p], buf)
+                self._deck = buf.getvalue()
+            return self._deck
+
+
+def _handler(preview):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _send(self, body, content_type):
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Cache-Control", "no-store")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _page(self, prefix, suffix):
+            """Index of /prefix/N.suffix with N in range, or None."""
+            number = self.path.split("?")[0][len(prefix):-len(suffix)]
+            if number.isdigit() and 1 <= int(number) <= len(preview.names) \
+                    and preview.pages[int(number) - 1] is not None:
+                return int(number) - 1
+            return None
+
+        def do_GET(self):
+            path = self.path.split("?")[0]
+            if path == "/":
+                self._send(PAGE.encode(), "text/html; charset=utf-8")
+            elif path == "/events":
+                self._events()
+            elif path.startswith("/page/") and path.endswith(".png") \
+                    and self._page("/page/", ".png") is not None:
+                self._send(preview.pngs[self._page("/page/", ".png")], "image/png")
+            elif path.startswith("/slide/") and path.endswith(".pdf") \
+                    and self._page("/slide/", ".pdf") is not None:
+                self._send(preview.pages[self._page("/slide/", ".pdf")], "application/pdf")
+            elif path == "/deck.pdf":
+                self._send(preview.deck(), "application/pdf")
+            else:
+                self.send_error(404)
+
+        def _events(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-store")
+            self.end_headers()
+            state, version = preview.state(), None
+            try:
+                while True:
+                    if state is None:
+                        self.wfile.write(b": keep-alive\n\n")
+                    else:
+                        version = state["version"]
+                        self.wfile.write(f"data: {json.dumps(state)}\n\n".encode())
+                    self.wfile.flush()
+                    state = preview.wait(version, KEEPALIVE)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+    return Handler
+
+
+def serve(preview, host, port):
+    """Start the preview server on a daemon thread; returns the server."""
+    server = ThreadingHTTPServer((host, port), _handler(preview))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,781 @@
+"""
+Database schema from the Supabase migrations.
+
+supabase/migrations/*.sql are applied in file-name (timestamp) order. Each
+file is parsed on its own into a list of operations with plain JSON values:
+
+    {"op": "create_table", "table": "vendors", "columns": [...], ...}
+    {"op": "add_column", "table": "profiles", "column": {...}}
+    {"op": "create_index", "name": "idx_invoices_status", "table": "invoices", ...}
+    {"op": "create_policy", "table": "invoices", "name": "...", "command": "SELECT", ...}
+
+and the operations are then applied in order to a Schema: tables with their
+columns, primary and foreign keys, checks, indexes, whether RLS is on, and
+policies. The parser covers the DDL migrations use (CREATE/ALTER/DROP TABLE,
+CREATE/DROP INDEX, CREATE/DROP POLICY, ENABLE ROW LEVEL SECURITY); anything
+else (extensions, functions, data) is skipped and listed.
+
+Parsed operations are cached on disk per file, keyed by the file's bytes
+and this module's source: adding a migration parses only the new file, and
+an edited one is parsed again. Applying the operations is cheap.
+"""
+
+import glob
+import hashlib
+import json
+import os
+import re
+from typing import NamedTuple, Optional
+
+# Words that end a column's type and start its constraints.
+_COLUMN_CONSTRAINTS = {"CONSTRAINT", "PRIMARY", "NOT", "NULL", "DEFAULT", "REFERENCES",
+                       "UNIQUE", "CHECK", "GENERATED", "COLLATE"}
+_TABLE_CONSTRAINTS = {"CONSTRAINT", "PRIMARY", "FOREIGN", "UNIQUE", "CHECK", "EXCLUDE"}
+_ACTIONS = ("CASCADE", "RESTRICT", "NO ACTION", "SET NULL", "SET DEFAULT")
+
+_TOKEN = re.compile(r"""
+    (?P<space>\s+|--[^\n]*|/\*.*?\*/)
+  | (?P<dollar>\$(?P<tag>[A-Za-z_]*)\$.*?\$(?P=tag)\$)
+  | (?P<string>[EeNn]?'(?:[^']|'')*')
+  | (?P<quoted>"(?:[^"]|"")*")
+  | (?P<number>\d+(?:\.\d+)?)
+  | (?P<word>[A-Za-z_][A-Za-z0-9_$]*)
+  | (?P<op>::|<>|<=|>=|!=|\|\||[(),.;=<>+\-*/\[\]:%])
+  | (?P<other>.)
+""", re.S | re.X)
+
+
+# Whitespace just inside parentheses, dropped when expressions are collapsed to one line.
+_PAREN_SPACE = re.compile(r"\(\s+|\s+\)")
+
+
+class SchemaError(ValueError):
+    pass
+
+
+class Column(NamedTuple):
+    name: str
+    type: str
+    nullable: bool = True
+    default: Optional[str] = None
+    unique: bool = False
+    check: Optional[str] = None
+
+
+class ForeignKey(NamedTuple):
+    columns: tuple
+    table: str                  # referenced table (schema-qualified outside public)
+    ref_columns: tuple
+    on_delete: Optional[str] = None
+
+
+class Index(NamedTuple):
+    name: str
+    table: str
+    columns: tuple              # column names or expressions, with DESC etc.
+    unique: bool = False
+    where: Optional[str] = None
+
+
+class Policy(NamedTuple):
+    name: str
+    table: str
+    command: str                # ALL, SELECT, INSERT, UPDATE or DELETE
+    roles: tuple = ()
+    using: Optional[str] = None
+    check: Optional[str] = None
+    permissive: bool = True
+
+
+class Table:
+    """A table as of the migrations applied so far."""
+
+    def __init__(self, name, created_in):
+        self.name = name
+        self.created_in = created_in
+        self.columns = {}           # name -> Column, in definition order
+        self.primary_key = ()
+        self.foreign_keys = []
+        self.checks = {}            # constraint name (or a generated one) -> expression
+        self.rls = False
+
+    def key_columns(self):
+        """Names of the columns in the primary key or a foreign key."""
+        return set(self.primary_key).union(*(fk.columns for fk in self.foreign_keys))
+
+
+class Schema:
+    def __init__(self):
+        self.tables = {}            # name -> Table, in creation order
+        self.indexes = {}           # name -> Index
+        self.policies = {}          # (table, name) -> Policy, tables outside public too
+        self.migrations = []        # (file name, operation count, was cached)
+        self.skipped = []           # (file name, line, statement head)
+
+    def table(self, name, where):
+        try:
+            return self.tables[name]
+        except KeyError:
+            raise SchemaError(f"{where}: no table {name!r}")
+
+    def policies_on(self, table):
+        return [p for (t, _), p in self.policies.items() if t == table]
+
+    def indexes_on(self, table):
+        return [ix for ix in self.indexes.values() if ix.table == table]
+
+    def referenced_tables(self):
+        """Tables referenced by a foreign key but not created here (auth.users)."""
+        seen = {}
+        for t in self.tables.values():
+            for fk in t.foreign_keys:
+                if fk.table not in self.tables:
+                    seen.setdefault(fk.table, None)
+        return list(seen)
+
+    def to_dict(self):
+        return {
+            "tables": {name: {
+                "created_in": t.created_in,
+                "columns": [c._asdict() for c in t.columns.values()],
+                "primary_key": list(t.primary_key),
+                "foreign_keys": [dict(fk._asdict(), columns=list(fk.columns),
+                                      ref_columns=list(fk.ref_columns)) for fk in t.foreign_keys],
+                "checks": t.checks,
+                "rls": t.rls,
+            } for name, t in self.tables.items()},
+            "indexes": [dict(ix._asdict(), columns=list(ix.columns))
+                        for ix in self.indexes.values()],
+            "policies": [dict(p._asdict(), roles=list(p.roles)) for p in self.policies.values()],
+            "migrations": [name for name, _, _ in self.migrations],
+            "skipped": [list(s) for s in self.skipped],
+        }
+
+
+# ─── Parsing ──────────────────────────────────────────────────
+
+class _Tokens:
+    """Tokens of one statement with the source they came from."""
+
+    def __init__(self, tokens, text, where):
+        self.tokens = tokens        # (kind, value, start, end), offsets into text
+        self.text = text
+        self.where = where          # file name
+        self.i = 0
+
+    def peek(self, offset=0):
+        i = self.i + offset
+        return self.tokens[i] if i < len(self.tokens) else ("end", "", len(self.text),
+                                                             len(self.text))
+
+    def word(self, offset=0):
+        kind, value, _, _ = self.peek(offset)
+        return value.upper() if kind == "word" else None
+
+    def at_end(self):
+        return self.i >= len(self.tokens)
+
+    def next(self):
+        token = self.peek()
+        self.i += 1
+        return token
+
+    def accept(self, *words):
+        """Consume the words if they come next (case-insensitive)."""
+        if all(self.word(k) == w for k, w in enumerate(words)):
+            self.i += len(words)
+            return True
+        return False
+
+    def expect(self, *words):
+        if not self.accept(*words):
+            self.fail(" ".join(words))
+
+    def accept_op(self, op):
+        if self.peek()[0] == "op" and self.peek()[1] == op:
+            self.i += 1
+            return True
+        return False
+
+    def expect_op(self, op):
+        if not self.accept_op(op):
+            self.fail(repr(op))
+
+    def fail(self, expected):
+        kind, value, start, _ = self.peek()
+        got = "end of statement" if kind == "end" else repr(value)
+        line = self.text.count("\n", 0, start) + 1
+        raise SchemaError(f"{self.where}:{line}: expected {expected}, got {got}")
+
+    def name(self):
+        """A possibly schema-qualified identifier; public. is dropped."""
+        parts = [self._ident()]
+        while self.accept_op("."):
+            parts.append(self._ident())
+        if len(parts) > 1 and parts[0] == "public":
+            parts = parts[1:]
+        return ".".join(parts)
+
+    def _ident(self):
+        kind, value, _, _ = self.peek()
+        if kind == "word":
+            self.i += 1
+            return value.lower()
+        if kind == "quoted":
+            self.i += 1
+            return value[1:-1].replace('""', '"')
+        self.fail("a name")
+
+    def string(self):
+        kind, value, _, _ = self.peek()
+        if kind == "string":
+            self.i += 1
+            return value[value.index("'") + 1:-1].replace("''", "'")
+        if kind == "quoted":
+            return self._ident()
+        self.fail("a string")
+
+    def span(self, start, end):
+        """Source text of tokens start..end-1 with whitespace collapsed."""
+        if start >= end:
+            return ""
+        text = " ".join(self.text[self.tokens[start][2]:self.tokens[end - 1][3]].split())
+        return _PAREN_SPACE.sub(lambda m: m.group().strip(), text)
+
+    def until(self, stop_words=(), stop_ops=(",",)):
+        """Index just past the tokens up to (not including) a stop word or op at depth 0."""
+        depth = 0
+        j = self.i
+        while j < len(self.tokens):
+            kind, value, _, _ = self.tokens[j]
+            if kind == "op" and value in "([":
+                depth += 1
+            elif kind == "op" and value in ")]":
+                if depth == 0:
+                    break
+                depth -= 1
+            elif depth == 0 and ((kind == "op" and value in stop_ops)
+                                 or (kind == "word" and value.upper() in stop_words)):
+                break
+            j += 1
+        return j
+
+    def take(self, stop_words=(), stop_ops=(",",)):
+        """Source text up to a stop word or op at depth 0, consumed."""
+        start, self.i = self.i, self.until(stop_words, stop_ops)
+        return self.span(start, self.i)
+
+    def parenthesized(self):
+        """Source text between a ( and its matching ), consumed."""
+        self.expect_op("(")
+        text = self.take(stop_ops=())
+        self.expect_op(")")
+        return text
+
+    def name_list(self):
+        self.expect_op("(")
+        names = [self.name()]
+        while self.accept_op(","):
+            names.append(self.name())
+        self.expect_op(")")
+        return tuple(names)
+
+
+def _statements(text, file_name):
+    """(_Tokens, line it starts on) per statement of an SQL file."""
+    tokens, line, pos = [], 1, 0
+    for m in _TOKEN.finditer(text):
+        kind = m.lastgroup
+        if kind == "space":
+            continue
+        if kind == "op" and m.group() == ";":
+            if tokens:
+                yield _Tokens(tokens, text, file_name), line
+            tokens = []
+            continue
+        if not tokens:
+            line += text.count("\n", pos, m.start())
+            pos = m.start()
+        tokens.append((kind, m.group(), m.start(), m.end()))
+    if tokens:
+        yield _Tokens(tokens, text, file_name), line
+
+
+def _column(t):
+    """A column definition: (column dict, foreign key dict or None, is primary key)."""
+    name = t.name()
+    col = {"name": name, "type": t.take(_COLUMN_CONSTRAINTS), "nullable": True,
+           "default": None, "unique": False, "check": None}
+    if not col["type"]:
+        t.fail(f"a type for column {name}")
+    fk, pk = None, False
+    while not t.at_end() and not (t.peek()[0] == "op" and t.peek()[1] in (",", ")")):
+        if t.accept("CONSTRAINT"):
+            t.name()
+        elif t.accept("PRIMARY", "KEY"):
+            pk = True
+            col["nullable"] = False
+        elif t.accept("NOT", "NULL"):
+            col["nullable"] = False
+        elif t.accept("NULL"):
+            pass
+        elif t.accept("DEFAULT"):
+            col["default"] = t.take(_COLUMN_CONSTRAINTS)
+        elif t.accept("UNIQUE"):
+            col["unique"] = True
+        elif t.accept("CHECK"):
+            col["check"] = t.parenthesized()
+        elif t.word() == "REFERENCES":
+            fk = _references(t, (name,))
+        elif t.accept("DEFERRABLE") or t.accept("NOT", "DEFERRABLE"):
+            pass
+        elif t.accept("INITIALLY"):
+            t.next()
+        elif t.accept("GENERATED") or t.accept("COLLATE"):
+            t.take(_COLUMN_CONSTRAINTS - {"GENERATED", "COLLATE"})
+        else:
+            t.fail("a column constraint")
+    return col, fk, pk
+
+
+def _action(t):
+    for action in _ACTIONS:
+        if t.accept(*action.split()):
+            return action
+    t.fail(" or ".join(_ACTIONS))
+
+
+def _references(t, columns):
+    t.expect("REFERENCES")
+    fk = {"columns": list(columns), "table": t.name(), "ref_columns": [], "on_delete": None}
+    if t.peek()[0] == "op" and t.peek()[1] == "(":
+        fk["ref_columns"] = list(t.name_list())
+    while True:
+        if t.accept("ON", "DELETE"):
+            fk["on_delete"] = _action(t)
+        elif t.accept("ON", "UPDATE"):
+            _action(t)
+        elif t.accept("MATCH"):
+            t.next()
+        else:
+            return fk
+
+
+def _table_constraint(t, table, line):
+    """Operation for a table constraint (CREATE TABLE element or ALTER TABLE ADD)."""
+    name = t.name() if t.accept("CONSTRAINT") else None
+    op = {"table": table, "name": name, "line": line}
+    if t.accept("PRIMARY", "KEY"):
+        return dict(op, op="primary_key", columns=list(t.name_list()))
+    if t.accept("FOREIGN", "KEY"):
+        return dict(op, op="foreign_key", fk=_references(t, t.name_list()))
+    if t.accept("UNIQUE"):
+        return dict(op, op="unique", columns=list(t.name_list()))
+    if t.accept("CHECK"):
+        return dict(op, op="check", expression=t.parenthesized())
+    t.fail("PRIMARY KEY, FOREIGN KEY, UNIQUE or CHECK")
+
+
+def _column_ops(t, table, line, op="create_column"):
+    col, fk, pk = _column(t)
+    ops = [{"op": op, "table": table, "column": col, "line": line}]
+    if pk:
+        ops.append({"op": "primary_key", "table": table, "name": None,
+                    "columns": [col["name"]], "line": line})
+    if fk:
+        ops.append({"op": "foreign_key", "table": table, "name": None, "fk": fk, "line": line})
+    return ops
+
+
+def _create_table(t, line):
+    t.accept("IF", "NOT", "EXISTS")
+    table = t.name()
+    ops = [{"op": "create_table", "table": table, "line": line}]
+    t.expect_op("(")
+    while True:
+        if t.word() in _TABLE_CONSTRAINTS:
+            ops.append(_table_constraint(t, table, line))
+        else:
+            ops.extend(_column_ops(t, table, line))
+        if not t.accept_op(","):
+            break
+    t.expect_op(")")
+    return ops
+
+
+def _alter_table(t, line):
+    t.accept("IF", "EXISTS")
+    t.accept("ONLY")
+    table = t.name()
+    ops = []
+    while True:
+        if t.accept("ADD"):
+            if t.word() in _TABLE_CONSTRAINTS:
+                ops.append(_table_constraint(t, table, line))
+            else:
+                t.accept("COLUMN")
+                t.accept("IF", "NOT", "EXISTS")
+                ops.extend(_column_ops(t, table, line, "add_column"))
+        elif t.accept("DROP", "CONSTRAINT"):
+            t.accept("IF", "EXISTS")
+            ops.append({"op": "drop_constraint", "table": table, "name": t.name(), "line": line})
+            t.accept("CASCADE") or t.accept("RESTRICT")
+        elif t.accept("DROP"):
+            t.accept("COLUMN")
+            t.accept("IF", "EXISTS")
+            ops.append({"op": "drop_column", "table": table, "column": t.name(), "line": line})
+            t.accept("CASCADE") or t.accept("RESTRICT")
+        elif t.accept("ENABLE", "ROW", "LEVEL", "SECURITY") or t.accept("FORCE", "ROW", "LEVEL",
+                                                                          "SECURITY"):
+            ops.append({"op": "rls", "table": table, "enabled": True, "line": line})
+        elif t.accept("DISABLE", "ROW", "LEVEL", "SECURITY"):
+            ops.append({"op": "rls", "table": table, "enabled": False, "line": line})
+        elif t.accept("RENAME", "TO"):
+            ops.append({"op": "rename_table", "table": table, "to": t.name(), "line": line})
+        elif t.accept("RENAME"):
+            t.accept("COLUMN")
+            old = t.name()
+            t.expect("TO")
+            ops.append({"op": "rename_column", "table": table, "column": old, "to": t.name(),
+                        "line": line})
+        elif t.accept("ALTER"):
+            t.accept("COLUMN")
+            ops.append(_alter_column(t, table, t.name(), line))
+        else:
+            t.fail("ADD, DROP, ALTER, RENAME or ENABLE ROW LEVEL SECURITY")
+        if not t.accept_op(","):
+            return ops
+
+
+def _alter_column(t, table, column, line):
+    op = {"op": "alter_column", "table": table, "column": column, "line": line}
+    if t.accept("SET", "NOT", "NULL"):
+        return dict(op, nullable=False)
+    if t.accept("DROP", "NOT", "NULL"):
+        return dict(op, nullable=True)
+    if t.accept("SET", "DEFAULT"):
+        return dict(op, default=t.take())
+    if t.accept("DROP", "DEFAULT"):
+        return dict(op, default=None)
+    if t.accept("SET", "DATA", "TYPE") or t.accept("TYPE"):
+        op["type"] = t.take({"USING", "COLLATE"})
+        t.take()                # USING conversion, COLLATE
+        return op
+    t.fail("SET/DROP NOT NULL, SET/DROP DEFAULT or TYPE")
+
+
+def _create_index(t, line, unique):
+    t.accept("CONCURRENTLY")
+    t.accept("IF", "NOT", "EXISTS")
+    name = None if t.word() == "ON" else t.name()
+    t.expect("ON")
+    t.accept("ONLY")
+    table = t.name()
+    if t.accept("USING"):
+        t.name()
+    t.expect_op("(")
+    columns = [t.take()]
+    while t.accept_op(","):
+        columns.append(t.take())
+    t.expect_op(")")
+    where = None
+    while not t.at_end():
+        if t.accept("WHERE"):
+            where = t.take(stop_ops=())
+        else:
+            t.next()            # INCLUDE (...), WITH (...), TABLESPACE
+    name = name or f"{table.split('.')[-1]}_{'_'.join(columns)}_idx"
+    return [{"op": "create_index", "name": name, "table": table, "columns": columns,
+             "unique": unique, "where": where, "line": line}]
+
+
+def _create_policy(t, line):
+    name = t.string() if t.peek()[0] == "string" else t.name()
+    t.expect("ON")
+    op = {"op": "create_policy", "name": name, "table": t.name(), "command": "ALL",
+          "roles": [], "using": None, "check": None, "permissive": True, "line": line}
+    if t.accept("AS"):
+        op["permissive"] = not t.accept("RESTRICTIVE")
+        t.accept("PERMISSIVE")
+    if t.accept("FOR"):
+        op["command"] = t.next()[1].upper()
+    if t.accept("TO"):
+        op["roles"] = [t.name()]
+        while t.accept_op(","):
+            op["roles"].append(t.name())
+    if t.accept("USING"):
+        op["using"] = t.parenthesized()
+    if t.accept("WITH", "CHECK"):
+        op["check"] = t.parenthesized()
+    if not t.at_end():
+        t.fail("USING or WITH CHECK")
+    return [op]
+
+
+def _drop(t, line):
+    if t.accept("POLICY"):
+        t.accept("IF", "EXISTS")
+        name = t.string() if t.peek()[0] == "string" else t.name()
+        t.expect("ON")
+        return [{"op": "drop_policy", "name": name, "table": t.name(), "line": line}]
+    kind = "drop_table" if t.accept("TABLE") else "drop_index" if t.accept("INDEX") else None
+    if kind is None:
+        return None
+    t.accept("CONCURRENTLY")
+    t.accept("IF", "EXISTS")
+    names = [t.name()]
+    while t.accept_op(","):
+        names.append(t.name())
+    return [{"op": kind, "name": n, "line": line} for n in names]
+
+
+def _statement(t, line):
+    """Operations for one statement, or None for one this parser skips."""
+    if t.accept("CREATE"):
+        t.accept("OR", "REPLACE")
+        if t.accept("TABLE"):
+            return _create_table(t, line)
+        if t.accept("UNIQUE", "INDEX"):
+            return _create_index(t, line, True)
+        if t.accept("INDEX"):
+            return _create_index(t, line, False)
+        if t.accept("POLICY"):
+            return _create_policy(t, line)
+        return None
+    if t.accept("ALTER", "TABLE"):
+        return _alter_table(t, line)
+    if t.accept("DROP"):
+        return _drop(t, line)
+    return None
+
+
+def parse(text, file_name="<sql>"):
+    """Operations of one migration's SQL, in order (see the module docstring)."""
+    ops = []
+    for t, line in _statements(text, file_name):
+        result = _statement(t, line)
+        if result is None:
+            ops.append({"op": "skip", "line": line,
+                        "statement": t.span(0, min(len(t.tokens), 6))})
+        else:
+            if not t.at_end():
+                t.fail("end of statement")
+            ops.extend(result)
+    return ops
+
+
+# ─── Applying ─────────────────────────────────────────────────
+
+def _check_name(table, name, checks):
+    return name or f"{table.name}_check{len(checks) + 1}"
+
+
+def _rename_in(expr, old, new):
+    """expr with column `old` renamed to `new`.
+
+    Qualified names, string literals and subqueries (whose names belong to
+    other tables) are left alone.
+    """
+    if not expr:
+        return expr
+    tokens = [m for m in _TOKEN.finditer(expr) if m.lastgroup != "space"]
+    out, pos, subqueries = [], 0, []
+    for i, m in enumerate(tokens):
+        kind, text = m.lastgroup, m.group()
+        if kind == "op" and text == "(":
+            subqueries.append(i + 1 < len(tokens) and tokens[i + 1].group().upper() == "SELECT")
+        elif kind == "op" and text == ")" and subqueries:
+            subqueries.pop()
+        elif kind in ("word", "quoted") and not any(subqueries) \
+                and not (i and tokens[i - 1].group() == "."):
+            name = text.lower() if kind == "word" else text[1:-1].replace('""', '"')
+            if name == old:
+                out.append(expr[pos:m.start()])
+                out.append(new if re.fullmatch(r"[a-z_][a-z0-9_$]*", new)
+                           else '"' + new.replace('"', '""') + '"')
+                pos = m.end()
+    return "".join(out) + expr[pos:]
+
+
+def _rename_column(schema, table, old, new, where):
+    """Rename a column and every key, index, check and policy naming it."""
+    if old not in table.columns:
+        raise SchemaError(f"{where}: no column {table.name}.{old}")
+    if new in table.columns:
+        raise SchemaError(f"{where}: column {table.name}.{new} already exists")
+
+    def names(cols):
+        return tuple(new if c == old else c for c in cols)
+
+    columns, table.columns = table.columns, {}
+    for name, col in columns.items():
+        col = col._replace(check=_rename_in(col.check, old, new))
+        if name == old:
+            name, col = new, col._replace(name=new)
+        table.columns[name] = col
+    table.primary_key = names(table.primary_key)
+    table.checks = {k: _rename_in(v, old, new) for k, v in table.checks.items()}
+    table.foreign_keys = [fk._replace(columns=names(fk.columns)) for fk in table.foreign_keys]
+    for other in schema.tables.values():
+        other.foreign_keys = [fk._replace(ref_columns=names(fk.ref_columns))
+                              if fk.table == table.name else fk for fk in other.foreign_keys]
+    for name, ix in schema.indexes.items():
+        if ix.table == table.name:
+            schema.indexes[name] = ix._replace(
+                columns=tuple(_rename_in(c, old, new) for c in ix.columns),
+                where=_rename_in(ix.where, old, new))
+    for key, policy in schema.policies.items():
+        if policy.table == table.name:
+            schema.policies[key] = policy._replace(using=_rename_in(policy.using, old, new),
+                                                   check=_rename_in(policy.check, old, new))
+
+
+def _rename_table(schema, old, new, where):
+    """Rename a table and every foreign key, index and policy naming it."""
+    table = schema.table(old, where)
+    if new in schema.tables:
+        raise SchemaError(f"{where}: table {new!r} already exists")
+    table.name = new
+    schema.tables = {(new if name == old else name): t for name, t in schema.tables.items()}
+    for t in schema.tables.values():
+        t.foreign_keys = [fk._replace(table=new) if fk.table == old else fk
+                          for fk in t.foreign_keys]
+    schema.indexes = {name: ix._replace(table=new) if ix.table == old else ix
+                      for name, ix in schema.indexes.items()}
+    schema.policies = {((new, name) if t == old else (t, name)):
+                       p._replace(table=new) if t == old else p
+                       for (t, name), p in schema.policies.items()}
+
+
+def apply(schema, file_name, ops):
+    """Apply one migration's operations to schema."""
+    for op in ops:
+        where = f"{file_name}:{op['line']}"
+        kind = op["op"]
+        if kind == "skip":
+            schema.skipped.append((file_name, op["line"], op["statement"]))
+        elif kind == "create_table":
+            if op["table"] in schema.tables:
+                raise SchemaError(f"{where}: table {op['table']!r} already exists")
+            schema.tables[op["table"]] = Table(op["table"], file_name)
+        elif kind in ("create_column", "add_column"):
+            table = schema.table(op["table"], where)
+            col = Column(**op["column"])
+            if col.name in table.columns:
+                raise SchemaError(f"{where}: column {table.name}.{col.name} already exists")
+            table.columns[col.name] = col
+        elif kind == "drop_column":
+            table = schema.table(op["table"], where)
+            if table.columns.pop(op["column"], None) is None:
+                raise SchemaError(f"{where}: no column {table.name}.{op['column']}")
+            table.foreign_keys = [fk for fk in table.foreign_keys
+                                  if op["column"] not in fk.columns]
+        elif kind == "alter_column":
+            table = schema.table(op["table"], where)
+            col = table.columns.get(op["column"])
+            if col is None:
+                raise SchemaError(f"{where}: no column {table.name}.{op['column']}")
+            changes = {k: op[k] for k in ("nullable", "default", "type") if k in op}
+            table.columns[col.name] = col._replace(**changes)
+        elif kind == "rename_column":
+            _rename_column(schema, schema.table(op["table"], where), op["column"], op["to"],
+                           where)
+        elif kind == "rename_table":
+            _rename_table(schema, op["table"], op["to"], where)
+        elif kind == "primary_key":
+            table = schema.table(op["table"], where)
+            table.primary_key = tuple(op["columns"])
+            for name in op["columns"]:
+                if name in table.columns:
+                    table.columns[name] = table.columns[name]._replace(nullable=False)
+        elif kind == "foreign_key":
+            table = schema.table(op["table"], where)
+            fk = op["fk"]
+            ref = fk["ref_columns"] or (
+                schema.tables[fk["table"]].primary_key if fk["table"] in schema.tables
+                else ("id",))
+            table.foreign_keys.append(ForeignKey(tuple(fk["columns"]), fk["table"], tuple(ref),
+                                                 fk["on_delete"]))
+        elif kind == "unique":
+            table = schema.table(op["table"], where)
+            if len(op["columns"]) == 1 and op["columns"][0] in table.columns:
+                name = op["columns"][0]
+                table.columns[name] = table.columns[name]._replace(unique=True)
+            else:
+                name = op["name"] or f"{table.name}_{'_'.join(op['columns'])}_key"
+                schema.indexes[name] = Index(name, table.name, tuple(op["columns"]), True)
+        elif kind == "check":
+            table = schema.table(op["table"], where)
+            table.checks[_check_name(table, op["name"], table.checks)] = op["expression"]
+        elif kind == "drop_constraint":
+            table = schema.table(op["table"], where)
+            table.checks.pop(op["name"], None)
+            schema.indexes.pop(op["name"], None)
+        elif kind == "rls":
+            schema.table(op["table"], where).rls = op["enabled"]
+        elif kind == "create_index":
+            schema.indexes[op["name"]] = Index(op["name"], op["table"], tuple(op["columns"]),
+                                               op["unique"], op["where"])
+        elif kind == "drop_index":
+            schema.indexes.pop(op["name"], None)
+        elif kind == "create_policy":
+            schema.policies[(op["table"], op["name"])] = Policy(
+                op["name"], op["table"], op["command"], tuple(op["roles"]), op["using"],
+                op["check"], op["permissive"])
+        elif kind == "drop_policy":
+            schema.policies.pop((op["table"], op["name"]), None)
+        elif kind == "drop_table":
+            schema.tables.pop(op["name"], None)
+            schema.indexes = {k: v for k, v in schema.indexes.items() if v.table != op["name"]}
+            schema.policies = {k: v for k, v in schema.policies.items() if k[0] != op["name"]}
+        else:
+            raise SchemaError(f"{where}: unknown operation {kind!r}")
+
+
+# ─── Loading ──────────────────────────────────────────────────
+
+def migration_files(directory):
+    """Migration files in the order Supabase applies them."""
+    return sorted(glob.glob(os.path.join(directory, "*.sql")), key=os.path.basename)
+
+
+def _parser_digest():
+    """Digest of this module's source: a change to the parser invalidates the cache."""
+    with open(__file__, "rb") as f:
+        return hashlib.sha256(f.read()).digest()
+
+
+def cached_parse(path, cache_dir=None, _parser=None):
+    """(operations, whether they came from the cache) for the migration at path."""
+    with open(path, "rb") as f:
+        data = f.read()
+    name = os.path.basename(path)
+    if cache_dir is None:
+        return parse(data.decode("utf-8-sig"), name), False
+    parser = _parser if _parser is not None else _parser_digest()
+    key = hashlib.sha256(parser + name.encode() + b"\0" + data).hexdigest()[:32]
+    cache_path = os.path.join(cache_dir, key + ".json")
+    try:
+        with open(cache_path, encoding="utf-8") as f:
+            return json.load(f), True
+    except (OSError, ValueError):
+        pass
+    ops = parse(data.decode("utf-8-sig"), name)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = f"{cache_path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(ops, f, ensure_ascii=False)
+    os.replace(tmp, cache_path)
+    return ops, False
+
+
+def load(directory, cache_dir=None):
+    """Schema after every migration in directory, parsing only files not in cache_dir."""
+    schema = Schema()
+    parser = _parser_digest()
+    for path in migration_files(directory):
+        ops, cached = cached_parse(path, cache_dir, parser)
+        name = os.path.basename(path)
+        apply(schema, name, ops)
+        schema.migrations.append((name, len(ops), cached))
+    return schema
@@ -0,0 +1,314 @@
+"""
+Local render service: an asyncio HTTP front end over a process pool.
+
+    POST /render      JSON job; responds with the PDF (X-Cache: hit, shared or miss)
+    GET  /metrics     queue depth, cache hit rate, p50/p95 latency and job counts (JSON)
+    GET  /healthz     "ok"
+
+Jobs run on a bounded pool of worker processes. At most `jobs` render at a
+time and at most `queue` more wait for a worker; beyond that a request is
+turned away with 503 and Retry-After instead of piling up. A job gets
+`timeout` seconds: a timer in the worker interrupts the render, and the
+request is answered with 504 at the latest `GRACE` seconds later.
+
+Results are kept in an LRU cache bounded in entries and bytes, keyed by the
+SHA-256 of the normalized job. Identical jobs arriving while one renders
+share that render. The service binds to localhost and never reaches out.
+"""
+
+import asyncio
+import collections
+import hashlib
+import json
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http import HTTPStatus
+
+CACHE_ENTRIES = 256
+CACHE_BYTES = 256 * 2**20
+# Requests whose latency the percentiles are computed over.
+LATENCY_WINDOW = 1000
+# Extra seconds the front end waits after a job's timeout for the worker's
+# own timer to interrupt it (a long call in C only yields afterwards).
+GRACE = 5.0
+MAX_BODY = 32 * 2**20
+READ_TIMEOUT = 30.0
+
+
+class JobError(Exception):
+    """A job the client got wrong (answered with 400)."""
+
+
+class JobTimeout(Exception):
+    pass
+
+
+def _alarm(signum, frame):
+    raise JobTimeout()
+
+
+def run_job(render, job, timeout):
+    """Worker side: render(job) under a `timeout`-second interval timer."""
+    previous = signal.signal(signal.SIGALRM, _alarm)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return render(job)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def job_key(job):
+    return hashlib.sha256(json.dumps(job, sort_keys=True, ensure_ascii=False,
+                                     separators=(",", ":")).encode()).hexdigest()
+
+
+class ResultCache:
+    """LRU of bytes bounded by entry count and total size."""
+
+    def __init__(self, max_entries=CACHE_ENTRIES, max_bytes=CACHE_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._items = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, key):
+        data = self._items.get(key)
+        if data is not None:
+            self._items.move_to_end(key)
+        return data
+
+    def put(self, key, data):
+        if len(data) > self.max_bytes:
+            return
+        if key in self._items:
+            self.bytes -= len(self._items.pop(key))
+        self._items[key] = data
+        self.bytes += len(data)
+        while len(self._items) > self.max_entries or self.bytes > self.max_bytes:
+            _, old = self._items.popitem(last=False)
+            self.bytes -= len(old)
+
+
+def percentile(values, q):
+    """Nearest-rank q-th percentile of values (None when empty)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, round(q / 100 * len(ordered)) - 1))]
+
+
+class RenderService:
+    """Bounded pool, result cache and metrics behind the HTTP handlers.
+
+    prepare(payload) validates a request body (parsed JSON) and returns the
+    normalized job, raising JobError for a bad one; render(job) runs in a
+    worker process and returns the PDF bytes. Both must be module-level
+    functions so the pool can pickle them.
+    """
+
+    def __init__(self, prepare, render, jobs=1, queue=8, timeout=60.0, cache=None,
+                 initializer=None, initargs=()):
+        self.prepare = prepare
+        self.render = render
+        self.jobs = jobs
+        self.queue = queue
+        self.timeout = timeout
+        self.cache = cache if cache is not None else ResultCache()
+        self._pool_args = {"max_workers": jobs, "initializer": initializer, "initargs": initargs}
+        self.pool = ProcessPoolExecutor(**self._pool_args)
+        self._slots = asyncio.Semaphore(jobs)
+        self._inflight = {}
+        self.pending = 0
+        self.running = 0
+        self.latencies = collections.deque(maxlen=LATENCY_WINDOW)
+        self.counts = collections.Counter()
+        self.started = time.monotonic()
+
+    async def _render(self, job):
+        # pending was counted when the job was admitted.
+        try:
+            await self._slots.acquire()
+        finally:
+            self.pending -= 1
+        self.running += 1
+        pool = self.pool
+        future = asyncio.get_running_loop().run_in_executor(
+            pool, run_job, self.render, job, self.timeout)
+
+        def done(_):
+            # The worker is only free once the job has really stopped, even
+            # if the request was already answered with a timeout.
+            self.running -= 1
+            self._slots.release()
+        future.add_done_callback(done)
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), self.timeout + GRACE)
+        except asyncio.TimeoutError:
+            raise JobTimeout()
+        except BrokenProcessPool:
+            # A worker died (killed, out of memory); later jobs get a fresh pool.
+            # Every job on the broken pool ends up here: only the first replaces it.
+            if self.pool is pool:
+                pool.shutdown(wait=False, cancel_futures=True)
+                self.pool = ProcessPoolExecutor(**self._pool_args)
+            raise
+
+    async def submit(self, payload):
+        """(PDF bytes, cache status, job key) for a request body; raises
+        JobError, JobTimeout or OverflowError (queue full)."""
+        job = self.prepare(payload)
+        key = job_key(job)
+        data = self.cache.get(key)
+        if data is not None:
+            self.counts["hits"] += 1
+            return data, "hit", key
+        shared = self._inflight.get(key)
+        if shared is not None:
+            self.counts["shared"] += 1
+            return await asyncio.shield(shared), "shared", key
+        if self.running + self.pending >= self.jobs + self.queue:
+            self.counts["rejected"] += 1
+            raise OverflowError("render queue is full")
+        self.counts["misses"] += 1
+        self.pending += 1
+        task = asyncio.ensure_future(self._render(job))
+        self._inflight[key] = task
+        try:
+            data = await asyncio.shield(task)
+        finally:
+            self._inflight.pop(key, None)
+        self.cache.put(key, data)
+        return data, "miss", key
+
+    def metrics(self):
+        lookups = self.counts["hits"] + self.counts["shared"] + self.counts["misses"]
+        window = list(self.latencies)
+        return {
+            "uptime_s": round(time.monotonic() - self.started, 1),
+            "workers": self.jobs,
+            "running": self.running,
+            "queue_depth": self.pending,
+            "queue_limit": self.queue,
+            "cache": {
+                "entries": len(self.cache), "bytes": self.cache.bytes,
+                "hits": self.counts["hits"], "shared": self.counts["shared"],
+                "misses": self.counts["misses"],
+                "hit_rate": (self.counts["hits"] + self.counts["shared"]) / lookups
+                if lookups else None,
+            },
+            "latency_s": {"count": len(window), "p50": percentile(window, 50),
+                          "p95": percentile(window, 95)},
+            "jobs": {name: self.counts[name]
+                     for name in ("completed", "failed", "timeouts", "rejected", "bad_requests")},
+        }
+
+    def close(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+# ─── HTTP ─────────────────────────────────────────────────────
+
+def _response(status, body, content_type, headers=()):
+    status = HTTPStatus(status)
+    head = [f"HTTP/1.1 {status.value} {status.phrase}",
+            f"Content-Type: {content_type}",
+            f"Content-Length: {len(body)}",
+            "Cache-Control: no-store",
+            "Connection: close"]
+    head.extend(f"{k}: {v}" for k, v in headers)
+    return ("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body
+
+
+def _json(status, obj, headers=()):
+    return _response(status, json.dumps(obj, ensure_ascii=False).encode(),
+                     "application/json; charset=utf-8", headers)
+
+
+async def _read_request(reader):
+    """(method, path, body) of one HTTP/1.1 request."""
+    line = await reader.readline()
+    method, target, _ = line.decode("latin-1").split(None, 2)
+    headers = {}
+    while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length") or 0)
+    if length > MAX_BODY:
+        raise JobError(f"request body over {MAX_BODY:,} bytes")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), target.split("?")[0], body
+
+
+async def _handle_render(service, body):
+    t0 = time.perf_counter()
+    try:
+        try:
+            payload = json.loads(body or b"{}")
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            raise JobError(f"body is not JSON: {e}")
+        data, status, key = await service.submit(payload)
+    except JobError as e:
+        service.counts["bad_requests"] += 1
+        return _json(400, {"error": str(e)})
+    except OverflowError as e:
+        return _json(503, {"error": str(e)}, [("Retry-After", "1")])
+    except JobTimeout:
+        service.counts["timeouts"] += 1
+        return _json(504, {"error": f"render exceeded {service.timeout:g}s"})
+    except Exception as e:
+        service.counts["failed"] += 1
+        return _json(500, {"error": f"{type(e).__name__}: {e}"})
+    elapsed = time.perf_counter() - t0
+    service.latencies.append(elapsed)
+    service.counts["completed"] += 1
+    return _response(200, data, "application/pdf",
+                     [("X-Cache", status), ("X-Job-Key", key),
+                      ("X-Render-Seconds", f"{elapsed:.3f}")])
+
+
+def _handler(service):
+    async def handle(reader, writer):
+        try:
+            try:
+                method, path, body = await asyncio.wait_for(_read_request(reader), READ_TIMEOUT)
+            except JobError as e:
+                response = _json(413, {"error": str(e)})
+            except (ValueError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+                response = _json(400, {"error": "malformed request"})
+            else:
+                if path == "/render" and method == "POST":
+                    response = await _handle_render(service, body)
+                elif path == "/metrics" and method == "GET":
+                    response = _json(200, service.metrics())
+                elif path == "/healthz" and method == "GET":
+                    response = _response(200, b"ok\n", "text/plain; charset=utf-8")
+                elif path in ("/render", "/metrics", "/healthz"):
+                    response = _json(405, {"error": f"{method} not allowed on {path}"})
+                else:
+                    response = _json(404, {"error": f"no such endpoint: {path}"})
+            writer.write(response)
+            await writer.drain()
+        except (ConnectionResetError, BrokenPipeError):
+            pass
+        finally:
+            writer.close()
+
+    return handle
+
+
+async def serve(service, host, port, ready=None):
+    """Serve until cancelled; ready(host, port) is called once listening."""
+    server = await asyncio.start_server(_handler(service), host, port)
+    if ready:
+        ready(*server.sockets[0].getsockname()[:2])
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
@@ -0,0 +1,154 @@
+"""
+Streaming PDF output.
+
+ReportLab keeps every page and its content stream in the document until
+canvas.save() formats the whole file at once, so memory grows with page
+count and the output only exists at the very end. A streaming canvas writes
+each object as soon as the page that created it is finished and then
+forgets the page, so memory stays flat however many pages are drawn. The
+target is written strictly in order and never seeked: a file, stdout, a
+socket or a BytesIO all work.
+
+Objects that keep changing until the end are held back and written by
+save(): the shared font dictionary, a shared ExtGState dictionary
+(StateCachingCanvas), the page tree, catalog, info and subsetted TrueType
+fonts. The cross-reference table is written from the offsets recorded as
+objects went out.
+"""
+
+from functools import lru_cache
+
+from reportlab.pdfbase import pdfdoc
+
+# Stands in for objects already written, so later Reference() calls by name
+# still resolve without keeping the object alive.
+_WRITTEN = pdfdoc.PDFObject()
+
+
+class _WrittenPage(pdfdoc.PDFObject):
+    """Page tree entry for a page already written to the stream."""
+
+    def __init__(self, name):
+        self.__InternalName__ = name
+
+
+class StreamingMixin:
+    """Canvas mixin writing finished pages to its target at every showPage()."""
+
+    def __init__(self, target, *args, **kwargs):
+        stream = open(target, "wb") if isinstance(target, str) else target
+        super().__init__(stream, *args, **kwargs)
+        self._begin(stream, owns=isinstance(target, str))
+
+    def _begin(self, stream, owns):
+        self._owns_stream = owns
+        self._stream = stream
+        self._offsets = {}      # object number -> byte offset in the stream
+        self._held = set()      # object numbers deferred to save()
+        self._next = 1          # lowest object number not yet considered
+        self._pages_done = 0
+        self.bytes_written = 0
+        # Number the page tree up front so it is recognized and held back.
+        self._doc.Reference(self._doc.Pages)
+        # The header goes out before any page is drawn, so it cannot wait for
+        # the first setFillAlpha() to raise the version: claim transparency
+        # (PDF 1.4) up front, as a buffered save() of the same pages would.
+        self._doc.ensureMinPdfVersion("transparency")
+        self._emit(pdfdoc.PDFFile(self._doc._pdfVersion).format(self._doc))
+
+    def _emit(self, data):
+        self._stream.write(data)
+        self.bytes_written += len(data)
+
+    def _deferred(self):
+        doc = self._doc
+        names = {"BasicFonts", doc.Pages.__InternalName__}
+        gstate = self.__dict__.get("_gstate_ref")
+        if gstate is not None:
+            names.add(gstate.name)
+        return names
+
+    def _write(self, number):
+        doc = self._doc
+        name = doc.numberToId[number]
+        data = pdfdoc.PDFIndirectObject(name, doc.idToObject[name]).format(doc)
+        self._offsets[number] = self.bytes_written
+        self._emit(data)
+        # Images are looked up by name to be reused on later pages; keep them.
+        if not name.startswith("FormXob."):
+            doc.idToObject[name] = _WRITTEN
+
+    def _flush(self, final=False):
+        """Write every registered object that can no longer change."""
+        doc = self._doc
+        deferred = set() if final else self._deferred()
+        while True:
+            # Formatting an object may register new ones (a page's content stream).
+            while self._next <= doc.objectcounter:
+                if doc.numberToId[self._next] in deferred:
+                    self._held.add(self._next)
+                else:
+                    self._write(self._next)
+                self._next += 1
+            if not (final and self._held):
+                break
+            for number in sorted(self._held):
+                self._write(number)
+            self._held.clear()
+        pages = doc.Pages.pages
+        for i in range(self._pages_done, len(pages)):
+            pages[i] = _WrittenPage(pages[i].__InternalName__)
+        self._pages_done = len(pages)
+
+    def showPage(self):
+        super().showPage()
+        self._flush()
+
+    def save(self):
+        """Write the remaining objects, cross-reference table and trailer."""
+        if len(self._code):
+            self.showPage()
+        doc = self._doc
+        doc.encrypt.prepare(doc)
+        for font in doc.delayedFonts:
+            font.addObjects(doc)
+        doc.info.invariant = doc.invariant
+        doc.info.digest(doc.signature)
+        doc.Reference(doc.Catalog)
+        doc.Reference(doc.info)
+        doc.Outlines.prepare(doc, self)
+        if doc.Outlines.ready < 0:
+            doc.Catalog.Outlines = None
+        self._flush(final=True)
+
+        count = doc.objectcounter
+        xref_offset = self.bytes_written
+        self._emit(b"".join(
+            [f"xref\n0 {count + 1}\n0000000000 65535 f \n".encode()]
+            + [f"{self._offsets[n]:010d} 00000 n \n".encode() for n in range(1, count + 1)]))
+        self._emit(pdfdoc.PDFTrailer(
+            startxref=xref_offset, Size=count + 1, Root=doc.Reference(doc.Catalog),
+            Info=doc.Reference(doc.info), ID=doc.ID()).format(doc))
+        if self._owns_stream:
+            self._stream.close()
+        else:
+            self._stream.flush()
+
+
+def stream_from_here(c):
+    """Switch a buffered canvas to streaming mid-document.
+
+    The pages finished so far are written to its target (path or file
+    object) right away and dropped; later pages go out as they are finished.
+    """
+    target = c._filename
+    c.__class__ = canvas_class(type(c))
+    c._begin(open(target, "wb") if isinstance(target, str) else target,
+             owns=isinstance(target, str))
+    c._flush()
+
+
+@lru_cache(maxsize=None)
+def canvas_class(base):
+    """Streaming subclass of the canvas class `base`."""
+    return type(f"Streaming{base.__name__}", (StreamingMixin, base), {})
@@ -0,0 +1,226 @@
+"""
+Tables: column specs, a style, and a layout that pages through any number of rows.
+
+A table is a gradient header row over rows of one fixed height, with
+optional zebra fills, a tinted highlight column, a leading column of
+per-row dots, and a rule under the last row or a full grid. Columns carry
+their width, alignment, a color role (looked up in the style) and how text
+that is too wide is handled:
+
+    shrink    textlayout.place(): shrunk down to min_scale, reported if it
+              still does not fit (the deck's short, designed copy)
+    ellipsis  cut with "…" (lists, where a name may be any length)
+
+Cell text is fitted once per distinct (text, font, size, width): both fits
+are memoized in bounded LRU caches, so repeated values (vendors, dates,
+statuses) are measured once and unique ones cost one measurement each.
+
+Table.pages() takes rows from any iterable, fills a page with as many as
+fit, repeats the header on the next page and so on: one pass, holding one
+page of rows at a time. Layout time grows linearly with the rows, and with
+a streaming canvas memory does not grow with them at all.
+"""
+
+import itertools
+from functools import lru_cache
+from typing import NamedTuple
+
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+from . import gradients, textlayout
+
+CLIP_CACHE_SIZE = 4096
+# Text is fitted to the column width less CELL_PAD; right-aligned text ends
+# RIGHT_INSET before the column's right edge.
+CELL_PAD = 12
+RIGHT_INSET = 8
+
+
+class Column(NamedTuple):
+    title: str
+    width: float
+    align: str = "left"         # left, center or right (header and cells)
+    role: str = "body"          # text color, from TableStyle.colors
+    overflow: str = "shrink"    # shrink or ellipsis
+
+
+class TableStyle(NamedTuple):
+    header: tuple               # header gradient colors, left to right
+    header_text: object
+    header_size: float
+    header_h: float
+    size: float
+    row_h: float
+    colors: dict                # role -> text color
+    # Baselines sit this far below the middle of the header and of a row.
+    header_drop: float = 4
+    drop: float = 3
+    zebra: object = None        # fill of the 1st, 3rd, … row on each page
+    zebra_odd: object = None    # fill of the 2nd, 4th, …
+    # (column index, tint over the column, tint over zebra rows)
+    highlight: tuple = None
+    rule: object = None         # color of the lines: under the last row, or the grid
+    rule_w: float = 0.5
+    grid: bool = False          # a line under every row and between columns
+    dot_w: float = 0            # leading column of per-row dots (0: none)
+    dot_r: float = 4
+
+
+@lru_cache(maxsize=CLIP_CACHE_SIZE)
+def clip(text, font, size, width):
+    """text shortened with an ellipsis to fit width at size."""
+    # No glyph is wider than 1em, so short strings need no measuring. Not via
+    # textlayout.measure: list cells are mostly unique and would flush it.
+    if len(text) * size <= width or stringWidth(text, font, size) <= width:
+        return text
+    lo, hi = 0, len(text)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if stringWidth(text[:mid] + "…", font, size) <= width:
+            lo = mid
+        else:
+            hi = mid - 1
+    return text[:lo] + "…"
+
+
+class Table:
+    """Columns and a style bound to a font; draws pages of rows.
+
+    Rows are (cells, dot) pairs: cells one per column, dot a color or None
+    (drawn when the style has a dot column). A cell that is not a string is
+    drawn by draw_cell(c, cell, x, y, w, h, align, size), y being the middle
+    of the row.
+    """
+
+    def __init__(self, columns, style, font, gradient_mode=gradients.SHADING,
+                 min_scale=1.0, draw_cell=None):
+        self.columns = list(columns)
+        self.style = style
+        self.font = font
+        self.gradient_mode = gradient_mode
+        self.min_scale = min_scale
+        self.draw_cell = draw_cell
+        self.width = style.dot_w + sum(col.width for col in self.columns)
+
+    def rows_per_page(self, top, bottom):
+        """Rows that fit between a header at top and bottom (at least one)."""
+        return max(1, int((top - self.style.header_h - bottom) // self.style.row_h))
+
+    def height(self, rows):
+        return self.style.header_h + rows * self.style.row_h
+
+    def pages(self, c, x, rows, top, bottom, begin=None, first_top=None):
+        """Draw rows (any iterable, consumed lazily) as many pages as they need.
+
+        Before each page's table, begin(start, count) draws what goes under
+        it (background, title) for rows start to start + count; after it,
+        the generator yields the table's bottom y so the caller can finish
+        the page and call showPage(). The first page's table may start at
+        first_top instead of top. No rows, no pages.
+        """
+        rows = iter(rows)
+        page_top = top if first_top is None else first_top
+        start = 0
+        while True:
+            batch = list(itertools.islice(rows, self.rows_per_page(page_top, bottom)))
+            if not batch:
+                return
+            if begin is not None:
+                begin(start, len(batch))
+            yield self.draw(c, x, page_top, batch)
+            start += len(batch)
+            page_top = top
+
+    def draw(self, c, x, top, rows):
+        """Header and rows (a sequence that fits) below top, from x; returns the bottom y."""
+        s = self.style
+        body = top - s.header_h
+        bottom = body - len(rows) * s.row_h
+        gradients.fill_rect(c, x, body, self.width, s.header_h, list(s.header),
+                            mode=self.gradient_mode)
+        c.setFont(self.font, s.header_size)
+        c.setFillColor(s.header_text)
+        cx = x + s.dot_w
+        for col in self.columns:
+            self._text(c, col, col.title, cx, top - s.header_h / 2 - s.header_drop,
+                       s.header_size)
+            cx += col.width
+
+        self._fills(c, x, body, len(rows))
+        if s.dot_w:
+            for r, (_, dot) in enumerate(rows):
+                if dot is not None:
+                    c.setFillColor(dot)
+                    c.circle(x + 15, body - (r + 0.5) * s.row_h, s.dot_r, stroke=0, fill=1)
+
+        # Row by row, so the text reads in table order when extracted or
+        # searched; a state-caching canvas drops the repeated font and color.
+        for r, (cells, _) in enumerate(rows):
+            y = body - (r + 0.5) * s.row_h
+            cx = x + s.dot_w
+            for col, cell in zip(self.columns, cells):
+                if isinstance(cell, str):
+                    c.setFont(self.font, s.size)
+                    c.setFillColor(s.colors[col.role])
+                    self._text(c, col, cell, cx, y - s.drop, s.size)
+                else:
+                    self.draw_cell(c, cell, cx, y, col.width, s.row_h, col.align, s.size)
+                cx += col.width
+
+        if s.rule is not None:
+            c.setStrokeColor(s.rule)
+            c.setLineWidth(s.rule_w)
+            if s.grid:
+                for r in range(len(rows) + 1):
+                    c.line(x, body - r * s.row_h, x + self.width, body - r * s.row_h)
+                vx = x + s.dot_w
+                c.line(x, body, x, bottom)
+                for col in self.columns:
+                    vx += col.width
+                    c.line(vx, body, vx, bottom)
+            else:
+                c.line(x, bottom, x + self.width, bottom)
+        return bottom
+
+    def _fills(self, c, x, body, count):
+        """Highlight column, zebra rows and the highlight's tint over them."""
+        s = self.style
+        row_h = s.row_h
+        hx = None
+        if s.highlight is not None:
+            index, tint, zebra_tint = s.highlight
+            hx = x + s.dot_w + sum(col.width for col in self.columns[:index])
+            hw = self.columns[index].width
+            c.setFillColor(tint)
+            c.rect(hx, body - count * row_h, hw, count * row_h, stroke=0, fill=1)
+        for first, fill in ((0, s.zebra), (1, s.zebra_odd)):
+            if fill is None:
+                continue
+            c.setFillColor(fill)
+            for r in range(first, count, 2):
+                c.rect(x, body - (r + 1) * row_h, self.width, row_h, stroke=0, fill=1)
+            if hx is not None:
+                c.setFillColor(zebra_tint)
+                for r in range(first, count, 2):
+                    c.rect(hx, body - (r + 1) * row_h, hw, row_h, stroke=0, fill=1)
+
+    def _text(self, c, col, text, x, y, size):
+        """text in col at baseline y; the font (at size) and color are already set."""
+        width = col.width - CELL_PAD
+        if col.overflow == "ellipsis":
+            lines, fitted = (clip(text, self.font, size, width),), size
+        else:
+            fit = textlayout.place(text, self.font, size, width, 1, size * self.min_scale)
+            lines, fitted = fit.lines, fit.size
+            if fitted != size:
+                c.setFont(self.font, fitted)
+        if col.align == "right":
+            x, draw = x + col.width - RIGHT_INSET, c.drawRightString
+        elif col.align == "center":
+            x, draw = x + col.width / 2, c.drawCentredString
+        else:
+            draw = c.drawString
+        for j, line in enumerate(lines):
+            draw(x, y - j * fitted * 1.5, line)
+        if fitted != size:
+            c.setFont(self.font, size)
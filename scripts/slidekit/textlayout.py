@@ -0,0 +1,181 @@
+"""
+Text measurement, Japanese line breaking and shrink-to-fit.
+
+Slides draw copy into cards and table cells of fixed width. fit() wraps a
+string to a width following the usual kinsoku rules (no closing brackets,
+small kana or punctuation at the start of a line, no opening brackets or
+currency signs at the end), keeps Latin words, numbers and katakana words
+whole, and steps the font size down until the result fits the allowed
+number of lines.
+Every box that only fits shrunk, or does not fit at all, is recorded for
+the overflow report.
+
+Widths come from stringWidth, which for a CID or TrueType font sums the
+per-glyph advances, so a line's width is the sum of its tokens' widths.
+Measurements and fits are memoized in bounded LRU caches keyed by
+(text, font, size): batch and multi-deck builds lay out the same strings
+thousands of times.
+"""
+
+import re
+from functools import lru_cache
+from typing import NamedTuple
+
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+MEASURE_CACHE_SIZE = 65536
+FIT_CACHE_SIZE = 4096
+# Font size decrement tried by fit() between the design size and min_size.
+SIZE_STEP = 0.5
+
+# 行頭禁則: characters that may not start a line.
+NO_START = frozenset(
+    "、。，．,.・：；:;？！?!‼⁇⁈⁉ー－‐–—〜～…‥）)］]｝}〕〉》」』】〙〗〟’”»"
+    "ぁぃぅぇぉっゃゅょゎゕゖァィゥェォッャュョヮヵヶㇰㇱㇲㇳㇴㇵㇶㇷㇸㇹㇺㇻㇼㇽㇾㇿ"
+    "ゝゞヽヾ々〻％%℃°′″"
+)
+# 行末禁則: characters that may not end a line.
+NO_END = frozenset("（(［[｛{〔〈《「『【〘〖〝‘“«¥￥$＄#＃")
+# Punctuation allowed to hang past the right edge (ぶら下げ) rather than
+# pushing the previous character to the next line.
+HANGING = frozenset("、。，．,.")
+
+# A Latin word or number, or a katakana word (loanwords read badly split),
+# kept whole; a run of spaces; or any one other character (kanji and
+# hiragana break between any two characters).
+_TOKEN = re.compile(r"[0-9A-Za-zÀ-ɏ'’&@#%+\-_.,:/]+|[ァ-ヺー]+|\s+|.")
+
+_report = {}
+_where = None
+
+
+class Fit(NamedTuple):
+    size: float
+    lines: tuple
+    fits: bool
+
+
+@lru_cache(maxsize=MEASURE_CACHE_SIZE)
+def measure(text, font, size):
+    """Width of text set in font at size, in points."""
+    return stringWidth(text, font, size)
+
+
+def _tokens(text, font, size, width):
+    tokens = []
+    for tok in _TOKEN.findall(text):
+        if len(tok) > 1 and not tok.isspace() and measure(tok, font, size) > width:
+            tokens.extend(tok)          # a word wider than the line breaks anywhere
+        else:
+            tokens.append(tok)
+    return tokens
+
+
+def _can_break(tokens, i):
+    """Whether a line may end before tokens[i] under kinsoku."""
+    return tokens[i][0] not in NO_START and tokens[i - 1][-1] not in NO_END
+
+
+def _wrap_paragraph(text, font, size, width):
+    tokens = _tokens(text, font, size, width)
+    widths = [measure(t, font, size) for t in tokens]
+    lines, start, n = [], 0, len(tokens)
+    while start < n:
+        while start < n and tokens[start].isspace():
+            start += 1
+        if start == n:
+            break
+        i, w = start + 1, widths[start]
+        while i < n and (w + widths[i] <= width or tokens[i].isspace()):
+            w += widths[i]
+            i += 1
+        if i < n and tokens[i] in HANGING:
+            i += 1
+        if i < n and not _can_break(tokens, i):
+            # 追い出し: carry characters over until the break is allowed; if
+            # no position on the line allows one, break where it overflowed.
+            b = i - 1
+            while b > start and not _can_break(tokens, b):
+                b -= 1
+            if b > start:
+                i = b
+        lines.append("".join(tokens[start:i]).rstrip())
+        start = i
+    return lines or [""]
+
+
+@lru_cache(maxsize=FIT_CACHE_SIZE)
+def wrap(text, font, size, width):
+    """Lines of text broken to width; "\\n" forces a break."""
+    lines = []
+    for paragraph in text.split("\n"):
+        lines.extend(_wrap_paragraph(paragraph, font, size, width))
+    return tuple(lines)
+
+
+@lru_cache(maxsize=FIT_CACHE_SIZE)
+def fit(text, font, size, width, max_lines=1, min_size=None):
+    """Largest size from `size` down to `min_size` at which text wraps to at most
+    max_lines lines of `width`; at min_size if none does (fits is then False)."""
+    min_size = size if min_size is None else min_size
+    s = size
+    while True:
+        lines = wrap(text, font, s, width)
+        widest = max(measure(line.rstrip("".join(HANGING)), font, s) for line in lines)
+        if len(lines) <= max_lines and widest <= width:
+            return Fit(s, lines, True)
+        if s - SIZE_STEP < min_size:
+            return Fit(s, lines, False)
+        s -= SIZE_STEP
+
+
+def place(text, font, size, width, max_lines=1, min_size=None):
+    """fit(), recording the box in the overflow report unless it fits as designed."""
+    result = fit(text, font, size, width, max_lines, min_size)
+    if result.size != size or not result.fits:
+        _report[f"{_where or '-'}:{text}"] = {
+            "where": _where, "text": text, "size": size, "fitted_size": result.size,
+            "width": width, "max_lines": max_lines, "lines": len(result.lines),
+            "overflow": not result.fits,
+        }
+    return result
+
+
+def set_where(name):
+    """Label (e.g. the slide function) recorded with boxes placed from now on."""
+    global _where
+    _where = name
+
+
+def cache_info():
+    return {"measure": measure.cache_info(), "wrap": wrap.cache_info(), "fit": fit.cache_info()}
+
+
+def report():
+    """Boxes placed so far in this process that were shrunk or still overflow."""
+    return dict(_report)
+
+
+def merge_report(entries):
+    """Fold a report produced in another process into this one."""
+    _report.update(entries)
+
+
+def clear_report():
+    """Forget the boxes recorded so far (a long-running worker, between jobs)."""
+    _report.clear()
+
+
+def format_report(entries):
+    lines = []
+    for e in sorted(entries.values(), key=lambda e: (not e["overflow"], e["where"] or "", e["text"])):
+        text = e["text"].replace("\n", " / ")
+        if len(text) > 40:
+            text = text[:39] + "…"
+        if e["overflow"]:
+            status = (f"OVERFLOW at {e['fitted_size']:g}pt: {e['lines']} lines "
+                      f"(max {e['max_lines']}) of {e['width']:g}pt")
+        else:
+            status = f"shrunk {e['size']:g} -> {e['fitted_size']:g}pt to fit {e['width']:g}pt"
+        lines.append(f"  {e['where'] or '-'}: {text!r} {status}")
+    return "\n".join(lines)
@@ -0,0 +1,225 @@
+"""
+Slide thumbnails for the marketing site.
+
+Each page of a built deck is rasterized once at the largest requested width
+with PyMuPDF and downscaled with Pillow to the other widths, then written
+as PNG and/or WebP. Rasters are cached by a content digest of the page: its
+content stream with each resource name replaced by a Merkle digest of the
+resource it names (a form XObject by its own content, resolved the same
+way), so the digest ignores object numbering, resource naming and the
+rest of the deck (a page hashes the same in a serial, parallel or
+--slides build). Pages whose digest is unchanged are copied from the cache
+without rasterizing.
+A manifest maps slide names to the files written and their sizes.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+
+from .images import _write_atomic
+
+DEFAULT_WIDTHS = (320, 640, 1280)
+DEFAULT_FORMATS = ("png", "webp")
+WEBP_QUALITY = 85
+# Bump when rasterization changes so cached thumbnails are ignored.
+CACHE_VERSION = 1
+
+_REF_RE = re.compile(r"(\d+) 0 R")
+_NAME_RE = re.compile(rb"/([^\s/\[\]<>(){}%]+)")
+RESOURCE_KINDS = ("Font", "ExtGState", "XObject", "Shading", "Pattern", "ColorSpace")
+# Page keys that affect how it rasterizes; Contents and Resources are hashed
+# through the content stream, and Parent would pull in the whole deck.
+PAGE_KEYS = ("MediaBox", "CropBox", "Rotate", "UserUnit")
+FORM_KEYS = ("BBox", "Matrix", "Group")
+
+
+def _fitz():
+    try:
+        import pymupdf
+    except ImportError:
+        raise SystemExit("thumbnail export requires PyMuPDF (pip install pymupdf)")
+    return pymupdf
+
+
+def _value_digest(doc, kind, value, memo):
+    if kind == "xref":
+        return _object_digest(doc, int(value.split()[0]), memo)
+    resolved = _REF_RE.sub(lambda m: _object_digest(doc, int(m.group(1)), memo), value)
+    return hashlib.sha256(resolved.encode()).hexdigest()
+
+
+def _object_digest(doc, xref, memo):
+    """Digest of an object with references replaced by their targets' digests.
+
+    Keys are hashed in sorted order and /Parent back-links are skipped, so
+    the digest does not depend on how the writer numbered or ordered things.
+    """
+    if xref in memo:
+        return memo[xref] or "cycle"
+    memo[xref] = None
+    h = hashlib.sha256()
+    keys = doc.xref_get_keys(xref)
+    if keys:
+        for key in sorted(keys):
+            if key != "Parent":
+                h.update(f"/{key} {_value_digest(doc, *doc.xref_get_key(xref, key), memo)}".encode())
+    else:
+        h.update(_value_digest(doc, "", doc.xref_object(xref, compressed=True), memo).encode())
+    if doc.xref_is_stream(xref):
+        h.update(doc.xref_stream_raw(xref) or b"")
+    memo[xref] = h.hexdigest()
+    return memo[xref]
+
+
+def _content_digest(doc, xref, content, memo):
+    """content with each resource name replaced by the digest of the resource
+    it names in xref's resources. Form XObjects are followed into their own
+    content, so resources a form carries but never uses do not count either.
+    """
+    resolved = {}
+
+    def resolve(m):
+        name = m.group(1)
+        if name not in resolved:
+            resolved[name] = m.group(0)
+            for kind in RESOURCE_KINDS:
+                value = doc.xref_get_key(xref, f"Resources/{kind}/{name.decode('latin-1')}")
+                if value[0] != "null":
+                    if kind == "XObject" and value[0] == "xref":
+                        digest = _xobject_digest(doc, int(value[1].split()[0]), memo)
+                    else:
+                        digest = _value_digest(doc, *value, memo)
+                    resolved[name] = b"/" + digest.encode()
+                    break
+        return resolved[name]
+
+    return _NAME_RE.sub(resolve, content)
+
+
+def _xobject_digest(doc, xref, memo):
+    """Digest of an image (the whole object) or a form (its content, resolved)."""
+    if doc.xref_get_key(xref, "Subtype")[1] != "/Form":
+        return _object_digest(doc, xref, memo)
+    key = ("form", xref)
+    if key in memo:
+        return memo[key] or "cycle"
+    memo[key] = None
+    h = hashlib.sha256()
+    for name in FORM_KEYS:
+        h.update(f"/{name} {doc.xref_get_key(xref, name)[1]}".encode())
+    h.update(_content_digest(doc, xref, doc.xref_stream(xref) or b"", memo))
+    memo[key] = h.hexdigest()
+    return memo[key]
+
+
+def _page_digest(doc, page, memo):
+    """Digest of what a page draws: its content with resource names replaced
+    by the digests of the resources they name. Resources the page or its
+    forms carry but never use (decks share one font and ExtGState
+    dictionary) do not count.
+    """
+    h = hashlib.sha256()
+    for key in PAGE_KEYS:
+        h.update(f"/{key} {doc.xref_get_key(page.xref, key)[1]}".encode())
+    h.update(_content_digest(doc, page.xref, page.read_contents(), memo))
+    return h.hexdigest()
+
+
+def page_digests(pdf_path):
+    """Content digest of every page in the PDF, independent of the rest of the deck."""
+    doc = _fitz().open(pdf_path)
+    memo = {}
+    try:
+        return [_page_digest(doc, page, memo) for page in doc]
+    finally:
+        doc.close()
+
+
+def file_name(index, name, width, fmt):
+    return f"{index + 1:02d}-{name}-{width}.{fmt}"
+
+
+def _cache_key(digest, width, fmt):
+    params = f"v{CACHE_VERSION}:{digest}:{width}:{fmt}:{WEBP_QUALITY}"
+    return hashlib.sha256(params.encode()).hexdigest()[:32]
+
+
+def rasterize_page(job):
+    """Write one page's thumbnails into the cache (worker entry point).
+
+    job is (pdf_path, page_index, digest, widths, formats, cache_dir).
+    """
+    from PIL import Image
+
+    pdf_path, index, digest, widths, formats, cache_dir = job
+    doc = _fitz().open(pdf_path)
+    try:
+        page = doc[index]
+        largest = max(widths)
+        zoom = largest / page.rect.width
+        pix = page.get_pixmap(matrix=_fitz().Matrix(zoom, zoom), alpha=False)
+        base = Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+    finally:
+        doc.close()
+    for width in widths:
+        height = round(base.height * width / base.width)
+        im = base if width == base.width else base.resize((width, height), Image.LANCZOS)
+        for fmt in formats:
+            path = os.path.join(cache_dir, _cache_key(digest, width, fmt) + "." + fmt)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            if fmt == "webp":
+                im.save(tmp, "WEBP", quality=WEBP_QUALITY, method=6)
+            else:
+                im.save(tmp, "PNG", optimize=True)
+            os.replace(tmp, path)
+
+
+def export(pdf_path, names, out_dir, widths=DEFAULT_WIDTHS, formats=DEFAULT_FORMATS,
+           cache_dir=None, jobs=1):
+    """Thumbnails for every page of pdf_path into out_dir, plus manifest.json.
+
+    names[i] is the slide name for page i. Returns (manifest, rasterized
+    page count); pages whose cached thumbnails exist are not rasterized.
+    """
+    from PIL import Image
+
+    widths = sorted(set(widths))
+    os.makedirs(cache_dir, exist_ok=True)
+    os.makedirs(out_dir, exist_ok=True)
+    digests = page_digests(pdf_path)
+    if len(digests) != len(names):
+        raise ValueError(f"{pdf_path} has {len(digests)} pages but {len(names)} slide names")
+
+    def cached(digest, width, fmt):
+        return os.path.join(cache_dir, _cache_key(digest, width, fmt) + "." + fmt)
+
+    todo = [(pdf_path, i, d, widths, formats, cache_dir) for i, d in enumerate(digests)
+            if not all(os.path.exists(cached(d, w, f)) for w in widths for f in formats)]
+    if jobs > 1 and len(todo) > 1:
+        from .parallel import render_pages
+        render_pages(rasterize_page, todo, min(jobs, len(todo)))
+    else:
+        for job in todo:
+            rasterize_page(job)
+
+    slides = []
+    for i, (name, digest) in enumerate(zip(names, digests)):
+        files = []
+        for width in widths:
+            for fmt in formats:
+                src = cached(digest, width, fmt)
+                target = os.path.join(out_dir, file_name(i, name, width, fmt))
+                shutil.copyfile(src, target)
+                with Image.open(target) as im:
+                    size = im.size
+                files.append({"file": os.path.basename(target), "format": fmt,
+                              "width": size[0], "height": size[1],
+                              "bytes": os.path.getsize(target)})
+        slides.append({"name": name, "page": i + 1, "digest": digest[:16], "images": files})
+    manifest = {"source": os.path.basename(pdf_path), "slides": slides}
+    _write_atomic(os.path.join(out_dir, "manifest.json"),
+                  (json.dumps(manifest, indent=2, ensure_ascii=False) + "\n").encode())
+    return manifest, len(todo)